@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Checks that registered inputs are found by worker processes.
+
+Usage:
+    python input_cache_test.py [PROBLEM_DIR]
+
+Run it from an environment where ``algops`` is importable (for example,
+``uv run python input_cache_test.py``).  PROBLEM_DIR is a problem package
+with a ``problem.py`` module, and defaults to the repository's
+``example_problems/number_in_range``.
+
+With ``Executor.PROCESS``, each worker process has its own input cache.  This
+serves the problem with several worker processes, registers a few inputs with
+``RegisterInput``, then verifies outputs against each by ``input_digest``.
+Every verification must find its input (rather than failing with
+``not_found``) and count as a cache hit in ``GET /algops/stats``.
+"""
+
+import pathlib
+import sys
+
+import starlette.testclient
+from algops import app
+from algops.proto.algobowl.problemsupport.v1 import problem_support_pb2
+
+WORKERS = 4
+INPUTS = [(low, low + 10) for low in range(1, 81, 10)]
+VERIFICATIONS_PER_INPUT = 5
+SERVICE = "/algobowl.problemsupport.v1.ProblemSupportService"
+HEADERS = {"Content-Type": "application/proto"}
+
+
+def call(client, method, request, response_type):
+    r = client.post(
+        f"{SERVICE}/{method}", content=request.SerializeToString(), headers=HEADERS
+    )
+    if r.status_code != 200:
+        return r.json()
+    return response_type.FromString(r.content)
+
+
+def main():
+    default = pathlib.Path(__file__).parent.parent / "example_problems/number_in_range"
+    sys.path.insert(0, str(sys.argv[1] if len(sys.argv) > 1 else default))
+    import problem  # noqa: PLC0415
+
+    application = app.ProblemSupportApplication(
+        input_type=problem.Input,
+        output_type=problem.Output,
+        rank_sort=app.RANK_SORT_MINIMIZATION,
+        executor=app.Executor.PROCESS,
+        max_concurrency=WORKERS,
+    )
+    failures = []
+    with starlette.testclient.TestClient(application) as client:
+        digests = []
+        for low, high in INPUTS:
+            response = call(
+                client,
+                "RegisterInput",
+                problem_support_pb2.RegisterInputRequest(
+                    content=f"{low}\n{high}\n".encode()
+                ),
+                problem_support_pb2.RegisterInputResponse,
+            )
+            if isinstance(response, dict):
+                failures.append(f"RegisterInput {low} {high}: {response}")
+                continue
+            digests.append((low, response.input_digest))
+
+        for low, digest in digests:
+            for _ in range(VERIFICATIONS_PER_INPUT):
+                response = call(
+                    client,
+                    "VerifyOutput",
+                    problem_support_pb2.VerifyOutputRequest(
+                        input_digest=digest, output_content=f"{low}\n".encode()
+                    ),
+                    problem_support_pb2.VerifyOutputResponse,
+                )
+                if isinstance(response, dict) or not response.output.HasField(
+                    "accepted"
+                ):
+                    failures.append(f"VerifyOutput on input {low}: {response}")
+
+        stats = client.get("/algops/stats").json()["input_cache"]
+
+    expected_hits = len(INPUTS) * VERIFICATIONS_PER_INPUT
+    for failure in failures[:5]:
+        print(f"FAIL  {failure}")
+    if stats["hits"] != expected_hits:
+        failures.append("hits")
+        print(f"FAIL  {stats['hits']} cache hits, expected {expected_hits}")
+    status = "FAIL" if failures else "ok"
+    print(
+        f"{status:4}  {WORKERS} workers, {len(INPUTS)} inputs registered, "
+        f"{expected_hits} verifications by digest: {stats}"
+    )
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""Checks and benchmarks the bulk parsing and writing helpers in problemlib.
+
+Usage:
+    python problemlib_bench.py
+
+Run it from an environment where ``algops`` is importable (for example,
+``uv run python problemlib_bench.py``).
+
+:func:`problemlib.parse_int_matrix` and
+:meth:`problemlib.LineReader.next_int_matrix` must accept and reject exactly
+what calling :func:`problemlib.parse_line_ints` on each line does, with the
+same error messages.  This checks that for each kind of bound (int, step-1
+range, stepped range, callable, sequence of values, per-column bounds, and
+none) against rows with the wrong number of values, non-integer values and
+out-of-bounds values, then on randomly generated files.  It then times the
+line-at-a-time and bulk helpers on a few large files.
+
+:func:`problemlib.write_lines` and :func:`problemlib.write_matrix` must
+write the same text as ``print()`` for each value or row.  This checks that
+for mixed value types, ragged rows and generators across batch boundaries,
+then times serializing large inputs and outputs with ``print()`` and with
+the helpers, through the server's old write path (a write-through
+``TextIOWrapper``) and its current one.
+"""
+
+import io
+import random
+import sys
+import time
+
+from algops import app, problemlib
+
+# (name, bounds, valid row, out-of-bounds row).  Every case has two columns;
+# the sequence has a different length, so it is a set of allowed values
+# rather than per-column bounds.
+BOUND_KINDS = [
+    ("none", None, "-4 1000", None),
+    ("int", 7, "7 7", "7 8"),
+    ("range (step 1)", range(10), "0 9", "9 10"),
+    ("range (stepped)", range(0, 10, 2), "0 8", "4 5"),
+    ("callable", lambda value: value % 2 == 0, "2 4", "2 5"),
+    ("sequence", [1, 2, 3, 5, 8], "5 8", "5 4"),
+    ("per-column", [range(10), 7], "9 7", "9 6"),
+]
+COLS = 2
+ROWS = 5
+
+# Bad rows to try in each position of the file, by name.
+FAULTS = {
+    "valid": lambda valid, out_of_bounds: valid,
+    "too few values": lambda valid, out_of_bounds: valid.split()[0],
+    "too many values": lambda valid, out_of_bounds: f"{valid} 1",
+    "empty line": lambda valid, out_of_bounds: "",
+    "non-integer": lambda valid, out_of_bounds: f"{valid.split()[0]} x",
+    "float": lambda valid, out_of_bounds: f"{valid.split()[0]} 1.5",
+    "out of bounds": lambda valid, out_of_bounds: out_of_bounds,
+}
+
+# (rows, cols, values drawn from range(high)) of the benchmark files.
+BENCHMARKS = [
+    (500_000, 2, 100_000),
+    (1000, 1000, 10**6),
+    (1_000_000, 1, 10**9),
+]
+
+
+def outcome(func):
+    try:
+        return "ok", [tuple(row) for row in func()]
+    except problemlib.FileFormatError as e:
+        return "error", str(e)
+
+
+def line_by_line(lines, start, rows, cols, bounds):
+    return [
+        problemlib.parse_line_ints(lines, lineno, bounds=bounds, count=cols)
+        for lineno in range(start, start + rows)
+    ]
+
+
+def reader_matrix(data, start, rows, cols, bounds):
+    reader = problemlib.LineReader(io.BytesIO(data))
+    for _ in range(start):
+        reader.next_line()
+    return reader.next_int_matrix(rows, cols, bounds=bounds)
+
+
+def compare(lines, start, rows, cols, bounds):
+    """Parses lines in bulk and line by line.
+
+    ``LineReader`` reads bytes, so it is compared against ``parse_line_ints``
+    on the same lines as bytes (error messages show the bytes repr).
+
+    Returns:
+        A description of the mismatch, or None if all agree.
+    """
+    expected = outcome(lambda: line_by_line(lines, start, rows, cols, bounds))
+    got = outcome(
+        lambda: problemlib.parse_int_matrix(lines, start, rows, cols, bounds=bounds)
+    )
+    if got != expected:
+        return f"parse_int_matrix gave {got}, expected {expected}"
+
+    data = b"".join(
+        (line if isinstance(line, bytes) else line.encode()).rstrip(b"\n") + b"\n"
+        for line in lines
+    )
+    byte_lines = data.splitlines(keepends=True)
+    expected = outcome(lambda: line_by_line(byte_lines, start, rows, cols, bounds))
+    got = outcome(lambda: reader_matrix(data, start, rows, cols, bounds))
+    if got != expected:
+        return f"next_int_matrix gave {got}, expected {expected}"
+    return None
+
+
+def check_bound_kinds():
+    failed = 0
+    for name, bounds, valid, out_of_bounds in BOUND_KINDS:
+        mismatches = []
+        for fault, make_row in FAULTS.items():
+            if out_of_bounds is None and fault == "out of bounds":
+                continue
+            bad = make_row(valid, out_of_bounds)
+            for position in range(ROWS):
+                rows = [valid] * ROWS
+                rows[position] = bad
+                for newline_at_end in (True, False):
+                    text = ["header\n"] + [f"{row}\n" for row in rows]
+                    if not newline_at_end:
+                        text[-1] = text[-1].rstrip("\n")
+                    for lines in (text, [line.encode() for line in text]):
+                        mismatch = compare(lines, 1, ROWS, COLS, bounds)
+                        if mismatch:
+                            mismatches.append(f"{fault} in row {position}: {mismatch}")
+        status = "FAIL" if mismatches else "ok"
+        print(f"{status:4}  bounds: {name}")
+        for mismatch in mismatches[:5]:
+            print(f"        {mismatch}")
+        failed += bool(mismatches)
+    return failed
+
+
+def check_random(cases=20_000):
+    rng = random.Random(0)
+    tokens = ["0", "1", "2", "7", "-3", "99", "+4", "x", "1.5", "1_0", "10" * 12]
+    bound_choices = [kind[1] for kind in BOUND_KINDS] + [range(0), [None, 7]]
+    mismatches = []
+    for _ in range(cases):
+        rows = rng.randrange(5)
+        cols = rng.randrange(3)
+        start = rng.randrange(2)
+        lines = ["9 9\n"] * start + [
+            " ".join(
+                rng.choice(tokens)
+                for _ in range(rng.choice([cols, cols, cols, cols + 1, cols - 1]))
+            )
+            + "\n"
+            for _ in range(rows)
+        ]
+        if rng.random() < 0.3:
+            lines = [line.rstrip("\n") for line in lines]
+        if rng.random() < 0.5:
+            lines = [line.encode() for line in lines]
+        bounds = rng.choice(bound_choices)
+        mismatch = compare(lines, start, rows, cols, bounds)
+        if mismatch:
+            mismatches.append(f"{lines!r} (bounds {bounds!r}): {mismatch}")
+    status = "FAIL" if mismatches else "ok"
+    print(f"{status:4}  {cases} random files")
+    for mismatch in mismatches[:5]:
+        print(f"        {mismatch}")
+    return bool(mismatches)
+
+
+def best_time(func, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def benchmark_parsing():
+    rng = random.Random(1)
+    print()
+    print("Parsing, best of 3 (ms):")
+    print(
+        f"{'file':>22}  {'parse_line_ints':>15}  {'parse_int_matrix':>16}  "
+        f"{'next_ints':>9}  {'next_int_matrix':>15}"
+    )
+    for rows, cols, high in BENCHMARKS:
+        data = "".join(
+            " ".join(str(rng.randrange(high)) for _ in range(cols)) + "\n"
+            for _ in range(rows)
+        ).encode()
+        benchmark_file(data, rows, cols, range(high))
+
+
+def benchmark_file(data, rows, cols, bounds):
+    lines = data.splitlines(keepends=True)
+
+    def reader_by_line():
+        reader = problemlib.LineReader(io.BytesIO(data))
+        for _ in range(rows):
+            reader.next_ints(bounds=bounds, count=cols)
+
+    old = best_time(lambda: line_by_line(lines, 0, rows, cols, bounds))
+    new = best_time(
+        lambda: problemlib.parse_int_matrix(lines, 0, rows, cols, bounds=bounds)
+    )
+    old_reader = best_time(reader_by_line)
+    new_reader = best_time(lambda: reader_matrix(data, 0, rows, cols, bounds))
+    name = f"{rows}x{cols} ({len(data) / 1e6:.1f} MB)"
+    print(
+        f"{name:>22}  {old * 1e3:15.0f}  "
+        f"{new * 1e3:9.0f} ({old / new:4.1f}x)  "
+        f"{old_reader * 1e3:9.0f}  "
+        f"{new_reader * 1e3:8.0f} ({old_reader / new_reader:4.1f}x)"
+    )
+
+
+def check_writers(cases=2000):
+    rng = random.Random(2)
+    choices = [
+        lambda: rng.randrange(-(10**9), 10**9),
+        lambda: "ab",
+        lambda: "%s%d",
+        lambda: 1.5,
+        lambda: True,
+        lambda: None,
+        lambda: (1, 2),
+    ]
+    mismatches = 0
+    for case in range(cases):
+        # The first few cases span several write batches.
+        size = rng.randrange(10_000 if case < 5 else 20)
+        values = [rng.choice(choices)() for _ in range(size)]
+        rows = [
+            tuple(rng.choice(choices)() for _ in range(rng.choice([2, 2, 2, 0, 3])))
+            for _ in range(size)
+        ]
+
+        expected, got = io.StringIO(), io.StringIO()
+        for value in values:
+            print(value, file=expected)
+        problemlib.write_lines(got, iter(values))
+        mismatches += expected.getvalue() != got.getvalue()
+
+        expected, got = io.StringIO(), io.StringIO()
+        for row in rows:
+            print(*row, file=expected)
+        problemlib.write_matrix(got, (row for row in rows))
+        mismatches += expected.getvalue() != got.getvalue()
+    status = "FAIL" if mismatches else "ok"
+    print(f"{status:4}  write_lines and write_matrix match print() ({cases} cases)")
+    return bool(mismatches)
+
+
+class Chosen:
+    """An output of one integer per line, written with ``print()``."""
+
+    def __init__(self, values):
+        self.values = values
+
+    def write(self, f):
+        print(len(self.values), file=f)
+        for value in self.values:
+            print(value, file=f)
+
+
+class ChosenWithHelpers(Chosen):
+    def write(self, f):
+        print(len(self.values), file=f)
+        problemlib.write_lines(f, self.values)
+
+
+class Edges:
+    """An input of two integers per line, written with ``print()``."""
+
+    def __init__(self, edges):
+        self.edges = edges
+
+    def write(self, f):
+        print(len(self.edges), file=f)
+        for u, v in self.edges:
+            print(u, v, file=f)
+
+
+class EdgesWithHelpers(Edges):
+    def write(self, f):
+        print(len(self.edges), file=f)
+        problemlib.write_matrix(f, self.edges)
+
+
+def old_write_to_bytes(value):
+    """The server's write path before it used an in-memory text buffer."""
+    buffer = io.BytesIO()
+    text = io.TextIOWrapper(buffer, encoding="utf-8", write_through=True)
+    value.write(text)
+    text.flush()
+    return buffer.getvalue()
+
+
+def benchmark_writing():
+    rng = random.Random(3)
+    values = [rng.randrange(10**6) for _ in range(1_000_000)]
+    edges = [(rng.randrange(10**5), rng.randrange(10**5)) for _ in range(500_000)]
+    write_to_bytes = app._write_to_bytes  # noqa: SLF001
+
+    print()
+    print("Writing, best of 3 (ms):")
+    print(
+        f"{'file':>22}  {'old path, print':>15}  {'new path, print':>16}  "
+        f"{'new path, helpers':>17}"
+    )
+    for name, printed, helpers in [
+        ("1000000x1", Chosen(values), ChosenWithHelpers(values)),
+        ("500000x2", Edges(edges), EdgesWithHelpers(edges)),
+    ]:
+        expected = old_write_to_bytes(printed)
+        if not expected == write_to_bytes(printed) == write_to_bytes(helpers):
+            print(f"FAIL  {name}: written bytes differ")
+            return True
+        old = best_time(lambda value=printed: old_write_to_bytes(value))
+        new = best_time(lambda value=printed: write_to_bytes(value))
+        fast = best_time(lambda value=helpers: write_to_bytes(value))
+        name = f"{name} ({len(expected) / 1e6:.1f} MB)"
+        print(
+            f"{name:>22}  {old * 1e3:15.0f}  "
+            f"{new * 1e3:9.0f} ({old / new:4.1f}x)  "
+            f"{fast * 1e3:9.0f} ({old / fast:4.1f}x)"
+        )
+    return False
+
+
+def main():
+    failed = check_bound_kinds()
+    failed += check_random()
+    failed += check_writers()
+    if failed:
+        sys.exit(1)
+    benchmark_parsing()
+    if benchmark_writing():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
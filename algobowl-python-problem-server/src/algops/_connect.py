@@ -1,8 +1,11 @@
-"""Connect protobuf unary RPC handling."""
+"""Connect protobuf unary and client streaming RPC handling."""
 
 from __future__ import annotations
 
+import inspect
 import json
+import struct
+from collections.abc import AsyncIterator
 
 import starlette.requests
 import starlette.responses
@@ -10,14 +13,22 @@ from google.protobuf import message as proto_message
 
 _ERROR_STATUS = {
     "canceled": 408,
+    "failed_precondition": 400,
     "internal": 500,
     "invalid_argument": 400,
     "not_found": 404,
+    "resource_exhausted": 429,
     "unimplemented": 501,
     "unknown": 500,
 }
 
 _PROTO_CONTENT_TYPE = "application/proto"
+_STREAM_CONTENT_TYPE = "application/connect+proto"
+
+# Envelope flags of streamed messages.
+_FLAG_COMPRESSED = 0x01
+_FLAG_END_STREAM = 0x02
+_ENVELOPE_HEADER = struct.Struct(">BI")
 
 
 class ConnectError(Exception):
@@ -26,6 +37,9 @@ class ConnectError(Exception):
         self.code = code
         self.message = message
 
+    def __reduce__(self):
+        return type(self), (self.code, self.message)
+
 
 def _error_response(code: str, msg: str) -> starlette.responses.Response:
     body = json.dumps({"code": code, "message": msg}).encode("utf-8")
@@ -37,22 +51,28 @@ def _error_response(code: str, msg: str) -> starlette.responses.Response:
     )
 
 
+def _content_type(request: starlette.requests.Request) -> str:
+    return request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+
+
 async def handle_rpc(
     request: starlette.requests.Request,
     request_type,
     handler,
 ) -> starlette.responses.Response:
-    """Dispatch a Connect unary protobuf RPC from a Starlette request."""
-    content_type = (
-        request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
-    )
-    if content_type != _PROTO_CONTENT_TYPE:
+    """Dispatch a Connect unary protobuf RPC from a Starlette request.
+
+    The handler may be a plain function or a coroutine function.
+    """
+    if _content_type(request) != _PROTO_CONTENT_TYPE:
         return _error_response("invalid_argument", "unsupported content type")
     try:
         payload = await request.body()
         proto_request = request_type()
         proto_request.ParseFromString(payload)
         response_proto = handler(proto_request, scope=request.scope)
+        if inspect.isawaitable(response_proto):
+            response_proto = await response_proto
         return starlette.responses.Response(
             content=response_proto.SerializeToString(),
             media_type=_PROTO_CONTENT_TYPE,
@@ -61,3 +81,72 @@ async def handle_rpc(
         return _error_response(exc.code, exc.message)
     except proto_message.DecodeError as exc:
         return _error_response("invalid_argument", str(exc))
+
+
+def _envelope(flags: int, payload: bytes) -> bytes:
+    return _ENVELOPE_HEADER.pack(flags, len(payload)) + payload
+
+
+async def _read_messages(
+    request: starlette.requests.Request,
+    request_type,
+) -> AsyncIterator:
+    """Parse enveloped messages from a streaming request body as they arrive.
+
+    Only one message (and the part of the body not yet parsed) is held in
+    memory at a time.
+    """
+    buffer = bytearray()
+    async for data in request.stream():
+        buffer += data
+        while len(buffer) >= _ENVELOPE_HEADER.size:
+            flags, length = _ENVELOPE_HEADER.unpack_from(buffer)
+            end = _ENVELOPE_HEADER.size + length
+            if len(buffer) < end:
+                break
+            payload = bytes(buffer[_ENVELOPE_HEADER.size : end])
+            del buffer[:end]
+            if flags & _FLAG_COMPRESSED:
+                raise ConnectError("unimplemented", "compression is not supported")
+            if flags & _FLAG_END_STREAM:
+                continue
+            message = request_type()
+            message.ParseFromString(payload)
+            yield message
+    if buffer:
+        raise ConnectError("invalid_argument", "request ends with a partial message")
+
+
+async def handle_client_stream_rpc(
+    request: starlette.requests.Request,
+    request_type,
+    handler,
+) -> starlette.responses.Response:
+    """Dispatch a Connect client streaming protobuf RPC from a Starlette request.
+
+    The handler is a coroutine function, called with an async iterator of
+    request messages.
+    """
+    if _content_type(request) != _STREAM_CONTENT_TYPE:
+        return _error_response("invalid_argument", "unsupported content type")
+    try:
+        response_proto = await handler(
+            _read_messages(request, request_type), scope=request.scope
+        )
+        body = _envelope(0, response_proto.SerializeToString()) + _envelope(
+            _FLAG_END_STREAM, b"{}"
+        )
+    except ConnectError as exc:
+        body = _envelope(_FLAG_END_STREAM, _end_stream_error(exc.code, exc.message))
+    except proto_message.DecodeError as exc:
+        body = _envelope(
+            _FLAG_END_STREAM, _end_stream_error("invalid_argument", str(exc))
+        )
+    return starlette.responses.Response(
+        content=body,
+        media_type=_STREAM_CONTENT_TYPE,
+    )
+
+
+def _end_stream_error(code: str, msg: str) -> bytes:
+    return json.dumps({"error": {"code": code, "message": msg}}).encode("utf-8")
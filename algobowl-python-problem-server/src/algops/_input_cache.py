@@ -0,0 +1,276 @@
+"""LRU cache of parsed inputs, bounded by estimated memory use."""
+
+from __future__ import annotations
+
+import collections
+import collections.abc
+import contextlib
+import hashlib
+import sys
+import threading
+import types
+from collections.abc import Callable, MutableSequence
+from typing import Any
+
+from algops import problemlib
+
+# Default memory budget for parsed inputs, in bytes.
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SCALAR_TYPES = frozenset({int, float, complex, bool, str, bytes, type(None)})
+# Shared by everything, so not counted against any one input.
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.MethodType)
+# Number of items measured to estimate the size of a large container.
+_SAMPLE_SIZE = 64
+_STAT_FIELDS = ("hits", "misses", "evictions", "entries", "bytes")
+
+
+def digest(content: bytes) -> bytes:
+    """Computes the cache key of an input.
+
+    Args:
+        content: Input file bytes.
+
+    Returns:
+        SHA-256 digest of the bytes.
+    """
+    return hashlib.sha256(content).digest()
+
+
+def estimate_size(value: Any) -> int:
+    """Estimates the memory used by an object and everything it references.
+
+    Large containers are estimated from a sample of their items, so the
+    estimate costs far less than parsing the input did.  Objects shared
+    between sampled items may be counted more than once, so this tends to
+    overestimate.
+
+    Args:
+        value: Object to measure.
+
+    Returns:
+        Estimated size in bytes.
+    """
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if type(obj) in _SCALAR_TYPES:
+            continue
+        if isinstance(obj, dict):
+            items = [*obj.keys(), *obj.values()]
+        elif isinstance(obj, (list, tuple, set, frozenset, collections.deque)):
+            items = obj
+        else:
+            if hasattr(obj, "__dict__"):
+                stack.append(vars(obj))
+            for slot in getattr(type(obj), "__slots__", ()):
+                with contextlib.suppress(AttributeError):
+                    stack.append(getattr(obj, slot))
+            continue
+        if len(items) > _SAMPLE_SIZE:
+            if not isinstance(items, collections.abc.Sequence):
+                items = list(items)
+            step = len(items) / _SAMPLE_SIZE
+            sample = [items[int(i * step)] for i in range(_SAMPLE_SIZE)]
+            total += sum(map(estimate_size, sample)) * len(items) // _SAMPLE_SIZE
+        else:
+            stack.extend(items)
+    return total
+
+
+class CacheStats:
+    """Cache counters, which may be shared between worker processes.
+
+    Attributes:
+        values: Counter values, in the order of ``_STAT_FIELDS``.
+    """
+
+    def __init__(
+        self,
+        values: MutableSequence[int] | None = None,
+        lock: Any = None,
+    ) -> None:
+        """Initializes counters.
+
+        Args:
+            values: Storage for the counters, such as a shared
+                ``multiprocessing.Array``.  Defaults to a new list.
+            lock: Lock guarding the storage.  Defaults to a new thread lock.
+        """
+        self.values = values if values is not None else [0] * len(_STAT_FIELDS)
+        self._lock = lock if lock is not None else threading.Lock()
+
+    @classmethod
+    def shared(cls) -> CacheStats:
+        """Creates counters in shared memory, for use by worker processes.
+
+        Returns:
+            Counters which may be passed to worker processes.
+        """
+        import multiprocessing  # noqa: PLC0415
+
+        array = multiprocessing.Array("q", len(_STAT_FIELDS))
+        return cls(array, array.get_lock())
+
+    def __reduce__(self):
+        return type(self), (self.values, self._lock)
+
+    def add(self, **deltas: int) -> None:
+        """Adds to counters.
+
+        Args:
+            **deltas: Amount to add to each named counter.
+        """
+        with self._lock:
+            for name, delta in deltas.items():
+                self.values[_STAT_FIELDS.index(name)] += delta
+
+    def snapshot(self) -> dict[str, int]:
+        """Reads every counter.
+
+        Returns:
+            Counter values by name.
+        """
+        with self._lock:
+            return dict(zip(_STAT_FIELDS, self.values, strict=True))
+
+
+class InputCache:
+    """LRU cache of parsed inputs, keyed by the digest of their bytes.
+
+    Attributes:
+        max_bytes: Memory budget for cached inputs.
+        stats: Cache counters.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        stats: CacheStats | None = None,
+    ) -> None:
+        """Initializes an empty cache.
+
+        Args:
+            max_bytes: Memory budget for cached inputs.  0 disables the cache.
+            stats: Counters to update.  Defaults to new counters.
+        """
+        self.max_bytes = max_bytes
+        self.stats = stats if stats is not None else CacheStats()
+        self._entries: collections.OrderedDict[
+            bytes, tuple[problemlib.BaseInput, int]
+        ] = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        # Pickled to pass to worker processes, which start out empty.
+        return type(self), (self.max_bytes, self.stats)
+
+    def __contains__(self, key: bytes) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: bytes) -> problemlib.BaseInput | None:
+        """Looks up a parsed input, marking it most recently used.
+
+        Args:
+            key: Input digest.
+
+        Returns:
+            The parsed input, or None if it is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: bytes, parsed: problemlib.BaseInput) -> None:
+        """Stores a parsed input, evicting the least recently used.
+
+        Inputs larger than the whole budget are not stored.
+
+        Args:
+            key: Input digest.
+            parsed: Parsed input.
+        """
+        size = estimate_size(parsed)
+        if size > self.max_bytes:
+            return
+        replaced = 0
+        evicted = 0
+        freed = 0
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                replaced = 1
+                freed += old[1]
+            self._entries[key] = (parsed, size)
+            self._bytes += size - freed
+            while self._bytes > self.max_bytes:
+                _, (_, old_size) = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                freed += old_size
+                evicted += 1
+        self.stats.add(
+            evictions=evicted,
+            entries=1 - replaced - evicted,
+            bytes=size - freed,
+        )
+
+    def lookup(self, key: bytes) -> problemlib.BaseInput | None:
+        """Looks up a parsed input by digest alone, counting a hit or miss.
+
+        Args:
+            key: Input digest.
+
+        Returns:
+            The parsed input, or None if it is not cached.
+        """
+        parsed = self.get(key)
+        if parsed is None:
+            self.stats.add(misses=1)
+        else:
+            self.stats.add(hits=1)
+        return parsed
+
+    def parse(
+        self,
+        content: Any,
+        read: Callable[[Any], problemlib.BaseInput],
+        *,
+        key: bytes | None = None,
+    ) -> problemlib.BaseInput:
+        """Gets a parsed input, parsing and storing it on a miss.
+
+        Args:
+            content: Input file bytes, or anything else ``read`` accepts if
+                ``key`` is given.
+            read: Parses the input from ``content``.
+            key: Digest of the input file bytes, if already known.
+
+        Returns:
+            The parsed input.
+
+        Raises:
+            problemlib.FileFormatError: The input has formatting errors.
+        """
+        if self.max_bytes <= 0:
+            return read(content)
+        if key is None:
+            key = digest(content)
+        parsed = self.get(key)
+        if parsed is not None:
+            self.stats.add(hits=1)
+            return parsed
+        self.stats.add(misses=1)
+        parsed = read(content)
+        self.put(key, parsed)
+        return parsed
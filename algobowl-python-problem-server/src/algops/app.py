@@ -2,19 +2,31 @@
 
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import contextlib
 import dataclasses
 import enum
+import functools
+import hashlib
+import importlib
+import inspect
 import io
+import os
+import pathlib
 import random
-from collections.abc import Awaitable, Callable, Iterable
-from typing import Any, Self
+import sys
+import tempfile
+import threading
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from typing import Any, BinaryIO, Self
 
 import starlette.applications
 import starlette.requests
 import starlette.responses
 import starlette.routing
 
-from algops import _connect, problemlib
+from algops import _connect, _input_cache, problemlib
 from algops.proto.algobowl.problemsupport.v1 import problem_support_pb2
 
 RANK_SORT_MINIMIZATION = problem_support_pb2.RANK_SORT_MINIMIZATION
@@ -28,6 +40,38 @@ _SERVICE_DESCRIPTOR = problem_support_pb2.DESCRIPTOR.services_by_name[
     "ProblemSupportService"
 ]
 
+# Methods which run problem code, and so may be moved off the event loop.
+_OFFLOADED_METHODS = frozenset(
+    {
+        "GenerateInput",
+        "RegisterInput",
+        "Solve",
+        "VerifyInput",
+        "VerifyOutput",
+        "VerifyOutputStream",
+        "VerifyOutputs",
+    }
+)
+# Bytes read at a time when comparing a streamed output with its
+# normalized form.
+_FILE_COMPARE_CHUNK = 1024 * 1024
+
+
+class Executor(enum.Enum):
+    """Where RPC handlers which run problem code are executed.
+
+    Attributes:
+        INLINE: On the event loop.  Required on runtimes without threads or
+            subprocesses, such as Cloudflare Workers.
+        THREAD: In a thread pool.  Useful if problem code releases the GIL.
+        PROCESS: In a process pool, with the problem module imported in each
+            worker ahead of time.
+    """
+
+    INLINE = "inline"
+    THREAD = "thread"
+    PROCESS = "process"
+
 
 class StatementFormat(enum.Enum):
     """Problem statement file formats."""
@@ -113,6 +157,48 @@ def _make_rpc_endpoint(
     return endpoint
 
 
+def _make_client_stream_endpoint(
+    request_type: type[Any],
+    handler: Callable[..., Awaitable[Any]],
+) -> Callable[[starlette.requests.Request], Awaitable[starlette.responses.Response]]:
+    """Builds a Starlette endpoint for one client streaming RPC method.
+
+    Args:
+        request_type: Protobuf request message type.
+        handler: RPC handler coroutine function.
+
+    Returns:
+        Starlette endpoint coroutine function.
+    """
+
+    async def endpoint(
+        request: starlette.requests.Request,
+    ) -> starlette.responses.Response:
+        """Handles one client streaming RPC request."""
+        return await _connect.handle_client_stream_rpc(request, request_type, handler)
+
+    return endpoint
+
+
+@dataclasses.dataclass(frozen=True)
+class _SpooledOutput:
+    """A streamed output verification, with its files written to disk.
+
+    Attributes:
+        input_digest: Digest of the input.
+        input_path: Path of the input file, or None if the input was
+            referenced by digest.
+        output_path: Path of the output file.
+        accept_unchanged: Whether the client accepts an ``unchanged`` flag
+            in place of normalized content identical to the output.
+    """
+
+    input_digest: bytes
+    input_path: str | None
+    output_path: str
+    accept_unchanged: bool = False
+
+
 class ProblemSupportApplication:
     """ASGI application exposing the problem support RPC API."""
 
@@ -124,6 +210,11 @@ class ProblemSupportApplication:
         rank_sort: int,
         score_decimal_places: int = 0,
         statements: Iterable[Statement | problem_support_pb2.StatementInfo] = (),
+        executor: Executor = Executor.INLINE,
+        max_concurrency: int | None = None,
+        max_queue_depth: int | None = None,
+        version: str | None = None,
+        input_cache_bytes: int = _input_cache.DEFAULT_MAX_BYTES,
     ) -> None:
         """Create an ASGI problem support application.
 
@@ -136,32 +227,79 @@ class ProblemSupportApplication:
             statements: Statements to include in GetProblemInfo responses.
                 Root-relative URLs (e.g. ``/statement.pdf``) are resolved
                 against each request's origin.
+            executor: Where to run handlers which call problem code.
+            max_concurrency: Number of those handlers to run at once, when not
+                inline.  Defaults to the number of CPUs.
+            max_queue_depth: Number of requests which may wait for a worker
+                before new ones fail with ``resource_exhausted``.  None means
+                no limit.
+            version: Problem version reported in GetProblemInfo, which
+                clients use to scope cached verification results.  Defaults
+                to a hash of the source of the modules defining the input and
+                output types.
+            input_cache_bytes: Memory budget for parsed inputs kept between
+                verifications, per process.  0 disables the cache, as does
+                setting ``cacheable = False`` on the input type.
         """
         self._input_type = input_type
         self._output_type = output_type
         self._rank_sort = rank_sort
         self._score_decimal_places = score_decimal_places
         self._statements = tuple(statements)
+        self._version = (
+            version if version is not None else _source_version(input_type, output_type)
+        )
+        self._executor = executor
+        self._max_concurrency = max_concurrency or os.cpu_count() or 1
+        self._max_queue_depth = max_queue_depth
+        self._pools: list[concurrent.futures.Executor] = []
+        self._pool_loads: list[int] = []
+        self._pool_lock = threading.Lock()
+        self._slots = asyncio.Semaphore(self._max_concurrency)
+        self._in_flight = 0
+        self._input_cache_bytes = input_cache_bytes if input_type.cacheable else 0
+        self._input_cache = _input_cache.InputCache(
+            self._input_cache_bytes,
+            _input_cache.CacheStats.shared() if executor is Executor.PROCESS else None,
+        )
 
-        handlers = {
+        self._handlers = {
             "GenerateInput": self._handle_generate_input,
             "GetProblemInfo": self._handle_get_problem_info,
+            "RegisterInput": self._handle_register_input,
             "Solve": self._handle_solve,
             "VerifyInput": self._handle_verify_input,
             "VerifyOutput": self._handle_verify_output,
+            "VerifyOutputStream": self._handle_spooled_output,
+            "VerifyOutputs": self._handle_verify_outputs,
+        }
+        stream_handlers = {
+            "VerifyOutputStream": self._receive_output_stream,
         }
         routes = [
             starlette.routing.Route(
                 f"/{method.containing_service.full_name}/{method.name}",
-                endpoint=_make_rpc_endpoint(
+                endpoint=_make_client_stream_endpoint(
+                    getattr(problem_support_pb2, method.input_type.name),
+                    stream_handlers[method.name],
+                )
+                if method.client_streaming
+                else _make_rpc_endpoint(
                     getattr(problem_support_pb2, method.input_type.name),
-                    handlers[method.name],
+                    self._endpoint_handler(method.name),
                 ),
                 methods=["POST"],
             )
             for method in _SERVICE_DESCRIPTOR.methods
         ]
-        self._app = starlette.applications.Starlette(routes=routes)
+        routes.append(
+            starlette.routing.Route(
+                "/algops/stats", endpoint=self._stats_endpoint, methods=["GET"]
+            )
+        )
+        self._app = starlette.applications.Starlette(
+            routes=routes, lifespan=self._lifespan
+        )
 
     async def __call__(
         self,
@@ -178,6 +316,204 @@ class ProblemSupportApplication:
         """
         await self._app(scope, receive, send)
 
+    @contextlib.asynccontextmanager
+    async def _lifespan(
+        self, _app: starlette.applications.Starlette
+    ) -> AsyncIterator[None]:
+        """Shuts down the worker pool when the server stops.
+
+        Args:
+            _app: Starlette application.
+
+        Yields:
+            None, while the server is running.
+        """
+        yield
+        with self._pool_lock:
+            pools, self._pools = self._pools, []
+        for pool in pools:
+            pool.shutdown(cancel_futures=True)
+
+    def _endpoint_handler(self, method_name: str) -> Callable[..., Any]:
+        """Returns the handler to route an RPC method to.
+
+        Args:
+            method_name: RPC method name.
+
+        Returns:
+            The handler itself, or a coroutine function running it in the
+            worker pool.
+        """
+        if self._executor is Executor.INLINE or method_name not in _OFFLOADED_METHODS:
+            return self._handlers[method_name]
+        return functools.partial(self._run_in_pool, method_name)
+
+    def _get_pools(self) -> list[concurrent.futures.Executor]:
+        """Gets the worker pools, starting them on first use.
+
+        A process pool is made of one single-process pool per worker, so each
+        request can be sent to a chosen worker; see :meth:`_choose_pool`.
+
+        Returns:
+            The thread pool, or one pool per worker process.
+        """
+        with self._pool_lock:
+            if not self._pools:
+                if self._executor is Executor.THREAD:
+                    self._pools = [
+                        concurrent.futures.ThreadPoolExecutor(
+                            max_workers=self._max_concurrency,
+                            thread_name_prefix="algops",
+                        )
+                    ]
+                else:
+                    self._pools = [
+                        concurrent.futures.ProcessPoolExecutor(
+                            max_workers=1,
+                            initializer=_init_worker,
+                            initargs=(
+                                list(sys.path),
+                                _type_ref(self._input_type),
+                                _type_ref(self._output_type),
+                                self._rank_sort,
+                                self._input_cache,
+                            ),
+                        )
+                        for _ in range(self._max_concurrency)
+                    ]
+                self._pool_loads = [0] * len(self._pools)
+            return self._pools
+
+    def _choose_pool(self, method_name: str, request: Any) -> int:
+        """Chooses the worker pool to run a request in.
+
+        Each worker process has its own input cache, so a request which
+        registers or references an input by digest goes to the worker chosen
+        by that digest: the one which registered it.  Other requests go to
+        the worker with the fewest requests in flight.
+
+        Args:
+            method_name: RPC method name.
+            request: RPC request message.
+
+        Returns:
+            Index of the pool in :meth:`_get_pools`.
+        """
+        pools = self._get_pools()
+        if len(pools) == 1:
+            return 0
+        key = _route_key(method_name, request)
+        if key is not None:
+            return int.from_bytes(key[:8], "big") % len(pools)
+        return min(range(len(pools)), key=self._pool_loads.__getitem__)
+
+    async def _run_in_pool(
+        self,
+        method_name: str,
+        request: Any,
+        *,
+        scope: dict[str, Any] | None = None,
+    ) -> Any:
+        """Runs an RPC handler in the worker pool.
+
+        Args:
+            method_name: RPC method name.
+            request: RPC request message.
+            scope: ASGI scope for the request.
+
+        Returns:
+            RPC response message.
+
+        Raises:
+            _connect.ConnectError: Too many requests are already waiting.
+        """
+        del scope
+        if (
+            self._max_queue_depth is not None
+            and self._in_flight >= self._max_concurrency + self._max_queue_depth
+        ):
+            raise _connect.ConnectError(
+                "resource_exhausted", "server is busy, try again later"
+            )
+        self._in_flight += 1
+        try:
+            async with self._slots:
+                if self._executor is Executor.THREAD:
+                    call = functools.partial(self._handlers[method_name], request)
+                else:
+                    call = functools.partial(_run_in_worker, method_name, request)
+                index = self._choose_pool(method_name, request)
+                self._pool_loads[index] += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._get_pools()[index], call)
+                finally:
+                    self._pool_loads[index] -= 1
+        finally:
+            self._in_flight -= 1
+
+    async def _stats_endpoint(
+        self, _request: starlette.requests.Request
+    ) -> starlette.responses.Response:
+        """Reports cache statistics as JSON.
+
+        With a process pool, counters are totals over every worker.
+
+        Args:
+            _request: HTTP request.
+
+        Returns:
+            JSON response.
+        """
+        stats = self._input_cache.stats.snapshot()
+        lookups = stats["hits"] + stats["misses"]
+        stats["max_bytes"] = self._input_cache_bytes
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return starlette.responses.JSONResponse({"input_cache": stats})
+
+    def _read_input(
+        self, content: bytes, *, key: bytes | None = None
+    ) -> problemlib.BaseInput:
+        """Parses an input, reusing a cached parse of the same bytes.
+
+        Args:
+            content: Input file bytes.
+            key: Digest of the bytes, if already known.
+
+        Returns:
+            Parsed input.
+
+        Raises:
+            problemlib.FileFormatError: The input has formatting errors.
+        """
+        return self._input_cache.parse(
+            content, lambda data: self._input_type.read(io.BytesIO(data)), key=key
+        )
+
+    def _request_input(
+        self,
+        request: problem_support_pb2.VerifyOutputRequest
+        | problem_support_pb2.VerifyOutputsRequest,
+    ) -> problemlib.BaseInput:
+        """Gets the parsed input of a verify request, sent or referenced.
+
+        Args:
+            request: VerifyOutput or VerifyOutputs request.
+
+        Returns:
+            Parsed input.
+
+        Raises:
+            problemlib.FileFormatError: The input has formatting errors.
+            _connect.ConnectError: The referenced input is not registered.
+        """
+        if request.WhichOneof("input") == "input_digest":
+            parsed = self._input_cache.lookup(request.input_digest)
+            if parsed is None:
+                raise _connect.ConnectError("not_found", "input is not registered")
+            return parsed
+        return self._read_input(request.input_content)
+
     def _handle_generate_input(
         self,
         request: problem_support_pb2.GenerateInputRequest,
@@ -231,8 +567,47 @@ class ProblemSupportApplication:
             ],
             supported_solvers=self._supported_solvers(),
             supports_generate_input=self._supports_generate_input(),
+            version=self._version,
         )
 
+    def _handle_register_input(
+        self,
+        request: problem_support_pb2.RegisterInputRequest,
+        *,
+        scope: dict[str, Any] | None = None,
+    ) -> problem_support_pb2.RegisterInputResponse:
+        """Handles a RegisterInput RPC.
+
+        The parsed input is kept in the input cache, where verify requests
+        can reference it by digest until it is evicted.
+
+        Args:
+            request: RegisterInput request.
+            scope: ASGI scope for the request.
+
+        Returns:
+            RegisterInput response.
+
+        Raises:
+            _connect.ConnectError: The input cache is disabled, or the input
+                is too large to keep.
+        """
+        del scope
+        if self._input_cache_bytes <= 0:
+            raise _connect.ConnectError(
+                "unimplemented", "input registration is disabled"
+            )
+        key = _input_cache.digest(request.content)
+        try:
+            self._read_input(request.content, key=key)
+        except problemlib.FileFormatError as exc:
+            return problem_support_pb2.RegisterInputResponse(format_error=str(exc))
+        if key not in self._input_cache:
+            raise _connect.ConnectError(
+                "failed_precondition", "input is too large to register"
+            )
+        return problem_support_pb2.RegisterInputResponse(input_digest=key)
+
     def _handle_solve(
         self,
         request: problem_support_pb2.SolveRequest,
@@ -289,9 +664,10 @@ class ProblemSupportApplication:
             parsed = self._input_type.read(io.BytesIO(request.content))
         except problemlib.FileFormatError as exc:
             return problem_support_pb2.VerifyInputResponse(format_error=str(exc))
-        return problem_support_pb2.VerifyInputResponse(
-            normalized_content=_write_to_bytes(parsed)
-        )
+        normalized = _write_to_bytes(parsed)
+        if request.accept_unchanged and normalized == request.content:
+            return problem_support_pb2.VerifyInputResponse(unchanged=True)
+        return problem_support_pb2.VerifyInputResponse(normalized_content=normalized)
 
     def _handle_verify_output(
         self,
@@ -310,17 +686,200 @@ class ProblemSupportApplication:
         """
         del scope
         try:
-            parsed_input = self._input_type.read(io.BytesIO(request.input_content))
-            parsed_output = self._output_type.read(
-                parsed_input, io.BytesIO(request.output_content)
+            parsed_input = self._request_input(request)
+        except problemlib.FileFormatError as exc:
+            return problem_support_pb2.VerifyOutputResponse(format_error=str(exc))
+        return self._verify_output(
+            parsed_input,
+            io.BytesIO(request.output_content),
+            same_as=request.output_content.__eq__ if request.accept_unchanged else None,
+        )
+
+    def _handle_verify_outputs(
+        self,
+        request: problem_support_pb2.VerifyOutputsRequest,
+        *,
+        scope: dict[str, Any] | None = None,
+    ) -> problem_support_pb2.VerifyOutputsResponse:
+        """Handles a VerifyOutputs RPC.
+
+        The input is parsed once and shared by every output in the request.
+
+        Args:
+            request: VerifyOutputs request.
+            scope: ASGI scope for the request.
+
+        Returns:
+            VerifyOutputs response.
+        """
+        del scope
+        try:
+            parsed_input = self._request_input(request)
+        except problemlib.FileFormatError as exc:
+            return problem_support_pb2.VerifyOutputsResponse(
+                input_format_error=str(exc)
             )
+        return problem_support_pb2.VerifyOutputsResponse(
+            results=[
+                self._verify_output(
+                    parsed_input,
+                    io.BytesIO(output_content),
+                    same_as=output_content.__eq__ if request.accept_unchanged else None,
+                )
+                for output_content in request.output_contents
+            ]
+        )
+
+    async def _receive_output_stream(
+        self,
+        messages: AsyncIterator[problem_support_pb2.VerifyOutputChunk],
+        *,
+        scope: dict[str, Any] | None = None,
+    ) -> problem_support_pb2.VerifyOutputResponse:
+        """Handles a VerifyOutputStream RPC.
+
+        Chunks are written to temporary files as they arrive, so only one
+        chunk is held in memory at a time.  The files are then verified like
+        a VerifyOutput request, in the worker pool if there is one.
+
+        Args:
+            messages: Streamed request messages.
+            scope: ASGI scope for the request.
+
+        Returns:
+            VerifyOutput response.
+
+        Raises:
+            _connect.ConnectError: The chunks are out of order, or the
+                referenced input is not registered.
+        """
+        with tempfile.TemporaryDirectory(prefix="algops-") as tmpdir:
+            input_path = pathlib.Path(tmpdir) / "input"
+            output_path = pathlib.Path(tmpdir) / "output"
+            input_hash = hashlib.sha256()
+            input_digest = None
+            seen_output = False
+            accept_unchanged = False
+            with (
+                input_path.open("wb") as input_file,
+                output_path.open("wb") as output_file,
+            ):
+                async for message in messages:
+                    kind = message.WhichOneof("chunk")
+                    if kind == "accept_unchanged":
+                        accept_unchanged = message.accept_unchanged
+                        continue
+                    if kind == "output_content":
+                        seen_output = True
+                        output_file.write(message.output_content)
+                        continue
+                    if seen_output:
+                        raise _connect.ConnectError(
+                            "invalid_argument", "input must be sent before output"
+                        )
+                    if kind == "input_digest":
+                        input_digest = message.input_digest
+                    elif kind == "input_content":
+                        input_hash.update(message.input_content)
+                        input_file.write(message.input_content)
+            spooled = _SpooledOutput(
+                input_digest=input_digest or input_hash.digest(),
+                input_path=None if input_digest else str(input_path),
+                output_path=str(output_path),
+                accept_unchanged=accept_unchanged,
+            )
+            response = self._endpoint_handler("VerifyOutputStream")(
+                spooled, scope=scope
+            )
+            if inspect.isawaitable(response):
+                response = await response
+            return response
+
+    def _handle_spooled_output(
+        self,
+        spooled: _SpooledOutput,
+        *,
+        scope: dict[str, Any] | None = None,
+    ) -> problem_support_pb2.VerifyOutputResponse:
+        """Verifies a streamed output from its temporary files.
+
+        Args:
+            spooled: Streamed output verification.
+            scope: ASGI scope for the request.
+
+        Returns:
+            VerifyOutput response.
+
+        Raises:
+            _connect.ConnectError: The referenced input is not registered.
+        """
+        del scope
+        if spooled.input_path is None:
+            parsed_input = self._input_cache.lookup(spooled.input_digest)
+            if parsed_input is None:
+                raise _connect.ConnectError("not_found", "input is not registered")
+        else:
+            try:
+                parsed_input = self._input_cache.parse(
+                    spooled.input_path, self._read_input_file, key=spooled.input_digest
+                )
+            except problemlib.FileFormatError as exc:
+                return problem_support_pb2.VerifyOutputResponse(format_error=str(exc))
+        with open(spooled.output_path, "rb") as output_file:
+            return self._verify_output(
+                parsed_input,
+                output_file,
+                same_as=functools.partial(_file_matches, spooled.output_path)
+                if spooled.accept_unchanged
+                else None,
+            )
+
+    def _read_input_file(self, path: str) -> problemlib.BaseInput:
+        """Parses an input from a file.
+
+        Args:
+            path: Path of the input file.
+
+        Returns:
+            Parsed input.
+
+        Raises:
+            problemlib.FileFormatError: The input has formatting errors.
+        """
+        with open(path, "rb") as f:
+            return self._input_type.read(f)
+
+    def _verify_output(
+        self,
+        parsed_input: problemlib.BaseInput,
+        output_file: BinaryIO,
+        *,
+        same_as: Callable[[bytes], bool] | None = None,
+    ) -> problem_support_pb2.VerifyOutputResponse:
+        """Parses and verifies one output against a parsed input.
+
+        Args:
+            parsed_input: Parsed input the output was produced for.
+            output_file: Output file.
+            same_as: Checks whether normalized content is identical to the
+                output sent, if the client accepts the ``unchanged`` flag.
+
+        Returns:
+            VerifyOutput response for the output.
+        """
+        try:
+            parsed_output = self._output_type.read(parsed_input, output_file)
         except problemlib.FileFormatError as exc:
             return problem_support_pb2.VerifyOutputResponse(format_error=str(exc))
 
         verified = problem_support_pb2.VerifiedOutput(
-            normalized_content=_write_to_bytes(parsed_output),
             reported_score=parsed_output.score,
         )
+        normalized = _write_to_bytes(parsed_output)
+        if same_as is not None and same_as(normalized):
+            verified.unchanged = True
+        else:
+            verified.normalized_content = normalized
 
         try:
             self._verify_output_score(parsed_output, verified)
@@ -416,17 +975,154 @@ class ProblemSupportApplication:
         )
 
 
+_worker_app: ProblemSupportApplication | None = None
+
+
+def _source_version(*types: type[Any]) -> str:
+    """Computes a version string from the source of the given classes' modules.
+
+    Args:
+        *types: Classes whose defining modules make up the problem.
+
+    Returns:
+        Hex digest of the module sources, or an empty string if any source is
+        unavailable.
+    """
+    digest = hashlib.sha256()
+    for module_name in sorted({type_.__module__ for type_ in types}):
+        try:
+            source = inspect.getsource(sys.modules[module_name])
+        except (KeyError, OSError, TypeError):
+            return ""
+        digest.update(source.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _type_ref(type_: type[Any]) -> tuple[str, str]:
+    """Returns an importable reference to a class.
+
+    Args:
+        type_: Class to reference.
+
+    Returns:
+        Module name and qualified name of the class.
+    """
+    return type_.__module__, type_.__qualname__
+
+
+def _import_type(ref: tuple[str, str]) -> type[Any]:
+    """Imports a class from a reference made by _type_ref.
+
+    Args:
+        ref: Module name and qualified name of the class.
+
+    Returns:
+        The class.
+    """
+    module_name, qualname = ref
+    value = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        value = getattr(value, name)
+    return value
+
+
+def _init_worker(
+    path: list[str],
+    input_type_ref: tuple[str, str],
+    output_type_ref: tuple[str, str],
+    rank_sort: int,
+    input_cache: _input_cache.InputCache,
+) -> None:
+    """Imports the problem module in a new worker process.
+
+    Args:
+        path: Module search path of the parent process.
+        input_type_ref: Reference to the problem's Input class.
+        output_type_ref: Reference to the problem's Output class.
+        rank_sort: Optimization direction of the problem.
+        input_cache: Empty input cache, with counters shared with the parent.
+    """
+    global _worker_app  # noqa: PLW0603
+    sys.path[:] = path
+    _worker_app = ProblemSupportApplication(
+        input_type=_import_type(input_type_ref),
+        output_type=_import_type(output_type_ref),
+        rank_sort=rank_sort,
+    )
+    _worker_app._input_cache = input_cache  # noqa: SLF001
+
+
+def _route_key(method_name: str, request: Any) -> bytes | None:
+    """Gets the digest of the input an offloaded request registers or needs.
+
+    Args:
+        method_name: RPC method name.
+        request: RPC request message.
+
+    Returns:
+        The input digest, or None if the request does not name an input by
+        digest.
+    """
+    if method_name == "RegisterInput":
+        return _input_cache.digest(request.content)
+    if method_name == "VerifyOutputStream":
+        return request.input_digest
+    if (
+        method_name in {"VerifyOutput", "VerifyOutputs"}
+        and request.WhichOneof("input") == "input_digest"
+    ):
+        return request.input_digest
+    return None
+
+
+def _run_in_worker(method_name: str, request: Any) -> Any:
+    """Runs an RPC handler in a worker process.
+
+    Args:
+        method_name: RPC method name.
+        request: RPC request message.
+
+    Returns:
+        RPC response message.
+    """
+    return _worker_app._handlers[method_name](request)  # noqa: SLF001
+
+
+def _file_matches(path: str, content: bytes) -> bool:
+    """Checks whether a file holds exactly the given bytes.
+
+    Args:
+        path: Path of the file.
+        content: Expected file contents.
+
+    Returns:
+        True if the file's contents are identical to ``content``.
+    """
+    path = pathlib.Path(path)
+    if path.stat().st_size != len(content):
+        return False
+    view = memoryview(content)
+    with path.open("rb") as f:
+        offset = 0
+        while chunk := f.read(_FILE_COMPARE_CHUNK):
+            if view[offset : offset + len(chunk)] != chunk:
+                return False
+            offset += len(chunk)
+    return offset == len(content)
+
+
 def _write_to_bytes(value: problemlib.BaseInput | problemlib.BaseOutput) -> bytes:
     """Writes a problem value to UTF-8 bytes.
 
+    The value is written to an in-memory text buffer, which is encoded
+    once at the end, rather than encoding each small write as it is made.
+
     Args:
         value: Input or output object to write.
 
     Returns:
         Serialized value bytes.
     """
-    buffer = io.BytesIO()
-    text = io.TextIOWrapper(buffer, encoding="utf-8", write_through=True)
+    text = io.StringIO()
     value.write(text)
-    text.flush()
-    return buffer.getvalue()
+    return text.getvalue().encode("utf-8")
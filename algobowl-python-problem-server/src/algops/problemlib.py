@@ -3,12 +3,17 @@
 from __future__ import annotations
 
 import dataclasses
+import functools
+import itertools
 import random
-from collections.abc import Callable, Sequence
-from typing import Any, Self
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import Any, ClassVar, Self
 
 Bound = int | range | Sequence[int] | Callable[[int], bool] | None
 
+# Number of lines formatted at a time by write_lines and write_matrix.
+_WRITE_BATCH = 4096
+
 
 class FileFormatError(Exception):
     """Raised when an input or output file has formatting errors."""
@@ -24,7 +29,15 @@ class ProblemTestError(Exception):
 
 @dataclasses.dataclass
 class BaseInput:
-    """Base class for problem input files."""
+    """Base class for problem input files.
+
+    Attributes:
+        cacheable: Whether parsed inputs may be cached and shared between
+            requests.  Set to False if verifying an output may modify the
+            input object.
+    """
+
+    cacheable: ClassVar[bool] = True
 
     @classmethod
     def read(cls, f: Any) -> Self:
@@ -221,7 +234,29 @@ def parse_line_ints(
     Raises:
         FileFormatError: The line has the wrong count or invalid values.
     """
-    line = lines[lineno]
+    return _parse_ints(lines[lineno], lineno, bounds, count)
+
+
+def _parse_ints(
+    line: Any,
+    lineno: int,
+    bounds: Bound | Sequence[Bound],
+    count: Bound,
+) -> list[int]:
+    """Parses whitespace-separated integers from a line's contents.
+
+    Args:
+        line: Line contents.
+        lineno: Zero-based line number for error reporting.
+        bounds: Bound or per-value bounds for parsed integers.
+        count: Expected number of values on the line.
+
+    Returns:
+        Parsed integers.
+
+    Raises:
+        FileFormatError: The line has the wrong count or invalid values.
+    """
     line_split = line.split()
     try:
         check_bound(lineno, count, len(line_split))
@@ -256,3 +291,284 @@ def parse_line_int(
         Parsed integer.
     """
     return parse_line_ints(lines, lineno, bounds=bounds, count=1)[0]
+
+
+def parse_int_matrix(
+    lines: Sequence[Any],
+    start: int,
+    rows: int,
+    cols: int,
+    bounds: Bound | Sequence[Bound] = None,
+) -> list[tuple[int, ...]]:
+    """Parses consecutive lines of whitespace-separated integers.
+
+    This parses the same values, and raises the same errors, as calling
+    ``parse_line_ints(lines, i, bounds=bounds, count=cols)`` for each line,
+    but is much faster for large files: the lines are parsed in bulk, and
+    each column is bounds checked at once.  Rows are returned as tuples,
+    which are cheaper to build and to keep than lists.
+
+    Args:
+        lines: File lines.
+        start: Zero-based line number of the first row.
+        rows: Number of lines to parse.
+        cols: Number of values expected on each line.
+        bounds: Bound for every parsed integer, or a sequence of ``cols``
+            bounds, one per column.
+
+    Returns:
+        Parsed integers, one tuple per line.
+
+    Raises:
+        FileFormatError: The file has too few lines, or a line has the
+            wrong count or invalid values.
+    """
+    if start + rows > len(lines):
+        raise FileFormatError("File has invalid number of lines")
+    return _parse_int_rows(lines[start : start + rows], start, bounds, cols)
+
+
+def _parse_int_rows(
+    lines: Sequence[Any],
+    start: int,
+    bounds: Bound | Sequence[Bound],
+    cols: int,
+) -> list[tuple[int, ...]]:
+    """Parses lines of integers in bulk.
+
+    The whole block is split and converted at once.  Any error sends every
+    line through ``_parse_ints``, to raise the same error, for the same
+    line, as parsing line by line would.
+
+    Args:
+        lines: Lines to parse.
+        start: Zero-based line number of the first line.
+        bounds: Bound or per-column bounds for parsed integers.
+        cols: Number of values expected on each line.
+
+    Returns:
+        Parsed integers, one tuple per line.
+
+    Raises:
+        FileFormatError: A line has the wrong count or invalid values.
+    """
+    if not lines:
+        return []
+    values = None
+    if cols > 0 and all(len(line.split()) == cols for line in lines):
+        space = b" " if isinstance(lines[0], bytes) else " "
+        try:
+            values = list(map(int, space.join(lines).split()))
+        except ValueError:
+            values = None
+    if values is None or not _columns_in_bounds(values, cols, bounds):
+        return [
+            tuple(_parse_ints(line, lineno, bounds, cols))
+            for lineno, line in enumerate(lines, start)
+        ]
+    return list(zip(*[iter(values)] * cols, strict=True))
+
+
+def _columns_in_bounds(
+    values: list[int],
+    cols: int,
+    bounds: Bound | Sequence[Bound],
+) -> bool:
+    """Checks whole columns of parsed integers against their bounds.
+
+    Args:
+        values: Parsed integers, row by row.
+        cols: Number of columns.
+        bounds: Bound or per-column bounds, as for ``_parse_ints``.
+
+    Returns:
+        True if every value is within its column's bound.
+    """
+    if isinstance(bounds, range) or not (
+        isinstance(bounds, Sequence) and len(bounds) == cols
+    ):
+        bounds = [bounds] * cols
+    for col, bound in enumerate(bounds):
+        column = values[col::cols]
+        if bound is None or not column:
+            continue
+        if isinstance(bound, int):
+            ok = column.count(bound) == len(column)
+        elif callable(bound):
+            ok = all(map(bound, column))
+        elif isinstance(bound, range) and bound.step == 1:
+            ok = bound.start <= min(column) and max(column) < bound.stop
+        else:
+            ok = all(map(bound.__contains__, column))
+        if not ok:
+            return False
+    return True
+
+
+class LineReader:
+    """Reads a file one line at a time.
+
+    Unlike reading every line up front with ``f.readlines()``, only the
+    current line is held in memory, so large files (such as outputs
+    streamed by ``VerifyOutputStream``) can be parsed in bounded memory.
+    Error messages use the same line numbers as the other helpers.
+
+    Attributes:
+        lineno: Zero-based number of the last line read, or -1 if none.
+    """
+
+    def __init__(self, f: Any) -> None:
+        """Initializes a reader.
+
+        Args:
+            f: File-like object to read from.
+        """
+        self._f = f
+        self.lineno = -1
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterates over the remaining lines."""
+        for line in self._f:
+            self.lineno += 1
+            yield line
+
+    def next_line(self) -> Any:
+        """Reads the next line.
+
+        Returns:
+            The line.
+
+        Raises:
+            FileFormatError: The file has no more lines.
+        """
+        line = self._f.readline()
+        if not line:
+            raise FileFormatError("File has invalid number of lines")
+        self.lineno += 1
+        return line
+
+    def next_ints(
+        self,
+        bounds: Bound | Sequence[Bound] = None,
+        count: Bound = None,
+    ) -> list[int]:
+        """Parses whitespace-separated integers from the next line.
+
+        Args:
+            bounds: Bound or per-value bounds for parsed integers.
+            count: Expected number of values on the line.
+
+        Returns:
+            Parsed integers.
+
+        Raises:
+            FileFormatError: The file has no more lines, or the line has the
+                wrong count or invalid values.
+        """
+        line = self.next_line()
+        return _parse_ints(line, self.lineno, bounds, count)
+
+    def next_int(self, bounds: Bound = None) -> int:
+        """Parses one integer from the next line.
+
+        Args:
+            bounds: Bound for the parsed integer.
+
+        Returns:
+            Parsed integer.
+        """
+        return self.next_ints(bounds=bounds, count=1)[0]
+
+    def next_int_matrix(
+        self,
+        rows: int,
+        cols: int,
+        bounds: Bound | Sequence[Bound] = None,
+    ) -> list[tuple[int, ...]]:
+        """Parses the next lines of whitespace-separated integers in bulk.
+
+        Like ``parse_int_matrix``, this is much faster than calling
+        ``next_ints`` for each line, and raises the same errors.
+
+        Args:
+            rows: Number of lines to parse.
+            cols: Number of values expected on each line.
+            bounds: Bound for every parsed integer, or a sequence of
+                ``cols`` bounds, one per column.
+
+        Returns:
+            Parsed integers, one tuple per line.
+
+        Raises:
+            FileFormatError: The file has too few lines, or a line has the
+                wrong count or invalid values.
+        """
+        lines = list(itertools.islice(self._f, rows))
+        if len(lines) < rows:
+            raise FileFormatError("File has invalid number of lines")
+        start = self.lineno + 1
+        self.lineno += rows
+        return _parse_int_rows(lines, start, bounds, cols)
+
+    def finish(self) -> None:
+        """Checks that the rest of the file is blank.
+
+        Raises:
+            FileFormatError: The file has more lines.
+        """
+        for line in self:
+            if line.strip():
+                raise FileFormatError("File has invalid number of lines")
+
+
+def write_lines(f: Any, values: Iterable[Any]) -> None:
+    """Writes values to a file, one per line.
+
+    This writes the same text as ``print(value, file=f)`` for each value,
+    but formats many lines with each call to ``f.write``, which is several
+    times faster for large files.
+
+    Args:
+        f: Text file-like object to write to.
+        values: Values to write.
+    """
+    values = iter(values)
+    while batch := tuple(itertools.islice(values, _WRITE_BATCH)):
+        f.write(_line_format(1) * len(batch) % batch)
+
+
+def write_matrix(f: Any, rows: Iterable[Sequence[Any]]) -> None:
+    """Writes rows of values to a file, one row per line.
+
+    This writes the same text as ``print(*row, file=f)`` for each row,
+    but formats many lines with each call to ``f.write``, which is several
+    times faster for large files.
+
+    Args:
+        f: Text file-like object to write to.
+        rows: Rows of values to write, separated by spaces.
+    """
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, _WRITE_BATCH)):
+        cols = len(batch[0])
+        if all(len(row) == cols for row in batch):
+            f.write(
+                _line_format(cols)
+                * len(batch)
+                % tuple(itertools.chain.from_iterable(batch))
+            )
+        else:
+            f.write("".join(_line_format(len(row)) % tuple(row) for row in batch))
+
+
+@functools.lru_cache(maxsize=64)
+def _line_format(cols: int) -> str:
+    """Builds a format string for a line of space-separated values.
+
+    Args:
+        cols: Number of values on the line.
+
+    Returns:
+        Format string taking ``cols`` values.
+    """
+    return " ".join(["%s"] * cols) + "\n"
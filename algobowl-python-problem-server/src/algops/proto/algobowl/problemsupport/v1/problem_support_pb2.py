@@ -24,19 +24,19 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n0algobowl/problemsupport/v1/problem_support.proto\x12\x1a\x61lgobowl.problemsupport.v1\"f\n\rStatementInfo\x12\x43\n\x06\x66ormat\x18\x01 \x01(\x0e\x32+.algobowl.problemsupport.v1.StatementFormatR\x06\x66ormat\x12\x10\n\x03url\x18\x02 \x01(\tR\x03url\"U\n\nSolverInfo\x12G\n\x0bsolver_type\x18\x01 \x01(\x0e\x32&.algobowl.problemsupport.v1.SolverTypeR\nsolverType\"\x17\n\x15GetProblemInfoRequest\"\xe5\x02\n\x16GetProblemInfoResponse\x12\x41\n\trank_sort\x18\x01 \x01(\x0e\x32$.algobowl.problemsupport.v1.RankSortR\x08rankSort\x12\x30\n\x14score_decimal_places\x18\x02 \x01(\x05R\x12scoreDecimalPlaces\x12I\n\nstatements\x18\x03 \x03(\x0b\x32).algobowl.problemsupport.v1.StatementInfoR\nstatements\x12S\n\x11supported_solvers\x18\x04 \x03(\x0b\x32&.algobowl.problemsupport.v1.SolverInfoR\x10supportedSolvers\x12\x36\n\x17supports_generate_input\x18\x05 \x01(\x08R\x15supportsGenerateInput\".\n\x12VerifyInputRequest\x12\x18\n\x07\x63ontent\x18\x01 \x01(\x0cR\x07\x63ontent\"u\n\x13VerifyInputResponse\x12/\n\x12normalized_content\x18\x01 \x01(\x0cH\x00R\x11normalizedContent\x12#\n\x0c\x66ormat_error\x18\x02 \x01(\tH\x00R\x0b\x66ormatErrorB\x08\n\x06result\"\x10\n\x0e\x41\x63\x63\x65ptedOutput\";\n\x0eRejectedOutput\x12)\n\x10rejection_reason\x18\x01 \x01(\tR\x0frejectionReason\"\xc3\x02\n\x0eVerifiedOutput\x12-\n\x12normalized_content\x18\x01 \x01(\x0cR\x11normalizedContent\x12%\n\x0ereported_score\x18\x02 \x01(\x03R\rreportedScore\x12&\n\x0c\x61\x63tual_score\x18\x03 \x01(\x03H\x01R\x0b\x61\x63tualScore\x88\x01\x01\x12H\n\x08\x61\x63\x63\x65pted\x18\x04 \x01(\x0b\x32*.algobowl.problemsupport.v1.AcceptedOutputH\x00R\x08\x61\x63\x63\x65pted\x12H\n\x08rejected\x18\x05 \x01(\x0b\x32*.algobowl.problemsupport.v1.RejectedOutputH\x00R\x08rejectedB\x0e\n\x0cverificationB\x0f\n\r_actual_score\"a\n\x13VerifyOutputRequest\x12#\n\rinput_content\x18\x01 \x01(\x0cR\x0cinputContent\x12%\n\x0eoutput_content\x18\x02 \x01(\x0cR\routputContent\"\x8b\x01\n\x14VerifyOutputResponse\x12\x44\n\x06output\x18\x01 \x01(\x0b\x32*.algobowl.problemsupport.v1.VerifiedOutputH\x00R\x06output\x12#\n\x0c\x66ormat_error\x18\x02 \x01(\tH\x00R\x0b\x66ormatErrorB\x08\n\x06result\"8\n\x14GenerateInputRequest\x12\x17\n\x04seed\x18\x01 \x01(\x03H\x00R\x04seed\x88\x01\x01\x42\x07\n\x05_seed\"1\n\x15GenerateInputResponse\x12\x18\n\x07\x63ontent\x18\x01 \x01(\x0cR\x07\x63ontent\"|\n\x0cSolveRequest\x12#\n\rinput_content\x18\x01 \x01(\x0cR\x0cinputContent\x12G\n\x0bsolver_type\x18\x02 \x01(\x0e\x32&.algobowl.problemsupport.v1.SolverTypeR\nsolverType\"6\n\rSolveResponse\x12%\n\x0eoutput_content\x18\x01 \x01(\x0cR\routputContent*]\n\x08RankSort\x12\x19\n\x15RANK_SORT_UNSPECIFIED\x10\x00\x12\x1a\n\x16RANK_SORT_MINIMIZATION\x10\x01\x12\x1a\n\x16RANK_SORT_MAXIMIZATION\x10\x02*l\n\x0fStatementFormat\x12 \n\x1cSTATEMENT_FORMAT_UNSPECIFIED\x10\x00\x12\x18\n\x14STATEMENT_FORMAT_PDF\x10\x01\x12\x1d\n\x19STATEMENT_FORMAT_MARKDOWN\x10\x02*r\n\nSolverType\x12\x1b\n\x17SOLVER_TYPE_UNSPECIFIED\x10\x00\x12\x17\n\x13SOLVER_TYPE_TRIVIAL\x10\x01\x12\x16\n\x12SOLVER_TYPE_BENCH1\x10\x02\x12\x16\n\x12SOLVER_TYPE_BENCH2\x10\x03\x32\xc7\x04\n\x15ProblemSupportService\x12w\n\x0eGetProblemInfo\x12\x31.algobowl.problemsupport.v1.GetProblemInfoRequest\x1a\x32.algobowl.problemsupport.v1.GetProblemInfoResponse\x12n\n\x0bVerifyInput\x12..algobowl.problemsupport.v1.VerifyInputRequest\x1a/.algobowl.problemsupport.v1.VerifyInputResponse\x12q\n\x0cVerifyOutput\x12/.algobowl.problemsupport.v1.VerifyOutputRequest\x1a\x30.algobowl.problemsupport.v1.VerifyOutputResponse\x12t\n\rGenerateInput\x12\x30.algobowl.problemsupport.v1.GenerateInputRequest\x1a\x31.algobowl.problemsupport.v1.GenerateInputResponse\x12\\\n\x05Solve\x12(.algobowl.problemsupport.v1.SolveRequest\x1a).algobowl.problemsupport.v1.SolveResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n0algobowl/problemsupport/v1/problem_support.proto\x12\x1a\x61lgobowl.problemsupport.v1\"f\n\rStatementInfo\x12\x43\n\x06\x66ormat\x18\x01 \x01(\x0e\x32+.algobowl.problemsupport.v1.StatementFormatR\x06\x66ormat\x12\x10\n\x03url\x18\x02 \x01(\tR\x03url\"U\n\nSolverInfo\x12G\n\x0bsolver_type\x18\x01 \x01(\x0e\x32&.algobowl.problemsupport.v1.SolverTypeR\nsolverType\"\x17\n\x15GetProblemInfoRequest\"\xff\x02\n\x16GetProblemInfoResponse\x12\x41\n\trank_sort\x18\x01 \x01(\x0e\x32$.algobowl.problemsupport.v1.RankSortR\x08rankSort\x12\x30\n\x14score_decimal_places\x18\x02 \x01(\x05R\x12scoreDecimalPlaces\x12I\n\nstatements\x18\x03 \x03(\x0b\x32).algobowl.problemsupport.v1.StatementInfoR\nstatements\x12S\n\x11supported_solvers\x18\x04 \x03(\x0b\x32&.algobowl.problemsupport.v1.SolverInfoR\x10supportedSolvers\x12\x36\n\x17supports_generate_input\x18\x05 \x01(\x08R\x15supportsGenerateInput\x12\x18\n\x07version\x18\x06 \x01(\tR\x07version\"Y\n\x12VerifyInputRequest\x12\x18\n\x07\x63ontent\x18\x01 \x01(\x0cR\x07\x63ontent\x12)\n\x10\x61\x63\x63\x65pt_unchanged\x18\x02 \x01(\x08R\x0f\x61\x63\x63\x65ptUnchanged\"\x95\x01\n\x13VerifyInputResponse\x12/\n\x12normalized_content\x18\x01 \x01(\x0cH\x00R\x11normalizedContent\x12#\n\x0c\x66ormat_error\x18\x02 \x01(\tH\x00R\x0b\x66ormatError\x12\x1e\n\tunchanged\x18\x03 \x01(\x08H\x00R\tunchangedB\x08\n\x06result\"\x10\n\x0e\x41\x63\x63\x65ptedOutput\";\n\x0eRejectedOutput\x12)\n\x10rejection_reason\x18\x01 \x01(\tR\x0frejectionReason\"\xe1\x02\n\x0eVerifiedOutput\x12-\n\x12normalized_content\x18\x01 \x01(\x0cR\x11normalizedContent\x12\x1c\n\tunchanged\x18\x06 \x01(\x08R\tunchanged\x12%\n\x0ereported_score\x18\x02 \x01(\x03R\rreportedScore\x12&\n\x0c\x61\x63tual_score\x18\x03 \x01(\x03H\x01R\x0b\x61\x63tualScore\x88\x01\x01\x12H\n\x08\x61\x63\x63\x65pted\x18\x04 \x01(\x0b\x32*.algobowl.problemsupport.v1.AcceptedOutputH\x00R\x08\x61\x63\x63\x65pted\x12H\n\x08rejected\x18\x05 \x01(\x0b\x32*.algobowl.problemsupport.v1.RejectedOutputH\x00R\x08rejectedB\x0e\n\x0cverificationB\x0f\n\r_actual_score\"\xbc\x01\n\x13VerifyOutputRequest\x12%\n\rinput_content\x18\x01 \x01(\x0cH\x00R\x0cinputContent\x12#\n\x0cinput_digest\x18\x03 \x01(\x0cH\x00R\x0binputDigest\x12%\n\x0eoutput_content\x18\x02 \x01(\x0cR\routputContent\x12)\n\x10\x61\x63\x63\x65pt_unchanged\x18\x04 \x01(\x08R\x0f\x61\x63\x63\x65ptUnchangedB\x07\n\x05input\"\x8b\x01\n\x14VerifyOutputResponse\x12\x44\n\x06output\x18\x01 \x01(\x0b\x32*.algobowl.problemsupport.v1.VerifiedOutputH\x00R\x06output\x12#\n\x0c\x66ormat_error\x18\x02 \x01(\tH\x00R\x0b\x66ormatErrorB\x08\n\x06result\"\xbf\x01\n\x14VerifyOutputsRequest\x12%\n\rinput_content\x18\x01 \x01(\x0cH\x00R\x0cinputContent\x12#\n\x0cinput_digest\x18\x03 \x01(\x0cH\x00R\x0binputDigest\x12\'\n\x0foutput_contents\x18\x02 \x03(\x0cR\x0eoutputContents\x12)\n\x10\x61\x63\x63\x65pt_unchanged\x18\x04 \x01(\x08R\x0f\x61\x63\x63\x65ptUnchangedB\x07\n\x05input\"\xad\x01\n\x15VerifyOutputsResponse\x12J\n\x07results\x18\x01 \x03(\x0b\x32\x30.algobowl.problemsupport.v1.VerifyOutputResponseR\x07results\x12\x31\n\x12input_format_error\x18\x02 \x01(\tH\x00R\x10inputFormatError\x88\x01\x01\x42\x15\n\x13_input_format_error\"\xbe\x01\n\x11VerifyOutputChunk\x12%\n\rinput_content\x18\x01 \x01(\x0cH\x00R\x0cinputContent\x12#\n\x0cinput_digest\x18\x02 \x01(\x0cH\x00R\x0binputDigest\x12\'\n\x0eoutput_content\x18\x03 \x01(\x0cH\x00R\routputContent\x12+\n\x10\x61\x63\x63\x65pt_unchanged\x18\x04 \x01(\x08H\x00R\x0f\x61\x63\x63\x65ptUnchangedB\x07\n\x05\x63hunk\"0\n\x14RegisterInputRequest\x12\x18\n\x07\x63ontent\x18\x01 \x01(\x0cR\x07\x63ontent\"k\n\x15RegisterInputResponse\x12#\n\x0cinput_digest\x18\x01 \x01(\x0cH\x00R\x0binputDigest\x12#\n\x0c\x66ormat_error\x18\x02 \x01(\tH\x00R\x0b\x66ormatErrorB\x08\n\x06result\"8\n\x14GenerateInputRequest\x12\x17\n\x04seed\x18\x01 \x01(\x03H\x00R\x04seed\x88\x01\x01\x42\x07\n\x05_seed\"1\n\x15GenerateInputResponse\x12\x18\n\x07\x63ontent\x18\x01 \x01(\x0cR\x07\x63ontent\"|\n\x0cSolveRequest\x12#\n\rinput_content\x18\x01 \x01(\x0cR\x0cinputContent\x12G\n\x0bsolver_type\x18\x02 \x01(\x0e\x32&.algobowl.problemsupport.v1.SolverTypeR\nsolverType\"6\n\rSolveResponse\x12%\n\x0eoutput_content\x18\x01 \x01(\x0cR\routputContent*]\n\x08RankSort\x12\x19\n\x15RANK_SORT_UNSPECIFIED\x10\x00\x12\x1a\n\x16RANK_SORT_MINIMIZATION\x10\x01\x12\x1a\n\x16RANK_SORT_MAXIMIZATION\x10\x02*l\n\x0fStatementFormat\x12 \n\x1cSTATEMENT_FORMAT_UNSPECIFIED\x10\x00\x12\x18\n\x14STATEMENT_FORMAT_PDF\x10\x01\x12\x1d\n\x19STATEMENT_FORMAT_MARKDOWN\x10\x02*r\n\nSolverType\x12\x1b\n\x17SOLVER_TYPE_UNSPECIFIED\x10\x00\x12\x17\n\x13SOLVER_TYPE_TRIVIAL\x10\x01\x12\x16\n\x12SOLVER_TYPE_BENCH1\x10\x02\x12\x16\n\x12SOLVER_TYPE_BENCH2\x10\x03\x32\xac\x07\n\x15ProblemSupportService\x12w\n\x0eGetProblemInfo\x12\x31.algobowl.problemsupport.v1.GetProblemInfoRequest\x1a\x32.algobowl.problemsupport.v1.GetProblemInfoResponse\x12n\n\x0bVerifyInput\x12..algobowl.problemsupport.v1.VerifyInputRequest\x1a/.algobowl.problemsupport.v1.VerifyInputResponse\x12q\n\x0cVerifyOutput\x12/.algobowl.problemsupport.v1.VerifyOutputRequest\x1a\x30.algobowl.problemsupport.v1.VerifyOutputResponse\x12t\n\rVerifyOutputs\x12\x30.algobowl.problemsupport.v1.VerifyOutputsRequest\x1a\x31.algobowl.problemsupport.v1.VerifyOutputsResponse\x12t\n\rRegisterInput\x12\x30.algobowl.problemsupport.v1.RegisterInputRequest\x1a\x31.algobowl.problemsupport.v1.RegisterInputResponse\x12w\n\x12VerifyOutputStream\x12-.algobowl.problemsupport.v1.VerifyOutputChunk\x1a\x30.algobowl.problemsupport.v1.VerifyOutputResponse(\x01\x12t\n\rGenerateInput\x12\x30.algobowl.problemsupport.v1.GenerateInputRequest\x1a\x31.algobowl.problemsupport.v1.GenerateInputResponse\x12\\\n\x05Solve\x12(.algobowl.problemsupport.v1.SolveRequest\x1a).algobowl.problemsupport.v1.SolveResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'algobowl.problemsupport.v1.problem_support_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
-  _globals['_RANKSORT']._serialized_start=1760
-  _globals['_RANKSORT']._serialized_end=1853
-  _globals['_STATEMENTFORMAT']._serialized_start=1855
-  _globals['_STATEMENTFORMAT']._serialized_end=1963
-  _globals['_SOLVERTYPE']._serialized_start=1965
-  _globals['_SOLVERTYPE']._serialized_end=2079
+  _globals['_RANKSORT']._serialized_start=2706
+  _globals['_RANKSORT']._serialized_end=2799
+  _globals['_STATEMENTFORMAT']._serialized_start=2801
+  _globals['_STATEMENTFORMAT']._serialized_end=2909
+  _globals['_SOLVERTYPE']._serialized_start=2911
+  _globals['_SOLVERTYPE']._serialized_end=3025
   _globals['_STATEMENTINFO']._serialized_start=80
   _globals['_STATEMENTINFO']._serialized_end=182
   _globals['_SOLVERINFO']._serialized_start=184
@@ -44,29 +44,39 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_GETPROBLEMINFOREQUEST']._serialized_start=271
   _globals['_GETPROBLEMINFOREQUEST']._serialized_end=294
   _globals['_GETPROBLEMINFORESPONSE']._serialized_start=297
-  _globals['_GETPROBLEMINFORESPONSE']._serialized_end=654
-  _globals['_VERIFYINPUTREQUEST']._serialized_start=656
-  _globals['_VERIFYINPUTREQUEST']._serialized_end=702
-  _globals['_VERIFYINPUTRESPONSE']._serialized_start=704
-  _globals['_VERIFYINPUTRESPONSE']._serialized_end=821
-  _globals['_ACCEPTEDOUTPUT']._serialized_start=823
-  _globals['_ACCEPTEDOUTPUT']._serialized_end=839
-  _globals['_REJECTEDOUTPUT']._serialized_start=841
-  _globals['_REJECTEDOUTPUT']._serialized_end=900
-  _globals['_VERIFIEDOUTPUT']._serialized_start=903
-  _globals['_VERIFIEDOUTPUT']._serialized_end=1226
-  _globals['_VERIFYOUTPUTREQUEST']._serialized_start=1228
-  _globals['_VERIFYOUTPUTREQUEST']._serialized_end=1325
-  _globals['_VERIFYOUTPUTRESPONSE']._serialized_start=1328
-  _globals['_VERIFYOUTPUTRESPONSE']._serialized_end=1467
-  _globals['_GENERATEINPUTREQUEST']._serialized_start=1469
-  _globals['_GENERATEINPUTREQUEST']._serialized_end=1525
-  _globals['_GENERATEINPUTRESPONSE']._serialized_start=1527
-  _globals['_GENERATEINPUTRESPONSE']._serialized_end=1576
-  _globals['_SOLVEREQUEST']._serialized_start=1578
-  _globals['_SOLVEREQUEST']._serialized_end=1702
-  _globals['_SOLVERESPONSE']._serialized_start=1704
-  _globals['_SOLVERESPONSE']._serialized_end=1758
-  _globals['_PROBLEMSUPPORTSERVICE']._serialized_start=2082
-  _globals['_PROBLEMSUPPORTSERVICE']._serialized_end=2665
+  _globals['_GETPROBLEMINFORESPONSE']._serialized_end=680
+  _globals['_VERIFYINPUTREQUEST']._serialized_start=682
+  _globals['_VERIFYINPUTREQUEST']._serialized_end=771
+  _globals['_VERIFYINPUTRESPONSE']._serialized_start=774
+  _globals['_VERIFYINPUTRESPONSE']._serialized_end=923
+  _globals['_ACCEPTEDOUTPUT']._serialized_start=925
+  _globals['_ACCEPTEDOUTPUT']._serialized_end=941
+  _globals['_REJECTEDOUTPUT']._serialized_start=943
+  _globals['_REJECTEDOUTPUT']._serialized_end=1002
+  _globals['_VERIFIEDOUTPUT']._serialized_start=1005
+  _globals['_VERIFIEDOUTPUT']._serialized_end=1358
+  _globals['_VERIFYOUTPUTREQUEST']._serialized_start=1361
+  _globals['_VERIFYOUTPUTREQUEST']._serialized_end=1549
+  _globals['_VERIFYOUTPUTRESPONSE']._serialized_start=1552
+  _globals['_VERIFYOUTPUTRESPONSE']._serialized_end=1691
+  _globals['_VERIFYOUTPUTSREQUEST']._serialized_start=1694
+  _globals['_VERIFYOUTPUTSREQUEST']._serialized_end=1885
+  _globals['_VERIFYOUTPUTSRESPONSE']._serialized_start=1888
+  _globals['_VERIFYOUTPUTSRESPONSE']._serialized_end=2061
+  _globals['_VERIFYOUTPUTCHUNK']._serialized_start=2064
+  _globals['_VERIFYOUTPUTCHUNK']._serialized_end=2254
+  _globals['_REGISTERINPUTREQUEST']._serialized_start=2256
+  _globals['_REGISTERINPUTREQUEST']._serialized_end=2304
+  _globals['_REGISTERINPUTRESPONSE']._serialized_start=2306
+  _globals['_REGISTERINPUTRESPONSE']._serialized_end=2413
+  _globals['_GENERATEINPUTREQUEST']._serialized_start=2415
+  _globals['_GENERATEINPUTREQUEST']._serialized_end=2471
+  _globals['_GENERATEINPUTRESPONSE']._serialized_start=2473
+  _globals['_GENERATEINPUTRESPONSE']._serialized_end=2522
+  _globals['_SOLVEREQUEST']._serialized_start=2524
+  _globals['_SOLVEREQUEST']._serialized_end=2648
+  _globals['_SOLVERESPONSE']._serialized_start=2650
+  _globals['_SOLVERESPONSE']._serialized_end=2704
+  _globals['_PROBLEMSUPPORTSERVICE']._serialized_start=3028
+  _globals['_PROBLEMSUPPORTSERVICE']._serialized_end=3968
 # @@protoc_insertion_point(module_scope)
@@ -55,32 +55,38 @@ class GetProblemInfoRequest(_message.Message):
     def __init__(self) -> None: ...
 
 class GetProblemInfoResponse(_message.Message):
-    __slots__ = ("rank_sort", "score_decimal_places", "statements", "supported_solvers", "supports_generate_input")
+    __slots__ = ("rank_sort", "score_decimal_places", "statements", "supported_solvers", "supports_generate_input", "version")
     RANK_SORT_FIELD_NUMBER: _ClassVar[int]
     SCORE_DECIMAL_PLACES_FIELD_NUMBER: _ClassVar[int]
     STATEMENTS_FIELD_NUMBER: _ClassVar[int]
     SUPPORTED_SOLVERS_FIELD_NUMBER: _ClassVar[int]
     SUPPORTS_GENERATE_INPUT_FIELD_NUMBER: _ClassVar[int]
+    VERSION_FIELD_NUMBER: _ClassVar[int]
     rank_sort: RankSort
     score_decimal_places: int
     statements: _containers.RepeatedCompositeFieldContainer[StatementInfo]
     supported_solvers: _containers.RepeatedCompositeFieldContainer[SolverInfo]
     supports_generate_input: bool
-    def __init__(self, rank_sort: _Optional[_Union[RankSort, str]] = ..., score_decimal_places: _Optional[int] = ..., statements: _Optional[_Iterable[_Union[StatementInfo, _Mapping]]] = ..., supported_solvers: _Optional[_Iterable[_Union[SolverInfo, _Mapping]]] = ..., supports_generate_input: _Optional[bool] = ...) -> None: ...
+    version: str
+    def __init__(self, rank_sort: _Optional[_Union[RankSort, str]] = ..., score_decimal_places: _Optional[int] = ..., statements: _Optional[_Iterable[_Union[StatementInfo, _Mapping]]] = ..., supported_solvers: _Optional[_Iterable[_Union[SolverInfo, _Mapping]]] = ..., supports_generate_input: _Optional[bool] = ..., version: _Optional[str] = ...) -> None: ...
 
 class VerifyInputRequest(_message.Message):
-    __slots__ = ("content",)
+    __slots__ = ("content", "accept_unchanged")
     CONTENT_FIELD_NUMBER: _ClassVar[int]
+    ACCEPT_UNCHANGED_FIELD_NUMBER: _ClassVar[int]
     content: bytes
-    def __init__(self, content: _Optional[bytes] = ...) -> None: ...
+    accept_unchanged: bool
+    def __init__(self, content: _Optional[bytes] = ..., accept_unchanged: _Optional[bool] = ...) -> None: ...
 
 class VerifyInputResponse(_message.Message):
-    __slots__ = ("normalized_content", "format_error")
+    __slots__ = ("normalized_content", "format_error", "unchanged")
     NORMALIZED_CONTENT_FIELD_NUMBER: _ClassVar[int]
     FORMAT_ERROR_FIELD_NUMBER: _ClassVar[int]
+    UNCHANGED_FIELD_NUMBER: _ClassVar[int]
     normalized_content: bytes
     format_error: str
-    def __init__(self, normalized_content: _Optional[bytes] = ..., format_error: _Optional[str] = ...) -> None: ...
+    unchanged: bool
+    def __init__(self, normalized_content: _Optional[bytes] = ..., format_error: _Optional[str] = ..., unchanged: _Optional[bool] = ...) -> None: ...
 
 class AcceptedOutput(_message.Message):
     __slots__ = ()
@@ -93,26 +99,32 @@ class RejectedOutput(_message.Message):
     def __init__(self, rejection_reason: _Optional[str] = ...) -> None: ...
 
 class VerifiedOutput(_message.Message):
-    __slots__ = ("normalized_content", "reported_score", "actual_score", "accepted", "rejected")
+    __slots__ = ("normalized_content", "unchanged", "reported_score", "actual_score", "accepted", "rejected")
     NORMALIZED_CONTENT_FIELD_NUMBER: _ClassVar[int]
+    UNCHANGED_FIELD_NUMBER: _ClassVar[int]
     REPORTED_SCORE_FIELD_NUMBER: _ClassVar[int]
     ACTUAL_SCORE_FIELD_NUMBER: _ClassVar[int]
     ACCEPTED_FIELD_NUMBER: _ClassVar[int]
     REJECTED_FIELD_NUMBER: _ClassVar[int]
     normalized_content: bytes
+    unchanged: bool
     reported_score: int
     actual_score: int
     accepted: AcceptedOutput
     rejected: RejectedOutput
-    def __init__(self, normalized_content: _Optional[bytes] = ..., reported_score: _Optional[int] = ..., actual_score: _Optional[int] = ..., accepted: _Optional[_Union[AcceptedOutput, _Mapping]] = ..., rejected: _Optional[_Union[RejectedOutput, _Mapping]] = ...) -> None: ...
+    def __init__(self, normalized_content: _Optional[bytes] = ..., unchanged: _Optional[bool] = ..., reported_score: _Optional[int] = ..., actual_score: _Optional[int] = ..., accepted: _Optional[_Union[AcceptedOutput, _Mapping]] = ..., rejected: _Optional[_Union[RejectedOutput, _Mapping]] = ...) -> None: ...
 
 class VerifyOutputRequest(_message.Message):
-    __slots__ = ("input_content", "output_content")
+    __slots__ = ("input_content", "input_digest", "output_content", "accept_unchanged")
     INPUT_CONTENT_FIELD_NUMBER: _ClassVar[int]
+    INPUT_DIGEST_FIELD_NUMBER: _ClassVar[int]
     OUTPUT_CONTENT_FIELD_NUMBER: _ClassVar[int]
+    ACCEPT_UNCHANGED_FIELD_NUMBER: _ClassVar[int]
     input_content: bytes
+    input_digest: bytes
     output_content: bytes
-    def __init__(self, input_content: _Optional[bytes] = ..., output_content: _Optional[bytes] = ...) -> None: ...
+    accept_unchanged: bool
+    def __init__(self, input_content: _Optional[bytes] = ..., input_digest: _Optional[bytes] = ..., output_content: _Optional[bytes] = ..., accept_unchanged: _Optional[bool] = ...) -> None: ...
 
 class VerifyOutputResponse(_message.Message):
     __slots__ = ("output", "format_error")
@@ -122,6 +134,52 @@ class VerifyOutputResponse(_message.Message):
     format_error: str
     def __init__(self, output: _Optional[_Union[VerifiedOutput, _Mapping]] = ..., format_error: _Optional[str] = ...) -> None: ...
 
+class VerifyOutputsRequest(_message.Message):
+    __slots__ = ("input_content", "input_digest", "output_contents", "accept_unchanged")
+    INPUT_CONTENT_FIELD_NUMBER: _ClassVar[int]
+    INPUT_DIGEST_FIELD_NUMBER: _ClassVar[int]
+    OUTPUT_CONTENTS_FIELD_NUMBER: _ClassVar[int]
+    ACCEPT_UNCHANGED_FIELD_NUMBER: _ClassVar[int]
+    input_content: bytes
+    input_digest: bytes
+    output_contents: _containers.RepeatedScalarFieldContainer[bytes]
+    accept_unchanged: bool
+    def __init__(self, input_content: _Optional[bytes] = ..., input_digest: _Optional[bytes] = ..., output_contents: _Optional[_Iterable[bytes]] = ..., accept_unchanged: _Optional[bool] = ...) -> None: ...
+
+class VerifyOutputsResponse(_message.Message):
+    __slots__ = ("results", "input_format_error")
+    RESULTS_FIELD_NUMBER: _ClassVar[int]
+    INPUT_FORMAT_ERROR_FIELD_NUMBER: _ClassVar[int]
+    results: _containers.RepeatedCompositeFieldContainer[VerifyOutputResponse]
+    input_format_error: str
+    def __init__(self, results: _Optional[_Iterable[_Union[VerifyOutputResponse, _Mapping]]] = ..., input_format_error: _Optional[str] = ...) -> None: ...
+
+class VerifyOutputChunk(_message.Message):
+    __slots__ = ("input_content", "input_digest", "output_content", "accept_unchanged")
+    INPUT_CONTENT_FIELD_NUMBER: _ClassVar[int]
+    INPUT_DIGEST_FIELD_NUMBER: _ClassVar[int]
+    OUTPUT_CONTENT_FIELD_NUMBER: _ClassVar[int]
+    ACCEPT_UNCHANGED_FIELD_NUMBER: _ClassVar[int]
+    input_content: bytes
+    input_digest: bytes
+    output_content: bytes
+    accept_unchanged: bool
+    def __init__(self, input_content: _Optional[bytes] = ..., input_digest: _Optional[bytes] = ..., output_content: _Optional[bytes] = ..., accept_unchanged: _Optional[bool] = ...) -> None: ...
+
+class RegisterInputRequest(_message.Message):
+    __slots__ = ("content",)
+    CONTENT_FIELD_NUMBER: _ClassVar[int]
+    content: bytes
+    def __init__(self, content: _Optional[bytes] = ...) -> None: ...
+
+class RegisterInputResponse(_message.Message):
+    __slots__ = ("input_digest", "format_error")
+    INPUT_DIGEST_FIELD_NUMBER: _ClassVar[int]
+    FORMAT_ERROR_FIELD_NUMBER: _ClassVar[int]
+    input_digest: bytes
+    format_error: str
+    def __init__(self, input_digest: _Optional[bytes] = ..., format_error: _Optional[str] = ...) -> None: ...
+
 class GenerateInputRequest(_message.Message):
     __slots__ = ("seed",)
     SEED_FIELD_NUMBER: _ClassVar[int]
@@ -1,9 +1,9 @@
 import json
 import sys
+import time
 from collections.abc import Iterable
 
 import click
-import requests
 
 import algobowl.cli.formatter as fmt
 from algobowl.lib import constants
@@ -149,22 +149,114 @@ def create_group_(cli, name, competition, user, incognito, benchmark):
 def create_groups(cli, competition, json_file):
     with open(json_file, encoding="utf-8") as f:
         groups = json.load(f)
-    failed_groups = []
-    with click.progressbar(groups, label="Create groups") as bar:
-        for group in bar:
-            try:
-                create_group(cli, competition, usernames=group)
-            except (
-                requests.exceptions.HTTPError,
-                requests.exceptions.JSONDecodeError,
-            ) as e:
-                failed_groups.append((group, e))
-    click.echo(
-        f"Successfully created {len(groups) - len(failed_groups)} groups.", err=True
+    r = cli.session.post(
+        cli.config.get_url("/setup/create_groups.json"),
+        data={"competition_id": str(competition), "groups": json.dumps(groups)},
     )
-    if failed_groups:
-        fmt.err(f"Failed to create {len(failed_groups)} groups:")
-        for group, exn in failed_groups:
-            fmt.err(f"{json.dumps(group)}: {exn}")
-        fmt.err("See the server logs for more information.")
+    r.raise_for_status()
+    result = r.json()
+    if result["status"] != "success":
+        fmt.err(f"Failed to create groups: {result['msg']}")
+        fmt.err("No groups were created.")
+        sys.exit(1)
+    cli.formatter.dump_table(
+        [
+            {"group_id": group["group_id"], "users": ",".join(group["users"])}
+            for group in result["groups"]
+        ]
+    )
+    click.echo(f"Successfully created {len(result['groups'])} groups.", err=True)
+
+
+@admin.command(
+    name="fill-input-pool",
+    help="Pre-generate default inputs for groups created later",
+)
+@click.option("--competition", "-c", type=int, help="Competition ID", required=True)
+@click.option(
+    "--size",
+    "-n",
+    type=int,
+    help="Number of inputs the pool should hold",
+    required=True,
+)
+@click.option(
+    "--workers",
+    "-j",
+    type=int,
+    help="Number of inputs to generate concurrently (default: server setting)",
+)
+@click.pass_obj
+def fill_input_pool(cli, competition, size, workers):
+    data = {"competition_id": str(competition), "size": str(size)}
+    if workers:
+        data["workers"] = str(workers)
+    r = cli.session.post(cli.config.get_url("/setup/fill_input_pool.json"), data=data)
+    r.raise_for_status()
+    cli.formatter.dump_table([r.json()])
+
+
+@admin.command(
+    name="rebuild-rankings",
+    help="Rebuild the materialized rankings and check them for consistency",
+)
+@click.option("--competition", "-c", type=int, help="Competition ID", required=True)
+@click.pass_obj
+def rebuild_rankings(cli, competition):
+    r = cli.session.post(
+        cli.config.get_url(f"/competition/{competition}/rebuild_rankings.json")
+    )
+    r.raise_for_status()
+    result = r.json()
+    for mismatch in result["mismatches"]:
+        fmt.err(mismatch)
+    if result["status"] != "success":
+        sys.exit(1)
+
+
+@admin.command(
+    name="build-input-archive",
+    help="Build the zip of all inputs, if not already built for the current inputs",
+)
+@click.option("--competition", "-c", type=int, help="Competition ID", required=True)
+@click.pass_obj
+def build_input_archive(cli, competition):
+    r = cli.session.post(
+        cli.config.get_url(f"/competition/{competition}/build_input_archive.json")
+    )
+    r.raise_for_status()
+    cli.formatter.dump_table([r.json()])
+
+
+@admin.command(help="Re-verify all outputs of a competition against the problem")
+@click.option("--competition", "-c", type=int, help="Competition ID", required=True)
+@click.option(
+    "--poll-interval",
+    type=float,
+    default=2.0,
+    help="Seconds between progress checks.",
+)
+@click.pass_obj
+def reverify(cli, competition, poll_interval):
+    r = cli.session.post(
+        cli.config.get_url(f"/competition/{competition}/reverify.json")
+    )
+    r.raise_for_status()
+    job = r.json()
+    with click.progressbar(length=job["total_inputs"], label="Reverify") as bar:
+        while True:
+            bar.length = job["total_inputs"]
+            bar.update(job["done_inputs"] - bar.pos)
+            if job["status"] != "running":
+                break
+            time.sleep(poll_interval)
+            r = cli.session.get(
+                cli.config.get_url(f"/competition/{competition}/reverify_status.json")
+            )
+            r.raise_for_status()
+            job = r.json()
+    click.echo(job["log"], nl=False)
+    if job["status"] == "failed":
+        fmt.err(f"Reverify failed: {job['error']}")
+        fmt.err("Run this command again to resume.")
         sys.exit(1)
@@ -1,6 +1,9 @@
+import io
 import pathlib
 import re
 import sys
+import time
+import zipfile
 
 import click
 
@@ -32,6 +35,20 @@ def get_group_id(cli):
     sys.exit(1)
 
 
+def get_competition_id(cli, group_id):
+    groups = get_active_groups(cli, params={"list_inactive": True})
+    if not any(group["id"] == group_id for group in groups):
+        # Admins may act on behalf of groups they aren't a member of.
+        groups = get_active_groups(
+            cli, params={"list_inactive": True, "list_non_member": True}
+        )
+    for group in groups:
+        if group["id"] == group_id:
+            return group["competition_id"]
+    fmt.err(f"No such group: {group_id}")
+    sys.exit(1)
+
+
 @click.group(help="Your Group")
 @click.option("--group-id", type=int, help="Select group")
 @click.pass_obj
@@ -109,6 +126,29 @@ def input_download(cli, output_file):
     output_file.write(r.text)
 
 
+@input.command(
+    name="download-all", help="Download the inputs of every group in the competition"
+)
+@click.argument(
+    "directory",
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    default=".",
+)
+@click.pass_obj
+def input_download_all(cli, directory):
+    group_id = get_group_id(cli)
+    competition_id = get_competition_id(cli, group_id)
+    r = cli.session.get(
+        cli.config.get_file_url(f"inputs_competition{competition_id}.zip")
+    )
+    auth.check_response(r)
+    directory.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(io.BytesIO(r.content)) as zf:
+        for name in zf.namelist():
+            zf.extract(name, directory)
+            click.echo(directory / name)
+
+
 @group.group(help="Upload and view outputs")
 @click.option(
     "--to-group-id",
@@ -133,25 +173,95 @@ def infer_group_from_path(file_path):
     return int(matches[-1])
 
 
+def show_submission(result):
+    if result["status"] in ("success", "complete"):
+        return
+    if result["status"] in ("queued", "running"):
+        click.echo(f"Submission {result['submission_id']} is {result['status']}.")
+        return
+    fmt.err(result["msg"])
+    sys.exit(1)
+
+
+def wait_for_submission(cli, group_id, result, poll_interval):
+    while result["status"] in ("queued", "running"):
+        time.sleep(poll_interval)
+        r = cli.session.get(
+            cli.config.get_url(f"/group/{group_id}/submission_status.json"),
+            params={"submission_id": result["submission_id"]},
+        )
+        auth.check_response(r)
+        result = r.json()
+    return result
+
+
 @output.command(name="upload", help="Upload output")
 @click.argument("file_path", type=pathlib.Path)
+@click.option(
+    "--queue/--no-queue",
+    default=False,
+    help=(
+        "Queue the output for verification on the server, rather than waiting "
+        "for it to be verified while uploading"
+    ),
+)
+@click.option(
+    "--wait/--no-wait",
+    default=True,
+    help="Wait for a queued output to be verified",
+)
+@click.option(
+    "--poll-interval",
+    type=float,
+    default=1.0,
+    help="Seconds between checks of a queued output.",
+)
 @click.pass_obj
-def output_upload(cli, file_path):
+def output_upload(cli, file_path, queue, wait, poll_interval):
     from_group_id = get_group_id(cli)
     to_group_id = cli.to_group_id
     if not to_group_id:
         to_group_id = infer_group_from_path(file_path)
+    endpoint = "queue_output" if queue else "submit_output"
     with open(file_path, "rb") as f:
         r = cli.session.post(
-            cli.config.get_url(f"/group/{from_group_id}/submit_output"),
+            cli.config.get_url(f"/group/{from_group_id}/{endpoint}"),
             data={"to_group": to_group_id},
             files={"output_file": f},
         )
     auth.check_response(r)
     result = r.json()
-    if result["status"] != "success":
-        fmt.err(result["msg"])
-        sys.exit(1)
+    if wait:
+        result = wait_for_submission(cli, from_group_id, result, poll_interval)
+    show_submission(result)
+
+
+@output.command(name="status", help="Show the status of a queued output")
+@click.argument("submission_id", type=int)
+@click.option(
+    "--wait/--no-wait",
+    default=False,
+    help="Wait for the output to be verified",
+)
+@click.option(
+    "--poll-interval",
+    type=float,
+    default=1.0,
+    help="Seconds between checks of the output.",
+)
+@click.pass_obj
+def output_status(cli, submission_id, wait, poll_interval):
+    group_id = get_group_id(cli)
+    r = cli.session.get(
+        cli.config.get_url(f"/group/{group_id}/submission_status.json"),
+        params={"submission_id": submission_id},
+    )
+    auth.check_response(r)
+    result = r.json()
+    if wait:
+        result = wait_for_submission(cli, group_id, result, poll_interval)
+    cli.formatter.dump_table([result])
+    show_submission(result)
 
 
 @output.command(name="download", help="Download output")
@@ -1,4 +1,3 @@
-import concurrent.futures
 import random
 import sys
 from pathlib import Path
@@ -104,28 +103,25 @@ def parse_output(cli, input_file, output_file):
 def verify(cli, input_file, output_files):
     rv = 0
     iput = _parse_input(cli, input_file)
+    results = cli.problem.verify_outputs(
+        iput.content,
+        [_read_text(output_file) for output_file in output_files],
+    )
 
-    def _verify_output(output_file):
-        rv = 0
-        oput = _parse_output(cli, iput, output_file)
+    for output_file, oput in zip(output_files, results, strict=True):
         message = click.style("OK!", fg="green", bold=True)
-        try:
-            oput.require_accepted()
-        except problem_client.VerificationError as e:
+        if isinstance(oput, problem_client.FileFormatError):
             rv = 1
-            message = click.style(f"BAD: {e}", fg="red", bold=True)
-        message = f"{output_file}: {message}"
-        return rv, message
-
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = []
-        for output_file in output_files:
-            futures.append(executor.submit(_verify_output, output_file))
-
-    for future in futures:
-        future_rv, message = future.result()
-        rv = rv or future_rv
-        click.echo(message)
+            message = click.style(
+                f"BAD: Output has formatting errors: {oput}", fg="red", bold=True
+            )
+        else:
+            try:
+                oput.require_accepted()
+            except problem_client.VerificationError as e:
+                rv = 1
+                message = click.style(f"BAD: {e}", fg="red", bold=True)
+        click.echo(f"{output_file}: {message}")
 
     sys.exit(rv)
 
@@ -23,6 +23,10 @@ import algobowl
 from algobowl import model
 from algobowl.config.auth import AuthMetadata, GoogleAuth, MPAPIAuthenticator, TokenAuth
 
+# Importing rankings registers the session listeners which keep the
+# materialized rankings current.
+from algobowl.lib import input_archive, rankings, submissions  # noqa: F401
+
 base_config = AppConfig()
 base_config.renderers = []
 base_config["flash.default_status"] = "primary"
@@ -100,6 +104,8 @@ def config_ready():
 
 
 milestones.config_ready.register(config_ready)
+milestones.environment_loaded.register(submissions.start_configured_workers)
+milestones.environment_loaded.register(input_archive.start_builder)
 
 
 class AdminTableFiller(BootstrapAdminTableFiller):
@@ -1,20 +1,37 @@
+import concurrent.futures
+import dataclasses
+import threading
+import time
+from collections.abc import Iterable
 from pathlib import Path
 from urllib.parse import urlencode
 
 import google_auth_oauthlib.flow as gflow
 import googleapiclient.discovery as gdiscovery
 import requests
+import requests.adapters
 import tg
 import transaction
 from repoze.who.interfaces import IAuthenticator, IChallenger, IIdentifier
+from sqlalchemy.orm import make_transient_to_detached
 from tg.configuration.auth import TGAuthMetadata
 from tg.exceptions import HTTPFound, HTTPUnauthorized
+from tg.support.converters import asint
 from webob import Request
 from zope.interface import implementer
 
-from algobowl.lib import constants
+from algobowl.lib import constants, token_cache
 from algobowl.model import AuthToken, DBSession, User
 
+# Identity key holding the cached user for a token-authenticated request.
+CACHED_TOKEN_KEY = "algobowl.cached_token"
+
+# Maximum number of concurrent MPAPI directory lookups.
+MPAPI_MAX_WORKERS = 8
+
+# Seconds MPAPI user attributes are cached for.
+MPAPI_ATTRIBUTES_TTL_SECONDS = 3600
+
 
 class BaseAuth:
     def _get_cookie_plugin(self, environ):
@@ -51,16 +68,49 @@ class TokenAuth:
         if identity.get("identifier") != "token":
             return None
         client_id = identity["token"]
-
-        token = (
-            DBSession.query(AuthToken)
-            .filter(AuthToken.client_id == client_id)
-            .one_or_none()
+        cache = token_cache.get_cache()
+
+        cached = cache.get(client_id)
+        if cached is None:
+            row = (
+                DBSession.query(User.id, User.username, User.admin)
+                .join(AuthToken.user)
+                .filter(AuthToken.client_id == client_id)
+                .one_or_none()
+            )
+            if not row:
+                return None
+            cached = token_cache.CachedToken(*row)
+            cache.put(client_id, cached)
+
+        identity[CACHED_TOKEN_KEY] = cached
+        return cached.username
+
+
+@dataclasses.dataclass(frozen=True)
+class MPAPIUser:
+    uid: int
+    username: str
+    full_name: str
+    email: str
+
+    @classmethod
+    def from_response(cls, data):
+        attributes = data["attributes"]
+        return cls(
+            uid=attributes["uidNumber"],
+            username=data["uid"],
+            full_name=f"{attributes['first']} {attributes['sn']}",
+            email=attributes["mail"],
         )
-        if not token:
-            return None
 
-        return token.user.username
+
+class UnknownUsersError(ValueError):
+    def __init__(self, usernames):
+        self.usernames = list(usernames)
+        super().__init__(
+            f"MPAPI Failure.  Users {', '.join(self.usernames)} may not exist?"
+        )
 
 
 @implementer(IIdentifier, IChallenger, IAuthenticator)
@@ -68,6 +118,12 @@ class MPAPIAuthenticator(BaseAuth):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.s = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=MPAPI_MAX_WORKERS)
+        self.s.mount("http://", adapter)
+        self.s.mount("https://", adapter)
+        # Directory lookups by username: {username: (expires, MPAPIUser)}
+        self._users = {}
+        self._users_lock = threading.Lock()
 
     def identify(self, environ):
         request = Request(environ)
@@ -92,7 +148,7 @@ class MPAPIAuthenticator(BaseAuth):
         if identity["identifier"] != "mpapi":
             return None
 
-        r = requests.post(self.mpapi_fetch, data={"tkt": ticket})
+        r = self.s.post(self.mpapi_fetch, data={"tkt": ticket})
         r.raise_for_status()
         data = r.json()
         if data["result"] != "success":
@@ -103,40 +159,106 @@ class MPAPIAuthenticator(BaseAuth):
             environ["algobowl.sw_account_login"] = True
             return None
 
-        attributes = data["attributes"]
-        uid = attributes["uidNumber"]
-        full_name = "{} {}".format(attributes["first"], attributes["sn"])
-        email = attributes["mail"]
+        mpapi_user = MPAPIUser.from_response(data)
+        self._remember_user(mpapi_user)
 
-        user = DBSession.query(User).filter(User.id == uid).one_or_none()
+        user = DBSession.query(User).filter(User.id == mpapi_user.uid).one_or_none()
         if user:
             # Update attributes in case of username/full name change
             user.username = username
-            user.full_name = full_name
-            user.email = email
+            user.full_name = mpapi_user.full_name
+            user.email = mpapi_user.email
         else:
-            user = User(id=uid, username=username, full_name=full_name, email=email)
+            user = User(
+                id=mpapi_user.uid,
+                username=username,
+                full_name=mpapi_user.full_name,
+                email=mpapi_user.email,
+            )
             DBSession.add(user)
 
         DBSession.flush()
         transaction.commit()
         return username
 
-    def new_user_by_username(self, username):
-        url = f"{self.mpapi_url}/uid/{username}"
-        r = requests.get(url)
+    def lookup_user(self, username):
+        """
+        Look up a user in the MPAPI directory, or None if they don't exist.
+        Results are cached for ``auth.mpapi.cache_ttl`` seconds.
+        """
+        now = time.monotonic()
+        with self._users_lock:
+            cached = self._users.get(username)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        r = self.s.get(f"{self.mpapi_url}/uid/{username}")
         r.raise_for_status()
         data = r.json()
         if data["result"] != "success":
-            raise ValueError(f"MPAPI Failure.  User {username} may not exist?")
-        attributes = data["attributes"]
-        uid = attributes["uidNumber"]
-        full_name = f"{attributes['first']} {attributes['sn']}"
-        email = attributes["mail"]
-        user = User(id=uid, username=username, full_name=full_name, email=email)
-        DBSession.add(user)
+            return None
+        mpapi_user = MPAPIUser.from_response(data)
+        self._remember_user(mpapi_user)
+        return mpapi_user
+
+    def lookup_users(self, usernames: Iterable[str]):
+        """
+        Look up many users concurrently.  Returns a dict from username to
+        MPAPIUser, omitting usernames which don't exist.
+        """
+        usernames = list(dict.fromkeys(usernames))
+        if len(usernames) <= 1:
+            results = [self.lookup_user(username) for username in usernames]
+        else:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(MPAPI_MAX_WORKERS, len(usernames))
+            ) as executor:
+                results = list(executor.map(self.lookup_user, usernames))
+        return {
+            username: result
+            for username, result in zip(usernames, results, strict=True)
+            if result
+        }
+
+    def resolve_users(self, usernames: Iterable[str]):
+        """
+        Get the User for each username, in order.  Users not yet in the
+        database are looked up in the directory and added to the session.
+        Raises UnknownUsersError if any don't exist in the directory.
+        """
+        usernames = list(usernames)
+        users = {
+            user.username: user
+            for user in DBSession.query(User).filter(User.username.in_(usernames))
+        }
+        missing = [username for username in usernames if username not in users]
+        found = self.lookup_users(missing)
+        unknown = [username for username in missing if username not in found]
+        if unknown:
+            raise UnknownUsersError(dict.fromkeys(unknown))
+
+        for username, mpapi_user in found.items():
+            user = User(
+                id=mpapi_user.uid,
+                username=mpapi_user.username,
+                full_name=mpapi_user.full_name,
+                email=mpapi_user.email,
+            )
+            DBSession.add(user)
+            users[username] = user
+        return [users[username] for username in usernames]
+
+    def new_user_by_username(self, username):
+        (user,) = self.resolve_users([username])
         return user
 
+    def _remember_user(self, mpapi_user):
+        expires = time.monotonic() + asint(
+            tg.config.get("auth.mpapi.cache_ttl", MPAPI_ATTRIBUTES_TTL_SECONDS)
+        )
+        with self._users_lock:
+            self._users[mpapi_user.username] = (expires, mpapi_user)
+
     @property
     def mpapi_url(self) -> str:
         return tg.config["auth.mpapi.url"].rstrip("/")
@@ -276,6 +398,13 @@ class AuthMetadata(TGAuthMetadata):
         super().__init__(*args, **kwargs)
 
     def get_user(self, identity, userid):
+        cached = identity.get(CACHED_TOKEN_KEY)
+        if cached is not None and cached.username == userid:
+            # Attach the user without loading it; any other attributes are
+            # loaded when first accessed.
+            user = User(id=cached.user_id, username=cached.username, admin=cached.admin)
+            make_transient_to_detached(user)
+            return DBSession.merge(user, load=False)
         return DBSession.query(User).filter_by(username=userid).first()
 
     def get_groups(self, identity, userid):
@@ -1,6 +1,18 @@
+import tg
+
 from algobowl.controllers.api import user as user_api
-from algobowl.lib import base
+from algobowl.lib import base, rankings_cache, token_cache
 
 
 class ApiController(base.BaseController):
     user = user_api.UserLookupApiController()
+
+    @tg.expose("json")
+    @tg.require(tg.predicates.has_permission("admin"))
+    def token_cache_stats(self):
+        return token_cache.get_cache().stats()
+
+    @tg.expose("json")
+    @tg.require(tg.predicates.has_permission("admin"))
+    def rankings_cache_stats(self):
+        return rankings_cache.get_cache().stats()
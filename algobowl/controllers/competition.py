@@ -1,16 +1,27 @@
 from __future__ import annotations
 
 import dataclasses
-import datetime
 from collections import defaultdict
 
+import sqlalchemy as sa
+from markupsafe import Markup
+from sqlalchemy.orm import selectinload
 from sqlalchemy.sql.expression import case
 from tg import abort, expose, flash, redirect, request, require, response
 from tg.predicates import has_permission
-
-from algobowl.lib import problem_client
+from tg.render import render
+
+from algobowl.lib import (
+    input_archive,
+    membership,
+    phases,
+    problem_client,
+    rankings,
+    rankings_cache,
+    reverify,
+)
 from algobowl.lib.base import BaseController
-from algobowl.lib.logoutput import logoutput
+from algobowl.lib.rankings import GroupEntry
 from algobowl.model import (
     Competition,
     DBSession,
@@ -18,21 +29,13 @@ from algobowl.model import (
     Input,
     Output,
     Protest,
+    User,
     VerificationStatus,
 )
 
 __all__ = ["CompetitionController", "CompetitionsController"]
 
 
-@dataclasses.dataclass
-class ScoreTuple:
-    score: str | None
-    verification: VerificationStatus
-    rank: int | None
-    output: Output | None
-    vdiffer: bool
-
-
 @dataclasses.dataclass
 class GradingTuple:
     rankings: GroupEntry
@@ -40,6 +43,7 @@ class GradingTuple:
     verification: GradingVerificationTuple
     input_ones: int
     contributions: GradingContributionTuple
+    place_in_fleet: int = 0
 
 
 @dataclasses.dataclass
@@ -64,62 +68,25 @@ class GradingVerificationTuple:
         yield from dataclasses.asdict(self).values()
 
 
+@dataclasses.dataclass(frozen=True)
+class RenderedTable:
+    html: Markup
+    has_inputs: bool
+    verification_accuracy: float
+
+
 @dataclasses.dataclass
 class CompetitionYearTuple:
     year: int
     competitions: list[Competition]
 
 
-class GroupEntry:  # noqa: PLW1641
-    def __init__(self):
-        self.reject_count = 0
-        self.sum_of_ranks = 0
-        self.penalties = 0
-        self.place = 1
-        self.input_ranks = {}
-
-    @property
-    def score(self):
-        return self.sum_of_ranks + self.penalties
-
-    @property
-    def adj_score(self):
-        """
-        Score used for grading: each rejection is assumed
-        to count as the number of groups.
-        """
-        if not self.reject_count:
-            return self.score
-
-        num_inputs = len(self.input_ranks)
-        if not num_inputs:
-            num_inputs = 9999
-
-        return self.sum_of_ranks + self.penalties + self.reject_count * num_inputs
-
-    def __lt__(self, other):
-        if self.reject_count < other.reject_count:
-            return True
-        if self.reject_count > other.reject_count:
-            return False
-        return self.score < other.score
-
-    def __eq__(self, other):
-        return self.reject_count == other.reject_count and self.score == other.score
-
-
-def compute_rankings_grade(gt: GradingTuple, fleet_num: int, fleet: int) -> int | float:
-    place_in_fleet = 0
-    last_adj_score = fleet[0].rankings.adj_score
-    for i, other_gt in enumerate(fleet):
-        if other_gt.rankings.adj_score != last_adj_score:
-            place_in_fleet = i
-            last_adj_score = other_gt.rankings.adj_score
-        if other_gt is gt:
-            break
-    if len(fleet) == 1:
+def compute_rankings_grade(
+    place_in_fleet: int, fleet_num: int, fleet_size: int
+) -> int | float:
+    if fleet_size == 1:
         return 5 + fleet_num * 5
-    return (place_in_fleet / (len(fleet) - 1)) * 5 + fleet_num * 5
+    return (place_in_fleet / (fleet_size - 1)) * 5 + fleet_num * 5
 
 
 class CompetitionController(BaseController):
@@ -131,16 +98,16 @@ class CompetitionController(BaseController):
     @expose("json")
     def index(self, ground_truth=False, incognito=False):
         user = request.identity and request.identity["user"]
-        now = datetime.datetime.now()
         comp = self.competition
-        problem = problem_client.ProblemClient(comp.problem)
+        problem = problem_client.get_client(comp.problem)
         show_scores = request.environ["is_admin"] or comp.open_verification_open
         if user:
             my_groups = (
-                DBSession.query(Group).filter(Group.competition_id == comp.id).all()
+                DBSession.query(Group)
+                .filter(Group.competition_id == comp.id)
+                .filter(membership.member_clause(user))
+                .all()
             )
-            # non-sql filter, bleh
-            my_groups = [g for g in my_groups if user in g.users]
         else:
             my_groups = []
 
@@ -160,164 +127,141 @@ class CompetitionController(BaseController):
             incognito = False
             incognito_teams = []
 
-        if not request.environ["is_admin"] and now < comp.output_upload_begins:
+        if not request.environ["is_admin"] and not comp.has_begun(
+            phases.Phase.output_upload
+        ):
             abort(403, "Rankings for this competition are not available yet")
 
         if ground_truth and not request.environ["is_admin"]:
             abort(403, "You do not have permission for this option")
 
-        if ground_truth:
-            verification_column = Output.ground_truth
-        else:
-            verification_column = case(
-                [(Output.use_ground_truth, Output.ground_truth)],
-                else_=Output.verification,
-            )
-
         open_verification = user and comp.open_verification_open
+        role = rankings_cache.Role.of(request.environ["is_admin"], my_groups)
+        cache = rankings_cache.get_cache()
+
+        def compute():
+            if ground_truth or incognito:
+                return rankings.compute_rankings(
+                    comp,
+                    problem,
+                    ground_truth=ground_truth,
+                    incognito=incognito,
+                    show_scores=show_scores,
+                )
+            return rankings.load_rankings(comp, problem, show_scores=show_scores)
 
-        score_sort = {
-            problem_client.RankSort.MINIMIZATION: Output.score.asc(),
-            problem_client.RankSort.MAXIMIZATION: Output.score.desc(),
-        }[problem.rank_sort()]
-
-        groups = defaultdict(GroupEntry)
-        ir_query = (
-            DBSession.query(Input, Group, Output, verification_column)
-            .join(Input.outputs)
-            .join(Output.group)
-            .filter(Group.competition_id == comp.id)
-            .filter(Output.active == True)
-            .order_by(
-                Input.group_id,
-                verification_column == VerificationStatus.rejected,
-                score_sort,
+        if request.response_type == "application/json":
+            key = rankings_cache.CacheKey.for_request(
+                comp,
+                role=role,
+                incognito=incognito,
+                ground_truth=ground_truth,
+                fmt="json",
             )
-        )
-
-        inputs = []
-        last_iput = None
-        accurate_count = 0
-        total_count = 0
-        for iput, ogroup, output, verif in ir_query:
-            if not incognito and ogroup.incognito:
-                continue
-            if iput is not last_iput:
-                inputs.append(iput)
-                potential_rank = 1
-                last_rank = 0
-                last_score = None
-            shown_score = None
-            shown_output = None
-            if show_scores:
-                shown_score = problem.format_score(output.score)
-                shown_output = output
-            if verif is VerificationStatus.rejected:
-                rank = None
-                shown_score = None
-            elif output.score == last_score:
-                rank = last_rank
-            else:
-                rank = potential_rank
-
-            vdiffer = False
-            if ground_truth:
-                if (
-                    output.use_ground_truth
-                    or output.verification == output.ground_truth
-                ):
-                    accurate_count += 1
-                else:
-                    vdiffer = True
-
-            groups[ogroup].input_ranks[iput] = ScoreTuple(
-                shown_score, verif, rank, shown_output, vdiffer
+            return dict(
+                cache.get_or_compute(key, comp, lambda: self._rankings_json(compute()))
             )
-            if verif is VerificationStatus.rejected:
-                groups[ogroup].reject_count += 1
-            else:
-                groups[ogroup].sum_of_ranks += rank
-
-            # add accepted resubmissions to penalty
-            if verif is VerificationStatus.accepted and not output.original:
-                groups[ogroup].penalties += 1
-
-            total_count += 1
-            potential_rank += 1
-            last_iput = iput
-            last_rank = rank
-            last_score = output.score
-
-        # no submission? this adds to reject count
-        for group in groups.values():
-            for iput in inputs:
-                if iput not in group.input_ranks:
-                    group.reject_count += 1
-
-        # add open verification protest rejections to penalty
-        rprotests = (
-            DBSession.query(Protest)
-            .filter(Protest.accepted == False)
-            .join(Protest.submitter)
-            .filter(Group.competition_id == comp.id)
-        )
-        for protest in rprotests:
-            # technically, a group which failed to submit anything
-            # COULD protest... but this case is unlikely ;)
-            if protest.submitter in groups:
-                groups[protest.submitter].penalties += 1
-
-        # compute places for groups
-        for this_ent in groups.values():
-            for other_ent in groups.values():
-                if other_ent < this_ent:
-                    this_ent.place += 1
 
-        if request.response_type == "application/json":
-            return {
-                "status": "success",
-                "groups": [
-                    {
-                        "group_name": group.name,
-                        "reject_count": rankings.reject_count,
-                        "sum_of_ranks": rankings.sum_of_ranks,
-                        "penalties": rankings.penalties,
-                        "score": rankings.score,
-                        "place": rankings.place,
-                        "input_ranks": [
-                            {
-                                "group_id": k.group.id,
-                                "score": v.score,
-                                "verification": str(v.verification),
-                                "rank": v.rank,
-                            }
-                            for k, v in rankings.input_ranks.items()
-                        ],
-                    }
-                    for group, rankings in groups.items()
-                ],
-            }
+        key = rankings_cache.CacheKey.for_request(
+            comp,
+            role=role,
+            incognito=incognito,
+            ground_truth=ground_truth,
+            fmt="html",
+            my_groups=my_groups,
+        )
+        table = cache.get_or_compute(
+            key,
+            comp,
+            lambda: self._render_table(compute(), my_groups, show_input_downloads),
+        )
         return {
-            "groups": groups,
+            "table": table,
             "my_groups": my_groups,
             "competition": comp,
-            "inputs": inputs,
             "admin": request.environ["is_admin"],
             "incognito": incognito,
             "show_incognito_option": show_incognito_option,
             "incognito_teams": incognito_teams,
             "show_input_downloads": show_input_downloads,
             "ground_truth": ground_truth,
-            "verification_accuracy": (
-                0 if not total_count else (accurate_count / total_count)
-            ),
+            "has_inputs": table.has_inputs,
+            "verification_accuracy": table.verification_accuracy,
             "open_verification": open_verification,
         }
 
+    @staticmethod
+    def _rankings_json(result):
+        return {
+            "status": "success",
+            "groups": [
+                {
+                    "group_name": group.name,
+                    "reject_count": entry.reject_count,
+                    "sum_of_ranks": entry.sum_of_ranks,
+                    "penalties": entry.penalties,
+                    "score": entry.score,
+                    "place": entry.place,
+                    "input_ranks": [
+                        {
+                            "group_id": k.group.id,
+                            "score": v.score,
+                            "verification": str(v.verification),
+                            "rank": v.rank,
+                        }
+                        for k, v in entry.input_ranks.items()
+                    ],
+                }
+                for group, entry in result.groups.items()
+            ],
+        }
+
+    def _render_table(self, result, my_groups, show_input_downloads):
+        html = render(
+            {
+                "competition": self.competition,
+                "groups": result.groups,
+                "inputs": result.inputs,
+                "my_groups": my_groups,
+                "show_input_downloads": show_input_downloads,
+            },
+            "kajiki",
+            "algobowl.templates.competition.rankings_table",
+            is_fragment=True,
+        )
+        return RenderedTable(
+            html=Markup(html),
+            has_inputs=bool(result.inputs),
+            verification_accuracy=(
+                0
+                if not result.total_count
+                else (result.accurate_count / result.total_count)
+            ),
+        )
+
     @expose("algobowl.templates.competition.grade")
     @require(has_permission("admin"))
     def grade(self):
-        rankings = self.index(ground_truth=True, incognito=False)
+        comp = self.competition
+        problem = problem_client.get_client(comp.problem)
+        result = rankings.compute_rankings(
+            comp, problem, ground_truth=True, show_scores=True
+        )
+        all_groups = (
+            DBSession.query(Group)
+            .filter(Group.competition_id == comp.id)
+            .options(selectinload(Group.input))
+            .all()
+        )
+        groups_by_id = {group.id: group for group in all_groups}
+        group_users = defaultdict(list)
+        for group_id, user in (
+            DBSession.query(Group.id, User)
+            .join(Group.users)
+            .filter(Group.competition_id == comp.id)
+            .order_by(User.id)
+        ):
+            group_users[group_id].append(user)
 
         def new_gt(rankings_entry):
             return GradingTuple(
@@ -328,16 +272,16 @@ class CompetitionController(BaseController):
                 contributions=GradingContributionTuple(),
             )
 
-        groups = {k: new_gt(v) for k, v in rankings["groups"].items()}
+        groups = {k: new_gt(v) for k, v in result.groups.items()}
 
-        num_inputs = len(rankings["inputs"])
+        num_inputs = len(result.inputs)
         benchmark_groups = []
 
         # in the case a group submitted an input but has no outputs
         # uploaded yet, they won't be in groups as they are off the
         # rankings table. in this case, we need to make a
         # GradingTuples for them now.
-        for group in self.competition.groups:
+        for group in all_groups:
             if group.incognito:
                 groups.pop(group, None)
                 continue
@@ -351,44 +295,56 @@ class CompetitionController(BaseController):
                 rankings_entry.reject_count = num_inputs
                 groups[group] = new_gt(rankings_entry)
 
-        benchmark_groups.sort(key=lambda gt: -gt.rankings.adj_score)
         fleets = [[] for _ in range(len(benchmark_groups) + 1)]
-
-        for group, gt in groups.items():
-            # compute verification correctness
-            q = (
-                DBSession.query(Output)
-                .filter(Output.original == True)
-                .join(Output.input)
-                .filter(Input.group_id == group.id)
+        fleet_nums = rankings.fleet_numbers(
+            [gt.rankings.adj_score for gt in groups.values()],
+            [gt.rankings.adj_score for gt in benchmark_groups],
+        )
+        for gt, fleet_num in zip(groups.values(), fleet_nums, strict=True):
+            gt.fleet = fleet_num
+            fleets[fleet_num].append(gt)
+
+        # compute verification correctness
+        correct = Output.verification == Output.ground_truth
+        accepted = Output.verification == VerificationStatus.accepted
+        verification_counts = (
+            DBSession.query(
+                Input.group_id,
+                sa.func.count(case([(correct, 1)])),
+                sa.func.count(case([(sa.and_(~correct, accepted), 1)])),
+                sa.func.count(case([(sa.and_(~correct, ~accepted), 1)])),
             )
-            for oput in q:
-                if oput.verification == oput.ground_truth:
-                    gt.verification.correct += 1
-                elif oput.verification == VerificationStatus.accepted:
-                    gt.verification.false_positives += 1
-                else:
-                    gt.verification.false_negatives += 1
-
-            # Compute input difficulty
+            .join(Output.input)
+            .join(Input.group)
+            .filter(Group.competition_id == comp.id)
+            .filter(Output.original == True)
+            .group_by(Input.group_id)
+        )
+        for group_id, *counts in verification_counts:
+            gt = groups.get(groups_by_id[group_id])
+            if gt:
+                gt.verification = GradingVerificationTuple(*counts)
+
+        # Compute input difficulty
+        for gt in groups.values():
             for iput, st in gt.rankings.input_ranks.items():
-                if iput.group.incognito or iput.group.benchmark:
+                input_group = groups_by_id[iput.group_id]
+                if input_group.incognito or input_group.benchmark:
                     continue
                 if st.rank == 1:
-                    groups[iput.group].input_ones += 1
-
-            gt.fleet = 0
-            for bench_gt in benchmark_groups:
-                if gt.rankings.adj_score <= bench_gt.rankings.adj_score:
-                    gt.fleet += 1
-            fleets[gt.fleet].append(gt)
+                    groups[input_group].input_ones += 1
 
         for fleet in fleets:
-            fleet.sort(key=lambda gt: -gt.rankings.adj_score)
+            places = rankings.competition_places(
+                fleet, key=lambda gt: -gt.rankings.adj_score
+            )
+            for gt, place in zip(fleet, places, strict=True):
+                # 0-based, highest adjusted score first.
+                gt.place_in_fleet = place - 1
 
         for group, gt in groups.items():
             gt.contributions.ranking = compute_rankings_grade(
-                gt, gt.fleet, fleets[gt.fleet]
+                gt.place_in_fleet, gt.fleet, len(fleets[gt.fleet])
             )
             gt.contributions.verification = (
                 (gt.verification.correct / sum(gt.verification) * 20)
@@ -411,38 +367,43 @@ class CompetitionController(BaseController):
                 gt.contributions.input_submitted = 0
                 gt.contributions.input_difficulty = 0
 
-        return {"groups": groups, "competition": self.competition}
+        return {"groups": groups, "group_users": group_users, "competition": comp}
 
-    @logoutput
+    @expose("json")
     @require(has_permission("admin"))
     def reverify(self):
-        problem = problem_client.ProblemClient(self.competition.problem)
-
-        changes = 0
-        for group in self.competition.groups:
-            if group.input:
-                for output in group.input.outputs:
-                    old_status = output.ground_truth
-                    input_content = group.input.data.file.read().decode("utf-8")
-                    output_content = output.data.file.read().decode("utf-8")
-                    try:
-                        verified_output = problem.verify_output(
-                            input_content,
-                            output_content,
-                        )
-                        verified_output.require_accepted()
-                    except problem_client.VerificationError as e:
-                        output.ground_truth = VerificationStatus.rejected
-                        print(f"{output} rejected because: {e}")
-                    else:
-                        output.ground_truth = VerificationStatus.accepted
-                    if old_status != output.ground_truth:
-                        print(
-                            f"{output} changed: {old_status} -> {output.ground_truth}"
-                        )
-                        changes += 1
-        DBSession.flush()
-        print(f"{changes} ground truths changed")
+        job = reverify.start(self.competition)
+        if request.response_type != "application/json":
+            redirect(f"/competition/{self.competition.id}/reverify_status")
+        return reverify.job_status(job)
+
+    @expose("algobowl.templates.competition.reverify")
+    @expose("json")
+    @require(has_permission("admin"))
+    def reverify_status(self):
+        job = reverify.latest_job(self.competition)
+        if not job:
+            abort(404, "Reverify has not been run for this competition.")
+        if request.response_type == "application/json":
+            return reverify.job_status(job)
+        return {"competition": self.competition, "job": job}
+
+    @expose("json")
+    @require(has_permission("admin"))
+    def build_input_archive(self):
+        archive = input_archive.build_archive(self.competition)
+        return {"status": "success", "url": archive.url}
+
+    @expose("json")
+    @require(has_permission("admin"))
+    def rebuild_rankings(self):
+        problem = problem_client.get_client(self.competition.problem)
+        rankings.rebuild(self.competition, problem)
+        mismatches = rankings.check(self.competition, problem)
+        return {
+            "status": "success" if not mismatches else "error",
+            "mismatches": mismatches,
+        }
 
     @expose("algobowl.templates.competition.ov")
     def ov(self, output_id):
@@ -460,13 +421,13 @@ class CompetitionController(BaseController):
             group = (
                 DBSession.query(Group)
                 .filter(Group.competition_id == self.competition.id)
-                .filter(Group.users.any(id=user.id))
+                .filter(membership.member_clause(user))
                 .first()
             )
         else:
             group = None
 
-        problem = problem_client.ProblemClient(self.competition.problem)
+        problem = problem_client.get_client(self.competition.problem)
         message = request.POST.get("message")
         if group and message:
             if output.use_ground_truth:
@@ -482,6 +443,7 @@ class CompetitionController(BaseController):
 
             DBSession.add(output)
             DBSession.add(protest)
+            rankings.refresh_input(output.input)
 
             flash("Your protest has been submitted.", "success")
 
@@ -500,7 +462,7 @@ class CompetitionController(BaseController):
                 "The problem statement is no longer available as the "
                 "competition has been archived.",
             )
-        problem = problem_client.ProblemClient(self.competition.problem)
+        problem = problem_client.get_client(self.competition.problem)
         response.content_type = "application/pdf"
         return problem.statement_pdf()
 
@@ -520,11 +482,10 @@ class CompetitionsController(BaseController):
 
     @expose("algobowl.templates.competition.archive")
     def archive(self):
-        now = datetime.datetime.now()
         comps = []
         for comp in (
             DBSession.query(Competition)
-            .filter(Competition.open_verification_ends <= now)
+            .filter(Competition.open_verification_ends <= phases.now())
             .order_by(Competition.input_upload_ends.desc())
         ):
             if not comps or comps[-1].year != comp.input_upload_ends.year:
@@ -536,7 +497,7 @@ class CompetitionsController(BaseController):
 
     @expose("algobowl.templates.competition.list")
     def index(self):
-        now = datetime.datetime.now()
+        now = phases.now()
         comps = (
             DBSession.query(Competition)
             .filter(Competition.output_upload_begins <= now)
@@ -4,8 +4,11 @@ import datetime
 import re
 
 import tg
+from depot.fields.upload import UploadedFile
+from sqlalchemy.orm import contains_eager
 
 from algobowl import model
+from algobowl.lib import input_archive, membership, phases
 
 
 def input_redirector(group_id: str) -> model.Input:
@@ -17,8 +20,8 @@ def input_redirector(group_id: str) -> model.Input:
 
     user = tg.request.identity and tg.request.identity.get("user")
     is_admin = tg.request.environ["is_admin"]
-    is_group_member = user in group.users
-    file_is_public = datetime.datetime.now() >= competition.output_upload_begins
+    is_group_member = membership.is_member(user, group.id)
+    file_is_public = competition.has_begun(phases.Phase.output_upload)
 
     if not file_is_public and not is_admin and group.input and group.input.is_default:
         tg.abort(403, "Default inputs are not downloadable until output upload begins.")
@@ -38,6 +41,7 @@ def output_redirector(from_group_id: str, to_group_id: str) -> model.Output:
     output = (
         model.DBSession.query(model.Output)
         .join(model.Output.input)
+        .options(contains_eager(model.Output.input))
         .filter(model.Input.group_id == to_group_id)
         .filter(model.Output.group_id == from_group_id)
         .filter(model.Output.active == True)
@@ -49,9 +53,9 @@ def output_redirector(from_group_id: str, to_group_id: str) -> model.Output:
     competition = output.group.competition
     user = tg.request.identity and tg.request.identity.get("user")
     is_admin = tg.request.environ["is_admin"]
-    is_uploader = user in output.group.users
-    is_verifier = user in output.input.group.users
-    visible_to_verifier = datetime.datetime.now() >= competition.verification_begins
+    is_uploader = membership.is_member(user, output.group_id)
+    is_verifier = membership.is_member(user, output.input.group_id)
+    visible_to_verifier = competition.has_begun(phases.Phase.verification)
     file_is_public = competition.open_verification_open
 
     if (
@@ -66,13 +70,33 @@ def output_redirector(from_group_id: str, to_group_id: str) -> model.Output:
     return None
 
 
+def input_archive_redirector(competition_id: str) -> model.InputArchive:
+    competition_id = int(competition_id)
+    competition = model.DBSession.query(model.Competition).get(competition_id)
+    if not competition:
+        tg.abort(404, "No such competition.")
+
+    is_admin = tg.request.environ["is_admin"]
+    file_is_public = competition.has_begun(phases.Phase.output_upload)
+
+    if file_is_public or is_admin:
+        archive = input_archive.get_archive(competition)
+        if not archive:
+            tg.abort(404, "The input archive has not been built yet.")
+        return archive
+
+    tg.abort(403, "Inputs are not downloadable until output upload begins.")
+    return None
+
+
 file_pattern_handlers = [
     (re.compile(r"input_group(\d+)"), input_redirector),
     (re.compile(r"output_from_(\d+)_to_(\d+)"), output_redirector),
+    (re.compile(r"inputs_competition(\d+)"), input_archive_redirector),
 ]
 
 
-def get_file(filename: str) -> model.Input | model.Output:
+def get_file(filename: str) -> model.Input | model.Output | model.InputArchive:
     for pattern, func in file_pattern_handlers:
         m = pattern.fullmatch(filename)
         if m:
@@ -80,3 +104,82 @@ def get_file(filename: str) -> model.Input | model.Output:
 
     tg.abort(404, "No handler found for filename.")
     return None
+
+
+# Size of each chunk read from storage while streaming a file.
+_BLOCK_SIZE = 256 * 1024
+
+
+class _StoredFileIter:
+    """Streams a depot stored file in chunks, optionally only a byte range.
+
+    Implements ``app_iter_range`` so WebOb can answer Range requests.
+    """
+
+    def __init__(self, stored_file, start: int = 0, stop: int | None = None):
+        self.stored_file = stored_file
+        self.start = start
+        self.stop = stop
+
+    def __iter__(self):
+        f = self.stored_file
+        remaining = None if self.stop is None else self.stop - self.start
+        try:
+            if self.start:
+                if f.seekable():
+                    f.seek(self.start)
+                else:
+                    f.read(self.start)
+            while remaining is None or remaining > 0:
+                size = _BLOCK_SIZE if remaining is None else min(_BLOCK_SIZE, remaining)
+                chunk = f.read(size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
+
+    def app_iter_range(self, start: int, stop: int | None) -> _StoredFileIter:
+        return _StoredFileIter(self.stored_file, start, stop)
+
+
+def serve_file(uploaded_file: UploadedFile):
+    """Streams an uploaded file as the current response.
+
+    The ETag and Last-Modified headers come from the file metadata stored in
+    the database, so conditional requests for an unchanged file are answered
+    with 304 Not Modified without opening the file in storage.
+    """
+    response = tg.response
+    response.content_type = "application/octet-stream"
+    response.etag = uploaded_file["file_id"]
+    response.last_modified = datetime.datetime.strptime(
+        uploaded_file["uploaded_at"], "%Y-%m-%d %H:%M:%S"
+    ).replace(tzinfo=datetime.timezone.utc)
+    # Access to files is checked per user, so shared caches must not keep them.
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.accept_ranges = "bytes"
+
+    # WebOb answers conditional and Range requests from these headers when
+    # the response is sent.
+    response.conditional_response = True
+
+    request = tg.request
+    if request.if_none_match:
+        not_modified = response.etag in request.if_none_match
+    else:
+        not_modified = (
+            request.if_modified_since is not None
+            and response.last_modified <= request.if_modified_since
+        )
+    if not_modified:
+        response.app_iter = []
+        return response
+
+    stored_file = uploaded_file.file
+    response.app_iter = _StoredFileIter(stored_file)
+    response.content_length = stored_file.content_length
+    return response
@@ -1,23 +1,41 @@
-import datetime
 import re
 from io import BytesIO
 
 from depot.io.utils import FileIntent
+from sqlalchemy.orm import contains_eager
 from tg import abort, expose, flash, redirect, request, require, url
 from tg.predicates import has_permission, not_anonymous
 
-from algobowl.lib import problem_client
+from algobowl.lib import (
+    membership,
+    phases,
+    problem_client,
+    rankings,
+    submissions,
+)
 from algobowl.lib.base import BaseController
 from algobowl.model import (
+    Competition,
     DBSession,
     Group,
     Input,
     Output,
+    OutputSubmission,
     VerificationStatus,
 )
 
 __all__ = ["GroupController", "GroupsController"]
 
+# Phases which have a stage page.
+STAGES = frozenset(
+    {
+        phases.Phase.input_upload,
+        phases.Phase.output_upload,
+        phases.Phase.verification,
+        phases.Phase.resolution,
+    }
+)
+
 newline_p = re.compile(rb"\s*\n")
 spacesep_p = re.compile(rb"[ \t\v\f]+")
 
@@ -32,16 +50,8 @@ class GroupController(BaseController):
 
     @expose("algobowl.templates.group.index")
     def index(self):
-        stage = None
-        if self.group.competition.input_upload_open:
-            stage = "input_upload"
-        if self.group.competition.output_upload_open:
-            stage = "output_upload"
-        if self.group.competition.verification_open:
-            stage = "verification"
-        if self.group.competition.resolution_open:
-            stage = "resolution"
-
+        phase = self.group.competition.phase
+        stage = phase.value if phase in STAGES else None
         return self.stagepage(stage)
 
     @expose("algobowl.templates.group.index")
@@ -61,7 +71,7 @@ class GroupController(BaseController):
     @expose("json")
     def output_upload_list_api(self):
         outputs = {}
-        if datetime.datetime.now() < self.group.competition.output_upload_begins:
+        if not self.group.competition.has_begun(phases.Phase.output_upload):
             return {"outputs": []}
         for group in self.group.competition.groups:
             if group.input is not None:
@@ -100,7 +110,7 @@ class GroupController(BaseController):
                 ),
             }
 
-        problem = problem_client.ProblemClient(self.group.competition.problem)
+        problem = problem_client.get_client(self.group.competition.problem)
         try:
             normalized_input = problem.normalize_input(contents)
         except problem_client.FileFormatError as e:
@@ -163,8 +173,7 @@ class GroupController(BaseController):
             flash("Thank you. Your input has been accepted!", "success")
         redirect(self.base_url)
 
-    @expose("json")
-    def submit_output(self, to_group, output_file=None):
+    def _output_target(self, to_group, output_file):
         to_group = DBSession.query(Group).get(to_group)
         if not to_group:
             abort(404, "No such group")
@@ -174,78 +183,49 @@ class GroupController(BaseController):
             abort(400, "Must include file in submission")
         if to_group.input is None:
             abort(400, "That group has no input")
-        comp = self.group.competition
-        existing = (
-            DBSession.query(Output)
-            .filter(Output.group_id == self.group.id)
-            .filter(Output.input_id == to_group.input.id)
-            .filter(Output.active == True)
-            .one_or_none()
-        )
-        if not (
-            request.environ["is_admin"]
-            or comp.output_upload_open
-            or (
-                comp.resolution_open
-                and existing is not None
-                and not existing.use_ground_truth
-            )
-            or (comp.resolution_open and existing is None)
+        existing = submissions.active_output(self.group, to_group.input)
+        if not submissions.upload_allowed(
+            self.group.competition,
+            existing,
+            phases.now(),
+            request.environ["is_admin"],
         ):
             abort(403, "Forbidden to upload this output at this time")
+        return to_group, existing
 
-        try:
-            contents = output_file.file.read().decode("utf-8")
-        except UnicodeDecodeError:
-            return {"status": "error", "msg": "Output contains invalid characters."}
-
-        problem = problem_client.ProblemClient(comp.problem)
-        input_contents = to_group.input.data.file.read().decode("utf-8")
-
-        try:
-            output = problem.verify_output(input_contents, contents)
-        except problem_client.FileFormatError as e:
-            return {
-                "status": "error",
-                "msg": f"Output has formatting errors: {e}",
-            }
+    @expose("json")
+    def submit_output(self, to_group, output_file=None):
+        to_group, existing = self._output_target(to_group, output_file)
 
-        f = FileIntent(
-            BytesIO(output.content),
-            f"output_from_{self.group.id}_to_{to_group.id}.txt",
-            "application/octet-stream",
-        )
         try:
-            output.require_accepted()
-        except problem_client.VerificationError:
-            ground_truth = VerificationStatus.rejected
-        else:
-            ground_truth = VerificationStatus.accepted
+            db_output = submissions.save_output(
+                self.group, to_group.input, existing, output_file.file, phases.now()
+            )
+        except submissions.SubmissionError as e:
+            return {"status": "error", "msg": str(e)}
 
-        use_ground_truth = (
-            not comp.verification_begins
-            or datetime.datetime.now() >= comp.verification_begins
-        )
+        return {"status": "success", "url": db_output.url}
 
-        if existing:
-            if comp.resolution_open:
-                existing.active = False
-            else:
-                DBSession.delete(existing)
-
-        db_output = Output(
-            data=f,
-            group=self.group,
-            input=to_group.input,
-            score=output.score,
-            original=comp.output_upload_open,
-            ground_truth=ground_truth,
-            use_ground_truth=use_ground_truth,
+    @expose("json")
+    def queue_output(self, to_group, output_file=None):
+        if not submissions.enabled():
+            return self.submit_output(to_group, output_file)
+        to_group, _ = self._output_target(to_group, output_file)
+        submission = submissions.enqueue(
+            self.group,
+            to_group.input,
+            output_file.file,
+            phases.now(),
+            request.environ["is_admin"],
         )
-        DBSession.add(db_output)
-        DBSession.flush()
+        return {"status": "queued", "submission_id": submission.id}
 
-        return {"status": "success", "url": db_output.url}
+    @expose("json")
+    def submission_status(self, submission_id):
+        submission = DBSession.query(OutputSubmission).get(submission_id)
+        if not submission or submission.group_id != self.group.id:
+            abort(404, "No such submission")
+        return submissions.submission_status(submission)
 
     @expose("json")
     def submit_verification(self, output_id, status):
@@ -273,6 +253,7 @@ class GroupController(BaseController):
         assert output.active is True
         assert output.use_ground_truth is False
         output.verification = status
+        rankings.refresh_input(output.input)
         return self.verification_data()
 
     @expose("json")
@@ -321,6 +302,8 @@ class GroupController(BaseController):
             output.verification = output.ground_truth
             DBSession.add(output)
         DBSession.flush()
+        if self.group.input:
+            rankings.refresh_input(self.group.input)
 
     @expose("json")
     def resolution_protest(self, output_id):
@@ -338,6 +321,7 @@ class GroupController(BaseController):
             return {"status": "error", "msg": "Output has already been protested."}
         assert output.original
         output.use_ground_truth = True
+        rankings.refresh_input(output.input)
         return {"status": "success"}
 
 
@@ -354,7 +338,7 @@ class GroupsController(BaseController):
         group = DBSession.query(Group).get(group_id)
         if not group:
             abort(404, "No such group.")
-        if user not in group.users and not request.environ["is_admin"]:
+        if not membership.is_member(user, group.id) and not request.environ["is_admin"]:
             abort(403, "You are not a part of this group.")
         return GroupController(group), args
 
@@ -363,18 +347,22 @@ class GroupsController(BaseController):
     def index(self, list_inactive=False, list_non_member=False, competition_id=None):
         user = request.identity["user"]
 
-        all_groups = user.groups
+        query = (
+            DBSession.query(Group)
+            .join(Group.competition)
+            .options(contains_eager(Group.competition))
+            .order_by(Group.id)
+        )
         if list_non_member:
             if not request.environ["is_admin"]:
                 abort(403, "Only admin may use list_non_member.")
-            all_groups = DBSession.query(Group).all()
-
-        groups = []
-        for group in all_groups:
-            if competition_id and group.competition_id != int(competition_id):
-                continue
-            if list_inactive or group.competition.active:
-                groups.append(group)
+        else:
+            query = query.filter(membership.member_clause(user))
+        if competition_id:
+            query = query.filter(Group.competition_id == int(competition_id))
+        if not list_inactive:
+            query = query.filter(Competition.active_at(phases.now()))
+        groups = query.all()
 
         if len(groups) == 1 and request.response_type != "application/json":
             redirect(url(f"/group/{groups[0].id}"))
@@ -2,9 +2,10 @@ import datetime
 
 import sqlalchemy
 import tg
+import transaction
 
 from algobowl import model
-from algobowl.lib import base
+from algobowl.lib import base, token_cache
 
 
 class PrefController(base.BaseController):
@@ -62,13 +63,21 @@ class PrefController(base.BaseController):
             model.AuthToken.id == token_id
         )
         token = query.one_or_none()
+        if not token:
+            tg.abort(404, "No such token found")
 
         if not tg.request.environ["is_admin"] and token.user_id != user.id:
             tg.abort(403, "You don't have permission to revoke this token")
 
         client_name = token.client_name
+        client_id = token.client_id
         query.delete()
         model.DBSession.flush()
+        # Only this process's cache can be invalidated: others keep accepting
+        # the token until their entry expires (algobowl.token_cache.ttl).
+        transaction.get().addAfterCommitHook(
+            lambda success: token_cache.get_cache().invalidate(client_id)
+        )
         tg.flash(f"Client {client_name} revoked!", "success")
         tg.redirect(tg.url("/pref/cli"))
 
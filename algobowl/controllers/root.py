@@ -55,8 +55,7 @@ class RootController(BaseController):
             tg.redirect(db_obj.url)
         if redirect:
             tg.redirect(db_obj.data.url)
-        tg.response.content_type = "application/octet-stream"
-        return db_obj.data.file.read()
+        return file_redirector.serve_file(db_obj.data)
 
     @expose()
     def login(self):
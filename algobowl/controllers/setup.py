@@ -1,33 +1,25 @@
+import collections
 import datetime
 import io
-import random
+import json
 
 import tg
 from depot.io.utils import FileIntent
 
 from algobowl import model
-from algobowl.lib import base, problem_client
+from algobowl.config.auth import UnknownUsersError
+from algobowl.lib import base, input_pool, phases, problem_client
 
 
-def get_user(username):
-    user = (
-        model.DBSession.query(model.User)
-        .filter(model.User.username == username)
-        .one_or_none()
-    )
-    if user:
-        return user
-
+def resolve_users(usernames):
     mpapi = tg.request.environ["repoze.who.plugins"]["mpapi"]
-    return mpapi.new_user_by_username(username)
+    return mpapi.resolve_users(usernames)
 
 
-def generate_default_input(
-    problem: problem_client.ProblemClient,
+def make_default_input(
     group: model.Group,
+    iput: problem_client.NormalizedInput,
 ) -> model.Input:
-    iput = problem.generate_input(random.SystemRandom())
-
     input_file = FileIntent(
         io.BytesIO(iput.content),
         f"input_group{group.id}.txt",
@@ -38,6 +30,19 @@ def generate_default_input(
     return result
 
 
+def default_inputs(
+    competition: model.Competition,
+    groups: list[model.Group],
+) -> list[model.Input]:
+    pooled = input_pool.take(competition, len(groups))
+    problem = problem_client.get_client(competition.problem)
+    generated = input_pool.generate_inputs(problem, len(groups) - len(pooled))
+    return [
+        make_default_input(group, iput)
+        for group, iput in zip(groups, pooled + generated, strict=True)
+    ]
+
+
 class SetupController(base.BaseController):
     allow_only = tg.predicates.has_permission("admin")
 
@@ -55,8 +60,7 @@ class SetupController(base.BaseController):
             .filter(model.Competition.id == int(competition_id))
             .one()
         )
-        problem = problem_client.ProblemClient(competition.problem)
-        users = [get_user(username) for username in users.split(",")]
+        users = resolve_users(users.split(","))
         group = model.Group(
             users=users,
             competition=competition,
@@ -65,11 +69,87 @@ class SetupController(base.BaseController):
             benchmark=bool(benchmark),
         )
         model.DBSession.add(group)
-        if datetime.datetime.now() < competition.output_upload_begins:
-            group.input = generate_default_input(problem=problem, group=group)
+        if not competition.has_begun(phases.Phase.output_upload):
+            (group.input,) = default_inputs(competition, [group])
         model.DBSession.flush()
         return {"group_id": group.id}
 
+    @tg.expose("json")
+    def create_groups(self, competition_id=None, groups="[]"):
+        competition = (
+            model.DBSession.query(model.Competition)
+            .filter(model.Competition.id == int(competition_id))
+            .one()
+        )
+        roster = json.loads(groups)
+        usernames = [username for group_users in roster for username in group_users]
+
+        duplicates = [u for u, n in collections.Counter(usernames).items() if n > 1]
+        if duplicates:
+            return {
+                "status": "error",
+                "msg": "Users listed in more than one group: {}".format(
+                    ", ".join(sorted(duplicates))
+                ),
+            }
+
+        existing = (
+            model.DBSession.query(model.User.username)
+            .join(model.User.groups)
+            .filter(model.Group.competition_id == competition.id)
+            .filter(model.User.username.in_(usernames))
+            .all()
+        )
+        if existing:
+            return {
+                "status": "error",
+                "msg": "Users already in a group for this competition: {}".format(
+                    ", ".join(sorted(username for (username,) in existing))
+                ),
+            }
+
+        try:
+            users = dict(zip(usernames, resolve_users(usernames), strict=True))
+        except UnknownUsersError as e:
+            return {"status": "error", "msg": str(e), "unknown_users": e.usernames}
+
+        new_groups = [
+            model.Group(
+                users=[users[username] for username in group_users],
+                competition=competition,
+            )
+            for group_users in roster
+        ]
+        model.DBSession.add_all(new_groups)
+        if not competition.has_begun(phases.Phase.output_upload):
+            default_inputs(competition, new_groups)
+        model.DBSession.flush()
+
+        return {
+            "status": "success",
+            "groups": [
+                {"group_id": group.id, "users": group_users}
+                for group, group_users in zip(new_groups, roster, strict=True)
+            ],
+        }
+
+    @tg.expose("json")
+    def fill_input_pool(self, competition_id=None, size=0, workers=None):
+        competition = (
+            model.DBSession.query(model.Competition)
+            .filter(model.Competition.id == int(competition_id))
+            .one()
+        )
+        result = input_pool.fill(
+            competition, int(size), workers=int(workers) if workers else None
+        )
+        return {
+            "generated": result.generated,
+            "pool_size": result.pool_size,
+            "seconds": result.seconds,
+            "inputs_per_second": result.inputs_per_second,
+        }
+
     @tg.expose("json")
     def setup_competition(
         self,
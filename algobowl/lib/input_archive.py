@@ -0,0 +1,231 @@
+"""Zip archives of all inputs in a competition.
+
+Once output upload begins, every group downloads every other group's input.
+Rather than fetching each file separately, groups can download a single zip
+with all of them.  The archive is built once, when output upload begins,
+and stored in depot; download requests only serve it.
+
+Archives are built by a builder thread, started when the app loads, which
+periodically looks for competitions past the start of output upload whose
+archive is missing.  They can also be built right away by an admin (``algobowl
+admin build-input-archive``), for example from cron when the builder thread
+is disabled.
+
+Each archive records a digest of the input files it was built from.  If an
+input is replaced after the archive was built (say, by an admin), the
+digest no longer matches, so the archive is not served, and the builder
+replaces it on its next pass.  Builders in several processes race on the
+unique (competition, digest) index, and the losers use the winner's archive.
+
+Configuration:
+
+- ``algobowl.input_archive.build_interval``: Seconds between the builder
+  thread's passes.  0 disables the builder thread.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from collections.abc import Sequence
+from typing import BinaryIO
+
+import sqlalchemy as sa
+import tg
+import transaction
+from depot.io.utils import FileIntent
+
+from algobowl.lib import phases
+from algobowl.model import Competition, DBSession, Group, Input, InputArchive
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BUILD_INTERVAL = 60.0
+
+_builder_lock = threading.Lock()
+_builder: threading.Thread | None = None
+
+
+def inputs_digest(inputs: Sequence[Input]) -> str:
+    """Computes the digest identifying the contents of an archive.
+
+    Args:
+        inputs: Inputs in the archive.
+
+    Returns:
+        Hex digest over the group and depot file id of each input.
+    """
+    h = hashlib.sha256()
+    for iput in sorted(inputs, key=lambda i: i.group_id):
+        h.update(f"{iput.group_id}:{iput.data.file_id}\n".encode())
+    return h.hexdigest()
+
+
+def _competition_inputs(competition: Competition) -> list[Input]:
+    return (
+        DBSession.query(Input)
+        .join(Input.group)
+        .filter(Group.competition_id == competition.id)
+        .order_by(Input.group_id)
+        .all()
+    )
+
+
+def get_archive(competition: Competition) -> InputArchive | None:
+    """Gets the input archive for a competition.
+
+    Args:
+        competition: Competition to get the archive for.
+
+    Returns:
+        The archive of the current inputs, or None if it has not been built.
+    """
+    digest = inputs_digest(_competition_inputs(competition))
+    return _find_archive(DBSession, competition.id, digest)
+
+
+def build_archive(competition: Competition) -> InputArchive:
+    """Builds the input archive for a competition, unless already built.
+
+    The archive is committed in its own transaction, regardless of the
+    caller's.
+
+    Args:
+        competition: Competition to archive inputs for.
+
+    Returns:
+        An archive with the current inputs.
+    """
+    inputs = _competition_inputs(competition)
+    digest = inputs_digest(inputs)
+    archive = _find_archive(DBSession, competition.id, digest)
+    if archive:
+        return archive
+    archive_id = _build_archive(competition.id, inputs, digest)
+    return DBSession.query(InputArchive).get(archive_id)
+
+
+def build_due() -> int:
+    """Builds the missing archives of competitions in output upload or later.
+
+    Returns:
+        The number of competitions whose archives were checked.
+    """
+    now = phases.now()
+    competitions = (
+        DBSession.query(Competition)
+        .filter(Competition.output_upload_begins <= now)
+        .filter(Competition.end > now)
+        .all()
+    )
+    for competition in competitions:
+        build_archive(competition)
+    return len(competitions)
+
+
+def start_builder() -> None:
+    """Starts the builder thread for this process, if enabled.
+
+    Registered to run once the app's environment has loaded.
+    """
+    global _builder  # noqa: PLW0603
+    interval = float(
+        tg.config.get("algobowl.input_archive.build_interval", DEFAULT_BUILD_INTERVAL)
+    )
+    if interval <= 0:
+        return
+    with _builder_lock:
+        if _builder is not None and _builder.is_alive():
+            return
+        _builder = threading.Thread(
+            target=_build_forever,
+            args=(interval,),
+            name="input-archive-builder",
+            daemon=True,
+        )
+        _builder.start()
+
+
+def _build_forever(interval: float) -> None:
+    """Builds due archives every ``interval`` seconds.  Runs in a thread."""
+    while True:
+        time.sleep(interval)
+        try:
+            with transaction.manager:
+                build_due()
+        except Exception:
+            log.exception("Building input archives failed")
+        finally:
+            DBSession.remove()
+
+
+def _build_archive(competition_id: int, inputs: Sequence[Input], digest: str) -> int:
+    """Builds and commits an archive, unless someone else already has.
+
+    Runs in a separate session, so the archive is committed regardless of
+    the caller's transaction.
+
+    Args:
+        competition_id: Competition to archive inputs for.
+        inputs: Inputs to archive.
+        digest: Digest of the inputs.
+
+    Returns:
+        The ID of the archive.
+    """
+    session = sa.orm.Session(bind=DBSession.get_bind())
+    try:
+        archive = _find_archive(session, competition_id, digest)
+        if archive:
+            return archive.id
+
+        for stale in session.query(InputArchive).filter(
+            InputArchive.competition_id == competition_id
+        ):
+            session.delete(stale)
+
+        # Inputs are spooled to disk rather than memory, as the archive can
+        # be quite large for big competitions.
+        with tempfile.TemporaryFile() as f:
+            _write_zip(f, inputs)
+            f.seek(0)
+            archive = InputArchive(
+                competition_id=competition_id,
+                digest=digest,
+                data=FileIntent(
+                    f, f"inputs_competition{competition_id}.zip", "application/zip"
+                ),
+            )
+            session.add(archive)
+            try:
+                session.commit()
+            except sa.exc.IntegrityError:
+                # Another process built the same archive first.
+                session.rollback()
+                return _find_archive(session, competition_id, digest).id
+        return archive.id
+    finally:
+        session.close()
+
+
+def _find_archive(
+    session: sa.orm.Session, competition_id: int, digest: str
+) -> InputArchive | None:
+    return (
+        session.query(InputArchive)
+        .filter(InputArchive.competition_id == competition_id)
+        .filter(InputArchive.digest == digest)
+        .one_or_none()
+    )
+
+
+def _write_zip(f: BinaryIO, inputs: Sequence[Input]) -> None:
+    with zipfile.ZipFile(f, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for iput in inputs:
+            with iput.data.file as src, zf.open(iput.filename, "w") as dst:
+                shutil.copyfileobj(src, dst)
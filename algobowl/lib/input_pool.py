@@ -0,0 +1,174 @@
+"""Pool of pre-generated default inputs.
+
+Groups which have not uploaded an input are given one generated by the
+problem service.  For problems with expensive generators, generating an
+input for each group while setting up a competition is slow, so inputs can
+be generated ahead of time, in parallel, into a per-competition pool stored
+in depot.  Setting up groups then draws inputs from the pool, and only
+generates inputs on demand once the pool runs dry.
+
+Pooled inputs record the problem service they were generated by, so a pool
+is not used if the competition's problem is changed.
+
+Configuration:
+
+- ``algobowl.input_pool.workers``: Number of inputs generated concurrently.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import dataclasses
+import io
+import random
+import time
+
+import tg
+from depot.io.utils import FileIntent
+from tg.support.converters import asint
+
+from algobowl.lib import problem_client
+from algobowl.model import Competition, DBSession, PooledInput
+
+DEFAULT_WORKERS = 8
+
+
+@dataclasses.dataclass(frozen=True)
+class FillResult:
+    """Result of filling a competition's input pool.
+
+    Attributes:
+        generated: Number of inputs generated.
+        pool_size: Number of inputs in the pool afterwards.
+        seconds: Time spent generating inputs.
+    """
+
+    generated: int
+    pool_size: int
+    seconds: float
+
+    @property
+    def inputs_per_second(self) -> float:
+        return self.generated / self.seconds if self.seconds else 0.0
+
+
+def default_workers() -> int:
+    """Gets the configured number of concurrent generation workers.
+
+    Returns:
+        Number of workers.
+    """
+    return asint(tg.config.get("algobowl.input_pool.workers", DEFAULT_WORKERS))
+
+
+def generate_inputs(
+    problem: problem_client.ProblemClient,
+    count: int,
+    workers: int | None = None,
+) -> list[problem_client.NormalizedInput]:
+    """Generates inputs concurrently.
+
+    Args:
+        problem: Problem client.
+        count: Number of inputs to generate.
+        workers: Number of inputs generated concurrently, or None for the
+            configured default.
+
+    Returns:
+        The generated inputs.
+    """
+    if count <= 0:
+        return []
+    rng = random.SystemRandom()
+    workers = min(workers or default_workers(), count)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda _: problem.generate_input(rng), range(count)))
+
+
+def pool_size(competition: Competition) -> int:
+    """Counts the usable inputs in a competition's pool.
+
+    Args:
+        competition: Competition.
+
+    Returns:
+        Number of pooled inputs generated by the competition's problem.
+    """
+    return _pool_query(competition).count()
+
+
+def fill(
+    competition: Competition,
+    size: int,
+    workers: int | None = None,
+) -> FillResult:
+    """Generates inputs until a competition's pool holds at least ``size``.
+
+    Args:
+        competition: Competition.
+        size: Desired number of pooled inputs.
+        workers: Number of inputs generated concurrently, or None for the
+            configured default.
+
+    Returns:
+        What was generated, and how quickly.
+    """
+    problem = problem_client.get_client(competition.problem)
+    missing = max(size - pool_size(competition), 0)
+    start = time.monotonic()
+    generated = generate_inputs(problem, missing, workers)
+    seconds = time.monotonic() - start
+
+    for iput in generated:
+        DBSession.add(
+            PooledInput(
+                competition=competition,
+                problem=competition.problem,
+                data=FileIntent(
+                    io.BytesIO(iput.content),
+                    f"pooled_input_competition{competition.id}.txt",
+                    "application/octet-stream",
+                ),
+            )
+        )
+    DBSession.flush()
+    return FillResult(
+        generated=len(generated),
+        pool_size=pool_size(competition),
+        seconds=seconds,
+    )
+
+
+def take(competition: Competition, count: int) -> list[problem_client.NormalizedInput]:
+    """Removes up to ``count`` inputs from a competition's pool.
+
+    Args:
+        competition: Competition.
+        count: Maximum number of inputs to take.
+
+    Returns:
+        The pooled inputs, which may be fewer than requested.
+    """
+    if count <= 0:
+        return []
+    pooled = (
+        _pool_query(competition)
+        .order_by(PooledInput.id)
+        .limit(count)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    result = []
+    for row in pooled:
+        with row.data.file as f:
+            result.append(problem_client.NormalizedInput(f.read()))
+        DBSession.delete(row)
+    return result
+
+
+def _pool_query(competition: Competition):
+    return (
+        DBSession.query(PooledInput)
+        .filter(PooledInput.competition_id == competition.id)
+        .filter(PooledInput.problem == competition.problem)
+    )
@@ -0,0 +1,86 @@
+"""Group membership checks.
+
+Membership is decided in SQL against the ``user_group_xref`` table rather
+than by loading ``Group.users`` and searching it in Python.  Within a
+request, the ids of the groups a user is in are loaded with a single
+indexed query the first time they are needed, and reused by every later
+check.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+import tg
+
+from algobowl.model import DBSession, Group, User, user_group_xref
+
+# Request environ key holding memoized group ids, by user id.
+_ENVIRON_KEY = "algobowl.membership"
+
+
+def member_clause(user: User) -> sa.sql.ClauseElement:
+    """Builds an EXISTS filter for groups the user is a member of.
+
+    Args:
+        user: User.
+
+    Returns:
+        A clause which is true for rows of ``Group`` the user is in.
+    """
+    return (
+        sa.exists()
+        .where(user_group_xref.c.group_id == Group.id)
+        .where(user_group_xref.c.user_id == user.id)
+    )
+
+
+def group_ids(user: User | None) -> frozenset[int]:
+    """Gets the ids of the groups a user is a member of.
+
+    The result is memoized for the rest of the request.
+
+    Args:
+        user: User, or None for anonymous users.
+
+    Returns:
+        Ids of the user's groups.
+    """
+    if user is None:
+        return frozenset()
+    memo = _request_memo()
+    ids = memo.get(user.id)
+    if ids is None:
+        ids = frozenset(
+            group_id
+            for (group_id,) in DBSession.query(user_group_xref.c.group_id).filter(
+                user_group_xref.c.user_id == user.id
+            )
+        )
+        memo[user.id] = ids
+    return ids
+
+
+def is_member(user: User | None, group_id: int) -> bool:
+    """Checks whether a user is a member of a group.
+
+    Args:
+        user: User, or None for anonymous users.
+        group_id: Group id.
+
+    Returns:
+        True if the user is in the group.
+    """
+    return group_id in group_ids(user)
+
+
+def _request_memo() -> dict[int, frozenset[int]]:
+    """Gets the memo for the current request.
+
+    Returns:
+        The memo, or an empty throwaway dict outside of a request.
+    """
+    try:
+        environ = tg.request.environ
+    except TypeError:
+        return {}
+    return environ.setdefault(_ENVIRON_KEY, {})
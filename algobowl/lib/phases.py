@@ -0,0 +1,244 @@
+"""Competition phases and the clock they are evaluated against.
+
+A competition runs through a fixed sequence of phases, each scheduled as a
+half-open window ``[begins, ends)``.  Input and output upload are always
+scheduled; the later phases are optional.  A competition is published when
+input upload begins, active until the last scheduled phase ends, and
+archived some time after that.
+
+The schedule of a competition is summarized by an immutable
+:class:`Timeline`, which ``Competition.timeline`` builds once and reuses
+until the schedule is changed.
+
+Times are compared against :func:`now`, which is fixed for the duration of
+a request, so every check made while handling a request agrees on which
+phase a competition is in, even across a phase boundary.  Tests can pin the
+clock with :func:`frozen_clock`.
+
+This module is imported by :mod:`algobowl.model`, so it must not import
+the model itself.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import dataclasses
+import datetime
+import enum
+from collections.abc import Iterator
+
+import tg
+
+# Competitions are archived (hiding problem statements and input
+# downloads) this long after they end.
+ARCHIVE_AFTER = datetime.timedelta(days=90)
+
+# Request environ key holding the request's clock reading.
+_ENVIRON_KEY = "algobowl.now"
+
+_frozen_now: datetime.datetime | None = None
+
+
+class Phase(enum.Enum):
+    """A phase of a competition, in order.
+
+    Each phase is scheduled by the ``<phase>_begins`` and ``<phase>_ends``
+    columns of the competition.
+    """
+
+    input_upload = "input_upload"
+    output_upload = "output_upload"
+    verification = "verification"
+    resolution = "resolution"
+    open_verification = "open_verification"
+
+    @property
+    def columns(self) -> tuple[str, str]:
+        return f"{self.value}_begins", f"{self.value}_ends"
+
+
+@dataclasses.dataclass(frozen=True)
+class Window:
+    """When a phase is scheduled.
+
+    Attributes:
+        phase: Phase.
+        begins: Start of the phase.
+        ends: End of the phase (exclusive).
+    """
+
+    phase: Phase
+    begins: datetime.datetime
+    ends: datetime.datetime
+
+    def __contains__(self, when: datetime.datetime) -> bool:
+        return self.begins <= when < self.ends
+
+
+@dataclasses.dataclass(frozen=True)
+class Timeline:
+    """The schedule of a competition.
+
+    Attributes:
+        windows: Windows of the scheduled phases, in order.
+        end: When the last scheduled phase ends.
+        archived_at: When the competition is archived.
+        transitions: Every time at which the phase changes, or the
+            competition is archived, in order.
+    """
+
+    windows: tuple[Window, ...]
+    end: datetime.datetime
+    archived_at: datetime.datetime
+    transitions: tuple[datetime.datetime, ...]
+
+    @classmethod
+    def of(cls, competition) -> Timeline:
+        """Builds the timeline of a competition.
+
+        Args:
+            competition: Competition, or anything with the same
+                ``<phase>_begins`` and ``<phase>_ends`` attributes.
+
+        Returns:
+            The timeline.
+        """
+        windows = []
+        for phase in Phase:
+            begins, ends = (getattr(competition, col) for col in phase.columns)
+            if begins and ends:
+                windows.append(Window(phase, begins, ends))
+        end = max(window.ends for window in windows)
+        archived_at = end + ARCHIVE_AFTER
+        transitions = {archived_at}
+        for window in windows:
+            transitions.update((window.begins, window.ends))
+        return cls(
+            windows=tuple(windows),
+            end=end,
+            archived_at=archived_at,
+            transitions=tuple(sorted(transitions)),
+        )
+
+    @property
+    def begins(self) -> datetime.datetime:
+        return self.windows[0].begins
+
+    def window(self, phase: Phase) -> Window | None:
+        """Gets when a phase is scheduled.
+
+        Args:
+            phase: Phase.
+
+        Returns:
+            The window, or None if the phase is not scheduled.
+        """
+        for window in self.windows:
+            if window.phase is phase:
+                return window
+        return None
+
+    def phase_at(self, when: datetime.datetime) -> Phase | None:
+        """Finds the phase a competition is in.
+
+        Args:
+            when: Time.
+
+        Returns:
+            The phase, or None before, after, or between phases.
+        """
+        for window in self.windows:
+            if when in window:
+                return window.phase
+        return None
+
+    def is_open(self, phase: Phase, when: datetime.datetime) -> bool:
+        """Checks whether a phase is open.
+
+        Args:
+            phase: Phase.
+            when: Time.
+
+        Returns:
+            True if the phase is scheduled and ``when`` is within it.
+        """
+        window = self.window(phase)
+        return window is not None and when in window
+
+    def has_begun(self, phase: Phase, when: datetime.datetime) -> bool:
+        """Checks whether a phase has begun (and possibly ended).
+
+        Args:
+            phase: Phase.
+            when: Time.
+
+        Returns:
+            True if the phase is scheduled and began at or before ``when``.
+        """
+        window = self.window(phase)
+        return window is not None and window.begins <= when
+
+    def published(self, when: datetime.datetime) -> bool:
+        return self.begins <= when
+
+    def active(self, when: datetime.datetime) -> bool:
+        return self.begins <= when < self.end
+
+    def archived(self, when: datetime.datetime) -> bool:
+        return when >= self.archived_at
+
+    def next_transition(self, when: datetime.datetime) -> datetime.datetime | None:
+        """Finds when the phase next changes.
+
+        Args:
+            when: Time.
+
+        Returns:
+            The first transition after ``when``, or None once the
+            competition is archived.
+        """
+        i = bisect.bisect_right(self.transitions, when)
+        if i == len(self.transitions):
+            return None
+        return self.transitions[i]
+
+
+def now() -> datetime.datetime:
+    """Gets the current time.
+
+    Within a request, this is the time of the first call during that
+    request.  Outside of a request, it is the actual current time.
+
+    Returns:
+        The current time.
+    """
+    if _frozen_now is not None:
+        return _frozen_now
+    try:
+        environ = tg.request.environ
+    except TypeError:
+        return datetime.datetime.now()
+    when = environ.get(_ENVIRON_KEY)
+    if when is None:
+        when = environ[_ENVIRON_KEY] = datetime.datetime.now()
+    return when
+
+
+@contextlib.contextmanager
+def frozen_clock(when: datetime.datetime) -> Iterator[None]:
+    """Pins :func:`now` to a fixed time, for tests.
+
+    The clock is pinned for every thread, so this is not for use while
+    serving real requests.
+
+    Args:
+        when: Time to pin the clock to.
+    """
+    global _frozen_now  # noqa: PLW0603
+    previous = _frozen_now
+    _frozen_now = when
+    try:
+        yield
+    finally:
+        _frozen_now = previous
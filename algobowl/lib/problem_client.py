@@ -1,11 +1,17 @@
 """Client helpers for algops problem support services."""
 
+import collections
 import dataclasses
 import enum
-import functools
+import hashlib
 import random
+import threading
+import time
 import urllib.parse
+from collections.abc import Callable, Sequence
+from typing import Any, BinaryIO
 
+import connectrpc.code
 import connectrpc.errors
 import requests
 
@@ -88,7 +94,7 @@ class VerifiedOutput:
             raise VerificationError(self.rejection_reason)
 
 
-def _content_to_bytes(content: str | bytes) -> bytes:
+def content_to_bytes(content: str | bytes) -> bytes:
     """Converts text or bytes content to bytes.
 
     Args:
@@ -116,73 +122,136 @@ def _bytes_to_text(content: bytes) -> str:
 
 def _verified_output_from_proto(
     output: problem_support_pb2.VerifiedOutput,
+    sent: Callable[[], bytes] | None = None,
 ) -> VerifiedOutput:
     """Converts a VerifiedOutput protobuf into a local value object.
 
     Args:
         output: VerifiedOutput protobuf from the algops service.
+        sent: Gets the output content that was sent, which is the normalized
+            content if the service reports it unchanged.
 
     Returns:
         Local verified output value object.
 
     Raises:
-        ProblemClientError: The service omitted the verification result.
+        ProblemClientError: The service omitted the verification result, or
+            reported the output unchanged when none was sent.
     """
+    if output.unchanged:
+        if sent is None:
+            raise ProblemClientError("VerifiedOutput unexpectedly unchanged")
+        content = sent()
+    else:
+        content = output.normalized_content
     verification = output.WhichOneof("verification")
     if verification == "accepted":
         return VerifiedOutput(
-            content=output.normalized_content,
+            content=content,
             score=output.reported_score,
             rejection_reason=None,
         )
     if verification == "rejected":
         return VerifiedOutput(
-            content=output.normalized_content,
+            content=content,
             score=output.reported_score,
             rejection_reason=output.rejected.rejection_reason,
         )
     raise ProblemClientError("VerifiedOutput did not include verification")
 
 
+INFO_TTL_SECONDS = 300
+"""How long problem metadata is cached before being fetched again."""
+
+MAX_REGISTERED_INPUTS = 1024
+"""How many registered input digests each client remembers."""
+
+STREAM_CHUNK_SIZE = 64 * 1024
+"""Default size of each message sent by verify_output_stream()."""
+
+
+def _verify_output_response(
+    response: problem_support_pb2.VerifyOutputResponse,
+    sent: Callable[[], bytes] | None = None,
+) -> VerifiedOutput:
+    """Converts a VerifyOutputResponse into a verified output.
+
+    Args:
+        response: VerifyOutputResponse protobuf from the algops service.
+        sent: Gets the output content that was sent, as for
+            _verified_output_from_proto().
+
+    Returns:
+        Local verified output value object.
+
+    Raises:
+        FileFormatError: The input or output has formatting errors.
+        ProblemClientError: The response omits the output.
+    """
+    if response.WhichOneof("result") == "format_error":
+        raise FileFormatError(response.format_error)
+    if response.WhichOneof("result") != "output":
+        raise ProblemClientError("VerifyOutput response did not include output")
+    return _verified_output_from_proto(response.output, sent)
+
+
 class ProblemClient:
     """Client for an algops problem support service.
 
+    A ProblemClient holds a long-lived Connect client and HTTP session, so
+    connections to the service are reused across calls.  It is safe to share
+    between threads; use get_client() to get the process-wide instance for a
+    URL.
+
     Attributes:
         url: Base URL of the problem support service.
+        info_ttl: Seconds to cache problem metadata for.
     """
 
-    def __init__(self, url: str) -> None:
+    def __init__(self, url: str, info_ttl: float = INFO_TTL_SECONDS) -> None:
         """Initializes a problem client.
 
         Args:
             url: Base URL of the problem support service.
+            info_ttl: Seconds to cache problem metadata for.
         """
         self.url = url.rstrip("/")
-
-    def _client(
-        self,
-    ) -> problem_support_connect.ProblemSupportServiceClientSync:
-        """Creates a generated Connect client.
-
-        Returns:
-            A synchronous generated Connect client.
-        """
-        return problem_support_connect.ProblemSupportServiceClientSync(
+        self.info_ttl = info_ttl
+        self._info = None
+        self._info_expires = 0.0
+        self._info_lock = threading.Lock()
+        self._client = problem_support_connect.ProblemSupportServiceClientSync(
             self.url,
             accept_compression=(),
             send_compression=None,
         )
+        self._session = requests.Session()
+        # Digest of each input registered with the service, mapped to
+        # whether the service agreed to hold it.
+        self._registered: collections.OrderedDict[bytes, bool] = (
+            collections.OrderedDict()
+        )
+        self._registered_lock = threading.Lock()
+        self._supports_register_input = True
 
-    @functools.cached_property
+    @property
     def info(self) -> problem_support_pb2.GetProblemInfoResponse:
-        """Gets problem metadata.
+        """Gets problem metadata, fetching it if the cached copy has expired.
 
         Returns:
             The problem metadata response.
         """
-        request = problem_support_pb2.GetProblemInfoRequest()
-        with self._client() as client:
-            return client.get_problem_info(request)
+        with self._info_lock:
+            if self._info is None or time.monotonic() >= self._info_expires:
+                request = problem_support_pb2.GetProblemInfoRequest()
+                self._info = self._client.get_problem_info(request)
+                self._info_expires = time.monotonic() + self.info_ttl
+            return self._info
+
+    def invalidate_info(self) -> None:
+        """Discards cached problem metadata so the next access refetches it."""
+        with self._info_lock:
+            self._info = None
 
     def rank_sort(self) -> RankSort:
         """Gets the rank sort direction for this problem.
@@ -192,6 +261,15 @@ class ProblemClient:
         """
         return _RANK_SORT_FROM_PROTO[self.info.rank_sort]
 
+    def version(self) -> str:
+        """Gets the problem version reported by the service.
+
+        Returns:
+            The problem version, or an empty string if the service does not
+            report one.
+        """
+        return self.info.version
+
     def format_score(self, score: int) -> str:
         """Formats a score for display.
 
@@ -222,7 +300,7 @@ class ProblemClient:
                     f"{self.url}/",
                     statement.url,
                 )
-                response = requests.get(statement_url)
+                response = self._session.get(statement_url)
                 response.raise_for_status()
                 return response.content
         raise ProblemClientError("Problem does not provide a PDF statement")
@@ -230,6 +308,9 @@ class ProblemClient:
     def normalize_input(self, content: str | bytes) -> NormalizedInput:
         """Validates and normalizes input content.
 
+        If the content is already normalized, the service says so rather
+        than sending it back, and the content sent is returned.
+
         Args:
             content: Input content as text or bytes.
 
@@ -239,16 +320,107 @@ class ProblemClient:
         Raises:
             FileFormatError: The input has formatting errors.
         """
+        content = content_to_bytes(content)
         request = problem_support_pb2.VerifyInputRequest(
-            content=_content_to_bytes(content),
+            content=content,
+            accept_unchanged=True,
         )
-        with self._client() as client:
-            response = client.verify_input(request)
+        response = self._client.verify_input(request)
 
-        if response.WhichOneof("result") == "format_error":
+        result = response.WhichOneof("result")
+        if result == "format_error":
             raise FileFormatError(response.format_error)
+        if result == "unchanged":
+            return NormalizedInput(content)
         return NormalizedInput(response.normalized_content)
 
+    def register_input(self, input_content: str | bytes) -> bytes | None:
+        """Registers an input, so verify requests can reference it by digest.
+
+        Each input is registered once per client.  Services which predate
+        the RegisterInput RPC, or which cannot hold the input, are
+        remembered, so they are not asked again.
+
+        Args:
+            input_content: Input content as text or bytes.
+
+        Returns:
+            The digest of the input, or None if it must be sent in full.
+
+        Raises:
+            FileFormatError: The input has formatting errors.
+            ProblemClientError: The service returned the wrong digest.
+        """
+        content = content_to_bytes(input_content)
+        digest = hashlib.sha256(content).digest()
+        with self._registered_lock:
+            if not self._supports_register_input:
+                return None
+            registered = self._registered.get(digest)
+            if registered is not None:
+                self._registered.move_to_end(digest)
+                return digest if registered else None
+
+        request = problem_support_pb2.RegisterInputRequest(content=content)
+        try:
+            response = self._client.register_input(request)
+        except connectrpc.errors.ConnectError as exc:
+            if exc.code == connectrpc.code.Code.UNIMPLEMENTED:
+                with self._registered_lock:
+                    self._supports_register_input = False
+            elif exc.code == connectrpc.code.Code.FAILED_PRECONDITION:
+                self._remember_input(digest, registered=False)
+            # Otherwise, the service may just be busy; send the input this
+            # time, and try registering it again next time.
+            return None
+
+        if response.WhichOneof("result") == "format_error":
+            raise FileFormatError(response.format_error)
+        if response.input_digest != digest:
+            raise ProblemClientError("RegisterInput returned the wrong digest")
+        self._remember_input(digest, registered=True)
+        return digest
+
+    def _remember_input(self, digest: bytes, registered: bool) -> None:
+        """Records the outcome of registering an input.
+
+        Args:
+            digest: Digest of the input.
+            registered: Whether the service agreed to hold the input.
+        """
+        with self._registered_lock:
+            self._registered[digest] = registered
+            self._registered.move_to_end(digest)
+            while len(self._registered) > MAX_REGISTERED_INPUTS:
+                self._registered.popitem(last=False)
+
+    def _call_with_input(
+        self,
+        input_content: bytes,
+        call: Callable[..., Any],
+    ) -> Any:
+        """Makes a verify RPC, referencing the input by digest if possible.
+
+        If the service no longer holds the input, it is sent in full, which
+        also has the service hold it again.
+
+        Args:
+            input_content: Input content.
+            call: Makes the RPC, given the input fields of the request as
+                keyword arguments.
+
+        Returns:
+            The RPC response.
+        """
+        digest = self.register_input(input_content)
+        if digest is not None:
+            try:
+                return call(input_digest=digest)
+            except connectrpc.errors.ConnectError as exc:
+                if exc.code != connectrpc.code.Code.NOT_FOUND:
+                    raise
+        return call(input_content=input_content)
+
     def verify_output(
         self,
         input_content: str | bytes,
@@ -267,18 +439,150 @@ class ProblemClient:
             FileFormatError: The input or output has formatting errors.
             ProblemClientError: The response omits the output.
         """
-        request = problem_support_pb2.VerifyOutputRequest(
-            input_content=_content_to_bytes(input_content),
-            output_content=_content_to_bytes(output_content),
+        output_content = content_to_bytes(output_content)
+        response = self._call_with_input(
+            content_to_bytes(input_content),
+            lambda **input_fields: self._client.verify_output(
+                problem_support_pb2.VerifyOutputRequest(
+                    output_content=output_content,
+                    accept_unchanged=True,
+                    **input_fields,
+                )
+            ),
         )
-        with self._client() as client:
-            response = client.verify_output(request)
+        return _verify_output_response(response, lambda: output_content)
 
-        if response.WhichOneof("result") == "format_error":
-            raise FileFormatError(response.format_error)
-        if response.WhichOneof("result") != "output":
-            raise ProblemClientError("VerifyOutput response did not include output")
-        return _verified_output_from_proto(response.output)
+    def verify_output_stream(
+        self,
+        input_content: str | bytes,
+        output_file: BinaryIO,
+        *,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> VerifiedOutput:
+        """Verifies an output read from a file, streaming it to the service.
+
+        The output is sent in chunks, so it never needs to be held in memory
+        in full, by either the app or the service.  Services which predate
+        the VerifyOutputStream RPC are sent the whole output with
+        VerifyOutput instead.
+
+        Args:
+            input_content: Input content as text or bytes.
+            output_file: Binary file positioned at the start of the output.
+                It must be seekable, as it may need to be sent again.
+            chunk_size: Maximum number of bytes per message.
+
+        Returns:
+            Verified output value object.
+
+        Raises:
+            FileFormatError: The input or output has formatting errors.
+            ProblemClientError: The response omits the output.
+        """
+        input_content = content_to_bytes(input_content)
+        start = output_file.tell()
+
+        def chunks(**input_fields):
+            yield problem_support_pb2.VerifyOutputChunk(accept_unchanged=True)
+            if "input_content" in input_fields:
+                content = memoryview(input_fields["input_content"])
+                for i in range(0, max(len(content), 1), chunk_size):
+                    yield problem_support_pb2.VerifyOutputChunk(
+                        input_content=bytes(content[i : i + chunk_size])
+                    )
+            else:
+                yield problem_support_pb2.VerifyOutputChunk(**input_fields)
+            output_file.seek(start)
+            while chunk := output_file.read(chunk_size):
+                yield problem_support_pb2.VerifyOutputChunk(output_content=chunk)
+
+        try:
+            response = self._call_with_input(
+                input_content,
+                lambda **input_fields: self._client.verify_output_stream(
+                    chunks(**input_fields)
+                ),
+            )
+        except connectrpc.errors.ConnectError as exc:
+            if exc.code != connectrpc.code.Code.UNIMPLEMENTED:
+                raise
+            output_file.seek(start)
+            return self.verify_output(input_content, output_file.read())
+
+        def sent():
+            output_file.seek(start)
+            return output_file.read()
+
+        return _verify_output_response(response, sent)
+
+    def verify_outputs(
+        self,
+        input_content: str | bytes,
+        output_contents: Sequence[str | bytes],
+    ) -> list[VerifiedOutput | FileFormatError]:
+        """Validates, normalizes, and verifies several outputs for one input.
+
+        The input is sent and parsed at most once for the whole batch, and
+        is referenced by digest once registered with the service.  Services
+        which predate the VerifyOutputs RPC are handled by verifying each
+        output separately.
+
+        Args:
+            input_content: Input content as text or bytes.
+            output_contents: Output contents as text or bytes.
+
+        Returns:
+            One entry per output, in order: the verified output, or a
+            FileFormatError if that output has formatting errors.
+
+        Raises:
+            FileFormatError: The input has formatting errors.
+            ProblemClientError: The response has the wrong number of results.
+        """
+        input_content = content_to_bytes(input_content)
+        output_contents = [content_to_bytes(c) for c in output_contents]
+        try:
+            response = self._call_with_input(
+                input_content,
+                lambda **input_fields: self._client.verify_outputs(
+                    problem_support_pb2.VerifyOutputsRequest(
+                        output_contents=output_contents,
+                        accept_unchanged=True,
+                        **input_fields,
+                    )
+                ),
+            )
+        except connectrpc.errors.ConnectError as exc:
+            if exc.code != connectrpc.code.Code.UNIMPLEMENTED:
+                raise
+            # Check the input up front so its errors aren't blamed on outputs.
+            self.normalize_input(input_content)
+            results = []
+            for output_content in output_contents:
+                try:
+                    results.append(self.verify_output(input_content, output_content))
+                except FileFormatError as format_error:
+                    results.append(format_error)
+            return results
+
+        if response.HasField("input_format_error"):
+            raise FileFormatError(response.input_format_error)
+        if len(response.results) != len(output_contents):
+            raise ProblemClientError(
+                f"VerifyOutputs returned {len(response.results)} results for "
+                f"{len(output_contents)} outputs"
+            )
+        results = []
+        for result, output_content in zip(
+            response.results, output_contents, strict=True
+        ):
+            try:
+                results.append(
+                    _verify_output_response(result, lambda c=output_content: c)
+                )
+            except FileFormatError as exc:
+                results.append(exc)
+        return results
 
     def generate_input(self, rng: random.Random) -> NormalizedInput:
         """Generates input content.
@@ -296,8 +600,7 @@ class ProblemClient:
             seed=rng.getrandbits(63),
         )
         try:
-            with self._client() as client:
-                response = client.generate_input(request)
+            response = self._client.generate_input(request)
         except connectrpc.errors.ConnectError as exc:
             raise NotImplementedError(str(exc)) from exc
         return NormalizedInput(response.content)
@@ -314,14 +617,53 @@ class ProblemClient:
         Raises:
             NotImplementedError: The problem does not support the trivial solver.
         """
-        normalized_input = _content_to_bytes(input_content)
+        normalized_input = content_to_bytes(input_content)
         request = problem_support_pb2.SolveRequest(
             input_content=normalized_input,
             solver_type=problem_support_pb2.SOLVER_TYPE_TRIVIAL,
         )
         try:
-            with self._client() as client:
-                response = client.solve(request)
+            response = self._client.solve(request)
         except connectrpc.errors.ConnectError as exc:
             raise NotImplementedError(str(exc)) from exc
         return self.verify_output(normalized_input, response.output_content)
+
+
+_clients: dict[str, ProblemClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(url: str) -> ProblemClient:
+    """Gets the shared problem client for a service URL.
+
+    Clients are created on first use and kept for the life of the process, so
+    their connections and cached metadata are shared by all requests.
+
+    Args:
+        url: Base URL of the problem support service.
+
+    Returns:
+        The process-wide problem client for the URL.
+    """
+    key = url.rstrip("/")
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = ProblemClient(key)
+        return client
+
+
+def invalidate_info(url: str | None = None) -> None:
+    """Discards cached problem metadata held by shared clients.
+
+    Args:
+        url: Base URL of the service to invalidate, or None for all services.
+    """
+    with _clients_lock:
+        if url is None:
+            clients = list(_clients.values())
+        else:
+            client = _clients.get(url.rstrip("/"))
+            clients = [client] if client else []
+    for client in clients:
+        client.invalidate_info()
@@ -0,0 +1,754 @@
+"""Rankings computation and the materialized rankings tables.
+
+The public rankings page (student verifications, incognito groups hidden) is
+served from the ``ranking_cell`` table, which holds each group's rank on each
+input; per-group totals are summed from it when it is read.  Writes which
+change that view mark the affected inputs stale when they are flushed, and the
+stale inputs are refreshed just before the transaction commits, so the table
+stays current however the change was made (including the admin CRUD pages).
+Controllers which already know the affected input may also mark it with
+:func:`refresh_input`.
+
+Every refresh first locks the rows of the inputs it rewrites, so concurrent
+refreshes of one input run one after another rather than colliding on the
+table's primary key, while uploads on other inputs are not held up.  A
+competition without cells but with outputs has not been built (or was
+invalidated by a migration): reads fall back to :func:`compute_rankings` and
+the next refresh rebuilds it in full.
+
+Admin-only views (ground truth, incognito groups) are computed live by
+:func:`compute_rankings`, which is also the reference the materialized tables
+are checked against.
+"""
+
+from __future__ import annotations
+
+import bisect
+import dataclasses
+import itertools
+from collections import defaultdict
+
+import sqlalchemy as sa
+from sqlalchemy.sql.expression import case
+
+from algobowl.lib import problem_client
+from algobowl.model import (
+    Competition,
+    DBSession,
+    Group,
+    Input,
+    Output,
+    Protest,
+    RankingCell,
+    VerificationStatus,
+)
+
+# Incognito was added as a nullable column, so NULL means not incognito.
+_NOT_INCOGNITO = sa.or_(Group.incognito == False, Group.incognito.is_(None))
+
+
+@dataclasses.dataclass
+class ScoreTuple:
+    score: str | None
+    verification: VerificationStatus
+    rank: int | None
+    output_id: int | None
+    vdiffer: bool
+
+
+class GroupEntry:  # noqa: PLW1641
+    def __init__(self):
+        self.reject_count = 0
+        self.sum_of_ranks = 0
+        self.penalties = 0
+        self.place = 1
+        self.input_ranks = {}
+
+    @property
+    def score(self):
+        return self.sum_of_ranks + self.penalties
+
+    @property
+    def adj_score(self):
+        """
+        Score used for grading: each rejection is assumed
+        to count as the number of groups.
+        """
+        if not self.reject_count:
+            return self.score
+
+        num_inputs = len(self.input_ranks)
+        if not num_inputs:
+            num_inputs = 9999
+
+        return self.sum_of_ranks + self.penalties + self.reject_count * num_inputs
+
+    def __lt__(self, other):
+        if self.reject_count < other.reject_count:
+            return True
+        if self.reject_count > other.reject_count:
+            return False
+        return self.score < other.score
+
+    def __eq__(self, other):
+        return self.reject_count == other.reject_count and self.score == other.score
+
+
+@dataclasses.dataclass
+class Rankings:
+    """A computed rankings table.
+
+    Attributes:
+        groups: Rankings entry for each group with at least one output.
+        inputs: Inputs with at least one output, in column order.
+        accurate_count: Outputs where student verification matched the
+            ground truth (ground truth view only).
+        total_count: Number of outputs ranked.
+    """
+
+    groups: dict[Group, GroupEntry]
+    inputs: list[Input]
+    accurate_count: int = 0
+    total_count: int = 0
+
+
+def _verification_column(ground_truth: bool):
+    """Returns the SQL expression for the verification status shown.
+
+    Args:
+        ground_truth: True to show the ground truth instead of student
+            verifications.
+
+    Returns:
+        A SQL column expression.
+    """
+    if ground_truth:
+        return Output.ground_truth
+    return case(
+        [(Output.use_ground_truth, Output.ground_truth)],
+        else_=Output.verification,
+    )
+
+
+def _score_sort(problem: problem_client.ProblemClient):
+    """Returns the SQL ordering placing the best score first.
+
+    Args:
+        problem: Problem client for the competition.
+
+    Returns:
+        A SQL ordering expression.
+    """
+    return {
+        problem_client.RankSort.MINIMIZATION: Output.score.asc(),
+        problem_client.RankSort.MAXIMIZATION: Output.score.desc(),
+    }[problem.rank_sort()]
+
+
+def _rank_outputs(rows):
+    """Assigns ranks to the outputs for a single input.
+
+    Args:
+        rows: (output, verification) pairs for one input, ordered with
+            rejected outputs last and the best score first.
+
+    Yields:
+        (output, verification, rank) triples.  Rank is None for rejected
+        outputs, and tied scores share a rank.
+    """
+    last_rank = 0
+    last_score = None
+    for potential_rank, (output, verif) in enumerate(rows, start=1):
+        if verif is VerificationStatus.rejected:
+            rank = None
+        elif output.score == last_score:
+            rank = last_rank
+        else:
+            rank = potential_rank
+        yield output, verif, rank
+        last_rank = rank
+        last_score = output.score
+
+
+def _count_missing(entries, inputs) -> None:
+    """Counts each input a group has no output for as a rejection.
+
+    Args:
+        entries: Rankings entries to update.
+        inputs: All inputs shown on the rankings.
+    """
+    for entry in entries:
+        for iput in inputs:
+            if iput not in entry.input_ranks:
+                entry.reject_count += 1
+
+
+def competition_places(items, key) -> list[int]:
+    """Computes competition-style ("1224") places in a single sorted pass.
+
+    Items with equal keys share a place, and the following place skips the
+    tied positions.
+
+    Args:
+        items: Items to place.
+        key: Function returning the sort key of an item; lower is better.
+
+    Returns:
+        The 1-based place of each item, in the same order as ``items``.
+    """
+    keys = [key(item) for item in items]
+    places = [0] * len(keys)
+    place = 0
+    last_key = None
+    for position, i in enumerate(sorted(range(len(keys)), key=keys.__getitem__)):
+        if position == 0 or keys[i] != last_key:
+            place = position + 1
+            last_key = keys[i]
+        places[i] = place
+    return places
+
+
+def _place_key(entry: GroupEntry) -> tuple[int, int]:
+    """Returns the sort key ordering rankings entries like ``GroupEntry.__lt__``.
+
+    Args:
+        entry: Rankings entry.
+
+    Returns:
+        The sort key.
+    """
+    return entry.reject_count, entry.score
+
+
+def _assign_places(entries) -> None:
+    """Sets the place of each rankings entry.
+
+    Args:
+        entries: Rankings entries to update.
+    """
+    entries = list(entries)
+    for entry, place in zip(
+        entries, competition_places(entries, key=_place_key), strict=True
+    ):
+        entry.place = place
+
+
+def fleet_numbers(adj_scores, benchmark_adj_scores) -> list[int]:
+    """Computes the grading fleet of each group.
+
+    A group's fleet is the number of benchmark groups whose adjusted score it
+    ties or beats.
+
+    Args:
+        adj_scores: Adjusted score of each group.
+        benchmark_adj_scores: Adjusted score of each benchmark group.
+
+    Returns:
+        The fleet number of each group, in the same order as ``adj_scores``.
+    """
+    benchmarks = sorted(benchmark_adj_scores)
+    return [
+        len(benchmarks) - bisect.bisect_left(benchmarks, adj_score)
+        for adj_score in adj_scores
+    ]
+
+
+def compute_rankings(
+    competition: Competition,
+    problem: problem_client.ProblemClient,
+    *,
+    ground_truth: bool = False,
+    incognito: bool = False,
+    show_scores: bool = False,
+) -> Rankings:
+    """Computes a rankings table from the outputs table.
+
+    Args:
+        competition: Competition to rank.
+        problem: Problem client for the competition.
+        ground_truth: Rank by ground truth instead of student verifications.
+        incognito: Include incognito groups.
+        show_scores: Include formatted scores and output links.
+
+    Returns:
+        The rankings.
+    """
+    verification_column = _verification_column(ground_truth)
+    ir_query = (
+        DBSession.query(Input, Group, Output, verification_column)
+        .join(Input.outputs)
+        .join(Output.group)
+        .filter(Group.competition_id == competition.id)
+        .filter(Output.active == True)
+        .order_by(
+            Input.group_id,
+            verification_column == VerificationStatus.rejected,
+            _score_sort(problem),
+        )
+    )
+    if not incognito:
+        ir_query = ir_query.filter(_NOT_INCOGNITO)
+
+    result = Rankings(groups=defaultdict(GroupEntry), inputs=[])
+    groups = result.groups
+    for iput, rows in itertools.groupby(ir_query, key=lambda row: row[0]):
+        result.inputs.append(iput)
+        rows = list(rows)
+        ogroups = {output: ogroup for _, ogroup, output, _ in rows}
+        ranked = _rank_outputs((output, verif) for _, _, output, verif in rows)
+        for output, verif, rank in ranked:
+            ogroup = ogroups[output]
+            shown_score = None
+            shown_output_id = None
+            if show_scores:
+                shown_score = problem.format_score(output.score)
+                shown_output_id = output.id
+            if verif is VerificationStatus.rejected:
+                shown_score = None
+
+            vdiffer = False
+            if ground_truth:
+                if (
+                    output.use_ground_truth
+                    or output.verification == output.ground_truth
+                ):
+                    result.accurate_count += 1
+                else:
+                    vdiffer = True
+
+            groups[ogroup].input_ranks[iput] = ScoreTuple(
+                shown_score, verif, rank, shown_output_id, vdiffer
+            )
+            if verif is VerificationStatus.rejected:
+                groups[ogroup].reject_count += 1
+            else:
+                groups[ogroup].sum_of_ranks += rank
+
+            # add accepted resubmissions to penalty
+            if verif is VerificationStatus.accepted and not output.original:
+                groups[ogroup].penalties += 1
+
+            result.total_count += 1
+
+    # no submission? this adds to reject count
+    _count_missing(groups.values(), result.inputs)
+
+    # add open verification protest rejections to penalty
+    rprotests = (
+        DBSession.query(Protest)
+        .filter(Protest.accepted == False)
+        .join(Protest.submitter)
+        .filter(Group.competition_id == competition.id)
+    )
+    for protest in rprotests:
+        # technically, a group which failed to submit anything
+        # COULD protest... but this case is unlikely ;)
+        if protest.submitter in groups:
+            groups[protest.submitter].penalties += 1
+
+    _assign_places(groups.values())
+    return result
+
+
+def refresh_input(iput: Input) -> None:
+    """Marks the materialized rankings for one input as stale.
+
+    Call after any change to the outputs or verifications on ``iput``.
+    Ranks on other inputs cannot change, so only this input's cells are
+    rewritten, just before the transaction commits.
+
+    Args:
+        iput: The input whose outputs changed.
+    """
+    _mark_stale(DBSession, iput.group.competition_id, iput.id)
+
+
+def _refresh_inputs(
+    competition: Competition,
+    input_ids: set[int],
+    problem: problem_client.ProblemClient | None = None,
+) -> None:
+    """Recomputes the materialized rankings for some inputs of a competition.
+
+    Rebuilds the whole competition instead if its cells have not been built.
+
+    Args:
+        competition: Competition the inputs belong to.
+        input_ids: IDs of the inputs whose outputs changed.
+        problem: Problem client for the competition, if the caller has one.
+    """
+    DBSession.flush()
+    if not _is_built(competition):
+        rebuild(competition, problem)
+        return
+    if problem is None:
+        problem = problem_client.get_client(competition.problem)
+    _lock_inputs(Input.id.in_(input_ids))
+    _clear_stale(competition, input_ids)
+    DBSession.query(RankingCell).filter(RankingCell.input_id.in_(input_ids)).delete(
+        synchronize_session=False
+    )
+    _insert_cells(competition, problem, Output.input_id.in_(input_ids))
+
+
+def rebuild(
+    competition: Competition,
+    problem: problem_client.ProblemClient | None = None,
+) -> None:
+    """Recomputes the materialized rankings for a whole competition.
+
+    Args:
+        competition: Competition to rebuild.
+        problem: Problem client for the competition, if the caller has one.
+    """
+    if problem is None:
+        problem = problem_client.get_client(competition.problem)
+    DBSession.flush()
+    _lock_inputs(
+        Input.group_id.in_(
+            sa.select([Group.id]).where(Group.competition_id == competition.id)
+        )
+    )
+    _clear_stale(competition)
+    DBSession.query(RankingCell).filter(
+        RankingCell.competition_id == competition.id
+    ).delete(synchronize_session=False)
+    _insert_cells(competition, problem, sa.true())
+
+
+def _lock_inputs(criterion) -> None:
+    """Locks input rows until the end of the transaction.
+
+    Refreshes delete and reinsert an input's cells, so two running at once on
+    the same input would both insert the same keys.  Locking the input first
+    makes the second wait for the first to commit, while refreshes of other
+    inputs carry on.  Rows are locked in ID order so two transactions
+    refreshing overlapping inputs cannot deadlock, and without blocking
+    inserts of outputs which reference them.
+
+    Args:
+        criterion: SQL filter selecting the inputs about to be refreshed.
+    """
+    DBSession.query(Input.id).filter(criterion).order_by(Input.id).with_for_update(
+        key_share=True
+    ).all()
+
+
+def _is_built(competition: Competition) -> bool:
+    """Checks whether a competition's materialized rankings have been built.
+
+    Args:
+        competition: Competition to check.
+
+    Returns:
+        True if the competition has any ranking cells, or nothing to rank.
+    """
+    query = DBSession.query(RankingCell.input_id).filter(
+        RankingCell.competition_id == competition.id
+    )
+    return DBSession.query(query.exists()).scalar() or _has_no_outputs(competition)
+
+
+def _insert_cells(
+    competition: Competition,
+    problem: problem_client.ProblemClient,
+    criterion,
+) -> None:
+    """Inserts ranking cells for the public rankings view.
+
+    Args:
+        competition: Competition being ranked.
+        problem: Problem client for the competition.
+        criterion: SQL filter selecting the outputs to rank.
+    """
+    verification_column = _verification_column(ground_truth=False)
+    query = (
+        DBSession.query(
+            Output.input_id,
+            Output.group_id,
+            Output.id,
+            Output.score,
+            Output.original,
+            verification_column,
+        )
+        .join(Output.group)
+        .filter(Group.competition_id == competition.id)
+        .filter(_NOT_INCOGNITO)
+        .filter(Output.active == True)
+        .filter(criterion)
+        .order_by(
+            Output.input_id,
+            verification_column == VerificationStatus.rejected,
+            _score_sort(problem),
+        )
+    )
+    cells = []
+    for input_id, rows in itertools.groupby(query, key=lambda row: row[0]):
+        ranked = _rank_outputs((row, row[5]) for row in rows)
+        for row, verif, rank in ranked:
+            _, group_id, output_id, score, original, _ = row
+            cells.append(
+                {
+                    "input_id": input_id,
+                    "group_id": group_id,
+                    "competition_id": competition.id,
+                    "output_id": output_id,
+                    "score": score,
+                    "verification": verif,
+                    "rank": rank,
+                    "penalty": verif is VerificationStatus.accepted and not original,
+                }
+            )
+    if cells:
+        DBSession.bulk_insert_mappings(RankingCell, cells)
+
+
+def load_rankings(
+    competition: Competition,
+    problem: problem_client.ProblemClient,
+    *,
+    show_scores: bool = False,
+) -> Rankings:
+    """Loads the public rankings from the materialized cells.
+
+    Per-group totals are summed from the cells as they are read, so writes
+    to one input never need to update rows shared by the whole competition.
+    Competitions whose cells have not been built are computed live instead;
+    this never writes to the database.
+
+    Args:
+        competition: Competition to load.
+        problem: Problem client for the competition.
+        show_scores: Include formatted scores and output links.
+
+    Returns:
+        The rankings.
+    """
+    if not _is_built(competition):
+        return compute_rankings(competition, problem, show_scores=show_scores)
+
+    result = Rankings(groups={}, inputs=[])
+    entries = defaultdict(GroupEntry)
+    cells = (
+        DBSession.query(RankingCell, Input)
+        .join(Input, RankingCell.input_id == Input.id)
+        .filter(RankingCell.competition_id == competition.id)
+        .order_by(Input.group_id)
+    )
+    for cell, iput in cells:
+        if not result.inputs or result.inputs[-1] is not iput:
+            result.inputs.append(iput)
+        shown_score = None
+        shown_output_id = None
+        if show_scores:
+            if cell.verification is not VerificationStatus.rejected:
+                shown_score = problem.format_score(cell.score)
+            shown_output_id = cell.output_id
+        entry = entries[cell.group_id]
+        entry.input_ranks[iput] = ScoreTuple(
+            shown_score,
+            cell.verification,
+            cell.rank,
+            shown_output_id,
+            vdiffer=False,
+        )
+        if cell.verification is VerificationStatus.rejected:
+            entry.reject_count += 1
+        else:
+            entry.sum_of_ranks += cell.rank
+        if cell.penalty:
+            entry.penalties += 1
+        result.total_count += 1
+
+    _count_missing(entries.values(), result.inputs)
+
+    rprotests = (
+        DBSession.query(Protest.submitter_id, sa.func.count(Protest.id))
+        .filter(Protest.accepted == False)
+        .join(Protest.submitter)
+        .filter(Group.competition_id == competition.id)
+        .group_by(Protest.submitter_id)
+    )
+    for group_id, count in rprotests:
+        if group_id in entries:
+            entries[group_id].penalties += count
+
+    _assign_places(entries.values())
+
+    if entries:
+        groups = DBSession.query(Group).filter(Group.id.in_(entries.keys()))
+        for group in sorted(groups, key=lambda g: (entries[g.id].place, g.id)):
+            result.groups[group] = entries[group.id]
+    return result
+
+
+def _has_no_outputs(competition: Competition) -> bool:
+    """Checks whether a competition has no rankable outputs.
+
+    Args:
+        competition: Competition to check.
+
+    Returns:
+        True if no non-incognito group has an active output.
+    """
+    query = (
+        DBSession.query(Output.id)
+        .join(Output.group)
+        .filter(Group.competition_id == competition.id)
+        .filter(_NOT_INCOGNITO)
+        .filter(Output.active == True)
+    )
+    return not DBSession.query(query.exists()).scalar()
+
+
+def check(
+    competition: Competition,
+    problem: problem_client.ProblemClient,
+) -> list[str]:
+    """Compares the materialized rankings against a live computation.
+
+    Args:
+        competition: Competition to check.
+        problem: Problem client for the competition.
+
+    Returns:
+        A description of each mismatch found (empty if consistent).
+    """
+    if not _is_built(competition):
+        return ["materialized rankings have not been built"]
+    expected = compute_rankings(competition, problem, show_scores=True)
+    actual = load_rankings(competition, problem, show_scores=True)
+    mismatches = []
+    if expected.inputs != actual.inputs:
+        mismatches.append(f"inputs differ: {expected.inputs} != {actual.inputs}")
+    for group in expected.groups.keys() | actual.groups.keys():
+        want = expected.groups.get(group)
+        got = actual.groups.get(group)
+        if want is None or got is None:
+            mismatches.append(f"{group!r}: present in only one table")
+            continue
+        for attr in ("reject_count", "sum_of_ranks", "penalties", "place"):
+            if getattr(want, attr) != getattr(got, attr):
+                mismatches.append(
+                    f"{group!r}: {attr} {getattr(got, attr)} "
+                    f"(expected {getattr(want, attr)})"
+                )
+        if want.input_ranks != got.input_ranks:
+            mismatches.append(f"{group!r}: per-input ranks differ")
+    return mismatches
+
+
+_STALE_KEY = "algobowl.rankings.stale"
+
+
+def _stale(session) -> dict[int, set[int] | None]:
+    """Returns the stale rankings recorded on a session.
+
+    Maps a competition ID to the IDs of its stale inputs, or to None if the
+    whole competition must be rebuilt.
+    """
+    return session.info.setdefault(_STALE_KEY, {})
+
+
+def _mark_stale(session, competition_id: int | None, input_id: int) -> None:
+    """Records that an input's rankings are stale.
+
+    Args:
+        session: Session the change was flushed in.
+        competition_id: Competition with the change.
+        input_id: Input with changed outputs.
+    """
+    input_ids = _stale(session).setdefault(competition_id, set())
+    if input_ids is not None:
+        input_ids.add(input_id)
+
+
+def _clear_stale(competition: Competition, input_ids=None) -> None:
+    """Forgets stale marks which a refresh is about to bring up to date.
+
+    Args:
+        competition: Competition being refreshed.
+        input_ids: Inputs being refreshed, or None when the whole competition
+            is rebuilt.
+    """
+    stale = _stale(DBSession)
+    if competition.id not in stale:
+        return
+    stale_inputs = stale[competition.id]
+    if input_ids is None:
+        del stale[competition.id]
+    elif stale_inputs is not None:
+        stale_inputs -= input_ids
+        if not stale_inputs:
+            del stale[competition.id]
+
+
+def _competition_id(session, group_id: int | None) -> int | None:
+    """Looks up the competition of a group, usually from the identity map.
+
+    Relationships of newly flushed objects are not loaded yet, so the
+    listener below works from foreign keys instead.
+    """
+    group = session.query(Group).get(group_id) if group_id is not None else None
+    return group and group.competition_id
+
+
+@sa.event.listens_for(DBSession, "after_flush")
+def _track_stale(session, flush_context):
+    """Marks the rankings touched by flushed changes as stale.
+
+    Protests and deleted inputs only change the totals, which are summed
+    when the rankings are loaded, so they need no refresh.
+    """
+    stale = _stale(session)
+    changed = itertools.chain(
+        session.new,
+        (
+            obj
+            for obj in session.dirty
+            if session.is_modified(obj, include_collections=False)
+        ),
+    )
+    for obj in changed:
+        if isinstance(obj, Output):
+            _mark_stale(session, _competition_id(session, obj.group_id), obj.input_id)
+        elif (
+            isinstance(obj, Group)
+            and obj not in session.new
+            and sa.inspect(obj).attrs.incognito.history.has_changes()
+        ):
+            stale[obj.competition_id] = None
+    for obj in session.deleted:
+        if isinstance(obj, Output):
+            _mark_stale(session, _competition_id(session, obj.group_id), obj.input_id)
+        elif isinstance(obj, Group):
+            stale[obj.competition_id] = None
+    stale.pop(None, None)
+
+
+@sa.event.listens_for(DBSession, "before_commit")
+def _refresh_stale(session):
+    """Refreshes the stale rankings before the transaction commits.
+
+    Competitions are refreshed in ID order (and each one's inputs are locked
+    in ID order) so concurrent transactions take their locks in one order.
+    """
+    session.flush()
+    stale = _stale(session)
+    while stale:
+        competition_id = min(stale)
+        input_ids = stale.pop(competition_id)
+        competition = session.query(Competition).get(competition_id)
+        if competition is None:
+            continue
+        if input_ids is None:
+            rebuild(competition)
+        else:
+            _refresh_inputs(competition, input_ids)
+
+
+@sa.event.listens_for(DBSession, "after_transaction_end")
+def _forget_stale(session, transaction):
+    """Drops stale marks left by a rolled back transaction."""
+    if transaction.parent is None:
+        session.info.pop(_STALE_KEY, None)
@@ -0,0 +1,263 @@
+"""In-process cache of the rendered rankings.
+
+Between submissions, the rankings page is the same for every viewer in the
+same role, yet rendering the grid for a large competition is expensive.
+Rankings are cached, both as the rendered HTML table and as the JSON
+response, keyed by:
+
+- the competition and its ``data_version``, which is bumped (by recording
+  a ``CompetitionChange``) in the same transaction as any change to its
+  groups, inputs, outputs, or protests, so a change made by any process
+  invalidates every process's entries;
+- the viewer's role class: anonymous (including users not in any group of
+  the competition), member, or admin.  Members' own groups are highlighted
+  in the HTML table, so the HTML is also keyed on which groups they are in;
+- the ``incognito`` and ``ground_truth`` options.
+
+What is shown also depends on the time (scores are revealed when open
+verification begins, input downloads are hidden once a competition is
+archived), so entries expire at the competition's next phase transition.
+
+Configuration:
+
+- ``algobowl.rankings_cache.size``: Maximum number of entries kept.  0
+  disables the cache.
+"""
+
+from __future__ import annotations
+
+import collections
+import dataclasses
+import datetime
+import enum
+import threading
+from collections.abc import Callable, Iterable
+from typing import Any
+
+import tg
+from tg.support.converters import asint
+
+from algobowl.lib import phases
+from algobowl.model import Competition, Group
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class Role(enum.Enum):
+    anonymous = "anonymous"
+    member = "member"
+    admin = "admin"
+
+    @classmethod
+    def of(cls, is_admin: bool, my_groups: list[Group]) -> Role:
+        """Classifies a viewer.
+
+        Args:
+            is_admin: Whether the viewer is an admin.
+            my_groups: The viewer's groups in the competition.
+
+        Returns:
+            The viewer's role class.
+        """
+        if is_admin:
+            return cls.admin
+        if my_groups:
+            return cls.member
+        return cls.anonymous
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheKey:
+    """Identifies a cached rankings response.
+
+    Attributes:
+        competition_id: Competition id.
+        data_version: Competition data version.
+        role: Role class of the viewer.
+        incognito: Whether incognito groups are shown.
+        ground_truth: Whether ground truth verifications are shown.
+        fmt: Response format, ``"html"`` or ``"json"``.
+        group_ids: Ids of the viewer's groups, for member HTML only.
+    """
+
+    competition_id: int
+    data_version: int
+    role: Role
+    incognito: bool
+    ground_truth: bool
+    fmt: str
+    group_ids: frozenset[int] = frozenset()
+
+    @classmethod
+    def for_request(
+        cls,
+        competition: Competition,
+        *,
+        role: Role,
+        incognito: bool,
+        ground_truth: bool,
+        fmt: str,
+        my_groups: Iterable[Group] = (),
+    ) -> CacheKey:
+        """Builds the key for a rankings request.
+
+        Args:
+            competition: Competition.
+            role: Role class of the viewer.
+            incognito: Whether incognito groups are shown.
+            ground_truth: Whether ground truth verifications are shown.
+            fmt: Response format, ``"html"`` or ``"json"``.
+            my_groups: The viewer's groups in the competition.
+
+        Returns:
+            The cache key.
+        """
+        group_ids = frozenset()
+        if fmt == "html" and role is Role.member:
+            group_ids = frozenset(group.id for group in my_groups)
+        return cls(
+            competition_id=competition.id,
+            data_version=competition.data_version,
+            role=role,
+            incognito=bool(incognito),
+            ground_truth=bool(ground_truth),
+            fmt=fmt,
+            group_ids=group_ids,
+        )
+
+
+class RankingsCache:
+    """LRU cache of rankings responses, expiring at phase transitions.
+
+    Attributes:
+        max_entries: Maximum number of entries to keep.
+        hits: Number of lookups answered from the cache.
+        misses: Number of lookups not answered from the cache.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        """Initializes an empty cache.
+
+        Args:
+            max_entries: Maximum number of entries to keep.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: collections.OrderedDict[
+            CacheKey, tuple[datetime.datetime | None, Any]
+        ] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey, now: datetime.datetime) -> Any | None:
+        """Looks up a response, marking it most recently used.
+
+        Args:
+            key: Cache key.
+            now: Current time.
+
+        Returns:
+            The cached response, or None on a miss or if it has expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: CacheKey, value: Any, expires: datetime.datetime | None) -> None:
+        """Stores a response, evicting the least recently used.
+
+        Entries for older data versions of the same competition are dropped,
+        as they can never be hit again.
+
+        Args:
+            key: Cache key.
+            value: Response to cache.
+            expires: When the entry stops being valid, or None for never.
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            for old_key in [
+                k
+                for k in self._entries
+                if k.competition_id == key.competition_id
+                and k.data_version < key.data_version
+            ]:
+                del self._entries[old_key]
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(
+        self,
+        key: CacheKey,
+        competition: Competition,
+        compute: Callable[[], Any],
+    ) -> Any:
+        """Looks up a response, computing and storing it on a miss.
+
+        Args:
+            key: Cache key.
+            competition: Competition the key is for.
+            compute: Computes the response.
+
+        Returns:
+            The response.
+        """
+        now = phases.now()
+        value = self.get(key, now)
+        if value is None:
+            value = compute()
+            self.put(key, value, competition.timeline.next_transition(now))
+        return value
+
+    def clear(self) -> None:
+        """Drops every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Summarizes cache effectiveness.
+
+        Returns:
+            JSON-serializable cache statistics.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_cache: RankingsCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> RankingsCache:
+    """Gets the process-wide rankings cache, configured from the app config.
+
+    Returns:
+        The rankings cache.
+    """
+    global _cache  # noqa: PLW0603
+    with _cache_lock:
+        if _cache is None:
+            _cache = RankingsCache(
+                max_entries=asint(
+                    tg.config.get("algobowl.rankings_cache.size", DEFAULT_MAX_ENTRIES)
+                ),
+            )
+        return _cache
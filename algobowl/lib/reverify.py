@@ -0,0 +1,280 @@
+"""Background re-verification of a competition's outputs.
+
+A reverify job re-checks the ground truth of every output in a competition
+against the problem service.  Inputs are processed in id order: worker
+threads read an input and its outputs once and verify them in a single
+batch, while the job thread commits each input's ground-truth changes along
+with a checkpoint.  A job interrupted part way (say, by a server restart)
+resumes after its last checkpoint when started again.
+"""
+
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import datetime
+import logging
+import threading
+
+import transaction
+
+from algobowl.lib import problem_client, rankings, verification_cache
+from algobowl.model import (
+    Competition,
+    DBSession,
+    Group,
+    Input,
+    JobStatus,
+    Output,
+    ReverifyJob,
+    VerificationStatus,
+)
+
+log = logging.getLogger(__name__)
+
+# Number of inputs verified concurrently.
+MAX_WORKERS = 4
+
+# A running job whose heartbeat is older than this is assumed to have died
+# with its process, and may be resumed.
+STALE_AFTER = datetime.timedelta(minutes=5)
+
+_threads: dict[int, threading.Thread] = {}
+_threads_lock = threading.Lock()
+
+
+def job_status(job: ReverifyJob) -> dict:
+    """Summarizes a job for the status endpoint.
+
+    Args:
+        job: Reverify job.
+
+    Returns:
+        JSON-serializable job status.
+    """
+    return {
+        "id": job.id,
+        "competition_id": job.competition_id,
+        "status": str(job.status),
+        "started": job.started.isoformat(),
+        "updated": job.updated.isoformat(),
+        "total_inputs": job.total_inputs,
+        "done_inputs": job.done_inputs,
+        "changes": job.changes,
+        "log": job.log,
+        "error": job.error,
+    }
+
+
+def latest_job(competition: Competition) -> ReverifyJob | None:
+    """Gets the most recent reverify job for a competition.
+
+    Args:
+        competition: Competition to look up.
+
+    Returns:
+        The most recent job, or None if reverify was never run.
+    """
+    return (
+        DBSession.query(ReverifyJob)
+        .filter(ReverifyJob.competition_id == competition.id)
+        .order_by(ReverifyJob.id.desc())
+        .first()
+    )
+
+
+def _is_alive(job: ReverifyJob) -> bool:
+    """Checks whether a running job is still being worked on.
+
+    Args:
+        job: Job with running status.
+
+    Returns:
+        True if the job is running in this process, or its heartbeat is
+        recent enough that another process is likely running it.
+    """
+    with _threads_lock:
+        thread = _threads.get(job.id)
+    if thread is not None:
+        return thread.is_alive()
+    return datetime.datetime.now() - job.updated < STALE_AFTER
+
+
+def start(competition: Competition) -> ReverifyJob:
+    """Starts reverifying a competition, or resumes an unfinished run.
+
+    The job thread is started once the current transaction commits.
+
+    Args:
+        competition: Competition to reverify.
+
+    Returns:
+        The new or resumed job.  If a job is already running, it is returned
+        unchanged.
+    """
+    job = latest_job(competition)
+    if job is not None and job.status == JobStatus.running and _is_alive(job):
+        return job
+    if job is None or job.status == JobStatus.complete:
+        job = ReverifyJob(competition=competition)
+        DBSession.add(job)
+    else:
+        job.log += "Resuming.\n"
+    job.status = JobStatus.running
+    job.error = None
+    job.updated = datetime.datetime.now()
+    DBSession.flush()
+
+    job_id = job.id
+
+    def after_commit(success):
+        if success:
+            _spawn(job_id)
+
+    transaction.get().addAfterCommitHook(after_commit)
+    return job
+
+
+def _spawn(job_id: int) -> None:
+    """Starts the thread for a job.
+
+    Args:
+        job_id: Job to run.
+    """
+    thread = threading.Thread(
+        target=_run, args=(job_id,), name=f"reverify-{job_id}", daemon=True
+    )
+    with _threads_lock:
+        _threads[job_id] = thread
+    thread.start()
+
+
+def _run(job_id: int) -> None:
+    """Runs a job to completion, recording any failure on the job.
+
+    Args:
+        job_id: Job to run.
+    """
+    try:
+        _run_job(job_id)
+    except Exception as e:
+        log.exception("Reverify job %s failed", job_id)
+        with transaction.manager:
+            job = DBSession.query(ReverifyJob).get(job_id)
+            job.status = JobStatus.failed
+            job.error = str(e)
+            job.updated = datetime.datetime.now()
+    finally:
+        DBSession.remove()
+        with _threads_lock:
+            _threads.pop(job_id, None)
+
+
+def _run_job(job_id: int) -> None:
+    """Verifies the remaining inputs of a job, then rebuilds the rankings.
+
+    Args:
+        job_id: Job to run.
+    """
+    with transaction.manager:
+        job = DBSession.query(ReverifyJob).get(job_id)
+        problem = problem_client.get_client(job.competition.problem)
+        # The problem service may have been updated; don't trust cached metadata.
+        problem.invalidate_info()
+        input_ids = (
+            DBSession.query(Input.id)
+            .join(Input.group)
+            .filter(Group.competition_id == job.competition_id)
+            .order_by(Input.id)
+        )
+        job.total_inputs = input_ids.count()
+        if job.checkpoint_input_id is not None:
+            input_ids = input_ids.filter(Input.id > job.checkpoint_input_id)
+        input_ids = [input_id for (input_id,) in input_ids]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        # Results are committed in input order so the checkpoint only moves
+        # forward; keep a bounded number of inputs in flight ahead of it.
+        pending = collections.deque()
+        for input_id in input_ids:
+            pending.append((input_id, pool.submit(_verify_input, problem, input_id)))
+            if len(pending) >= MAX_WORKERS * 2:
+                _commit_input(job_id, *pending.popleft())
+        while pending:
+            _commit_input(job_id, *pending.popleft())
+
+    with transaction.manager:
+        job = DBSession.query(ReverifyJob).get(job_id)
+        rankings.rebuild(job.competition, problem)
+        job.log += f"{job.changes} ground truths changed\n"
+        job.status = JobStatus.complete
+        job.updated = datetime.datetime.now()
+
+
+def _verify_input(
+    problem: problem_client.ProblemClient, input_id: int
+) -> dict[int, tuple[VerificationStatus, str | None]]:
+    """Verifies every output for one input.  Runs in a worker thread.
+
+    Args:
+        problem: Problem client.
+        input_id: Input to verify outputs for.
+
+    Returns:
+        Map of output id to the new ground truth and the rejection reason.
+    """
+    try:
+        with transaction.manager:
+            iput = DBSession.query(Input).get(input_id)
+            outputs = iput.outputs
+            if not outputs:
+                return {}
+            results = verification_cache.verify_outputs(
+                problem,
+                iput.data.file.read(),
+                [output.data.file.read() for output in outputs],
+            )
+            statuses = {}
+            for output, result in zip(outputs, results, strict=True):
+                try:
+                    if isinstance(result, problem_client.FileFormatError):
+                        raise result
+                    result.require_accepted()
+                except (
+                    problem_client.FileFormatError,
+                    problem_client.VerificationError,
+                ) as e:
+                    statuses[output.id] = (VerificationStatus.rejected, str(e))
+                else:
+                    statuses[output.id] = (VerificationStatus.accepted, None)
+            return statuses
+    finally:
+        DBSession.remove()
+
+
+def _commit_input(
+    job_id: int, input_id: int, future: concurrent.futures.Future
+) -> None:
+    """Saves the ground truths for one input, and moves the checkpoint past it.
+
+    Args:
+        job_id: Job being run.
+        input_id: Input which was verified.
+        future: Result of _verify_input for the input.
+    """
+    statuses = future.result()
+    with transaction.manager:
+        job = DBSession.query(ReverifyJob).get(job_id)
+        lines = []
+        for output in DBSession.query(Output).filter(Output.id.in_(statuses)):
+            new_status, reason = statuses[output.id]
+            if reason is not None:
+                lines.append(f"{output} rejected because: {reason}")
+            if output.ground_truth != new_status:
+                lines.append(f"{output} changed: {output.ground_truth} -> {new_status}")
+                output.ground_truth = new_status
+                job.changes += 1
+        job.log += "".join(f"{line}\n" for line in lines)
+        job.checkpoint_input_id = input_id
+        job.done_inputs += 1
+        job.updated = datetime.datetime.now()
@@ -0,0 +1,653 @@
+"""Output submission, immediately or through a queue.
+
+Saving an output means verifying it against the problem service, which can
+take a while for slow verifiers.  Normally this happens while the upload
+request waits.  With the queue enabled, an upload can instead be stored as
+received and queued as an :class:`OutputSubmission`, so the request returns
+a submission id right away.  Queued submissions are verified and saved by
+worker threads, which poll the database, so no outside message broker is
+needed.  Workers run in the web server process (started when the app loads),
+or in a separate process started with::
+
+    python -m algobowl.lib.submissions development.ini
+
+Deadlines are checked against the time the upload arrived, not the time it
+was processed.  Submissions from a group for the same input are processed
+one at a time, in the order they arrived.
+
+While a worker processes a submission, a heartbeat thread keeps bumping its
+``updated`` time.  A submission whose heartbeat stops is assumed to have
+died with its worker, and is claimed again.  Each claim gets a random token,
+and the outcome is only recorded while the token is still current, so a
+worker whose claim was taken over never saves its output.
+
+Configuration:
+
+- ``algobowl.submission_queue.enabled``: Accept queued submissions.
+  Otherwise, queued uploads are saved immediately, as if not queued.
+- ``algobowl.submission_queue.workers``: Number of worker threads started
+  in the web server process.  0 leaves the queue to separate worker
+  processes.
+- ``algobowl.submission_queue.poll_interval``: Seconds between checks of
+  an empty queue for submissions queued by other processes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import codecs
+import contextlib
+import datetime
+import io
+import logging
+import secrets
+import shutil
+import tempfile
+import threading
+from collections.abc import Iterator
+from typing import BinaryIO
+
+import sqlalchemy as sa
+import tg
+import transaction
+from depot.io.utils import FileIntent
+from paste.deploy import loadapp
+from tg.support.converters import asbool, asint
+
+from algobowl.lib import phases, problem_client, rankings, verification_cache
+from algobowl.model import (
+    Competition,
+    DBSession,
+    Group,
+    Input,
+    Output,
+    OutputSubmission,
+    SubmissionStatus,
+    VerificationStatus,
+)
+
+log = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+DEFAULT_POLL_INTERVAL = 1.0
+
+# A running submission whose heartbeat is older than this is assumed to
+# have died with its worker, and may be claimed again.
+STALE_AFTER = datetime.timedelta(minutes=5)
+
+# How often a worker bumps the heartbeat of the submission it is processing.
+HEARTBEAT_INTERVAL = datetime.timedelta(minutes=1)
+
+# Number of queued submissions considered each time a worker claims one.
+_CLAIM_BATCH = 8
+
+_wake = threading.Event()
+_workers: list[threading.Thread] = []
+_workers_lock = threading.Lock()
+
+
+class SubmissionError(Exception):
+    """Raised when an output is not accepted, with a message for the user."""
+
+
+class _ClaimLostError(Exception):
+    """Raised when another worker has taken over a submission's claim."""
+
+
+def active_output(group: Group, iput: Input) -> Output | None:
+    """Gets a group's active output for an input.
+
+    Args:
+        group: Group which submitted the output.
+        iput: Input the output is for.
+
+    Returns:
+        The active output, or None if there is none.
+    """
+    return (
+        DBSession.query(Output)
+        .filter(Output.group_id == group.id)
+        .filter(Output.input_id == iput.id)
+        .filter(Output.active == True)
+        .one_or_none()
+    )
+
+
+def upload_allowed(
+    competition: Competition,
+    existing: Output | None,
+    when: datetime.datetime,
+    privileged: bool,
+) -> bool:
+    """Checks whether an output may be uploaded.
+
+    Args:
+        competition: Competition.
+        existing: The output it would replace, if any.
+        when: When the upload arrived.
+        privileged: Whether it was uploaded by an admin.
+
+    Returns:
+        True if the upload is allowed.
+    """
+    timeline = competition.timeline
+    if privileged or timeline.is_open(phases.Phase.output_upload, when):
+        return True
+    if timeline.is_open(phases.Phase.resolution, when):
+        return existing is None or not existing.use_ground_truth
+    return False
+
+
+@contextlib.contextmanager
+def _seekable(f: BinaryIO) -> Iterator[BinaryIO]:
+    """Gets a seekable copy of a file, if it is not already seekable.
+
+    Args:
+        f: Binary file, such as an upload or a stored file.
+
+    Yields:
+        ``f`` itself, or a temporary file with the rest of its contents.
+    """
+    if f.seekable():
+        yield f
+        return
+    with tempfile.TemporaryFile() as copy:
+        shutil.copyfileobj(f, copy)
+        copy.seek(0)
+        yield copy
+
+
+def _check_text(f: BinaryIO) -> None:
+    """Checks that the rest of a file is UTF-8, without reading it all at once.
+
+    Args:
+        f: Seekable binary file, which is left at its current position.
+
+    Raises:
+        SubmissionError: The file is not valid UTF-8.
+    """
+    start = f.tell()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        while chunk := f.read(problem_client.STREAM_CHUNK_SIZE):
+            decoder.decode(chunk)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        raise SubmissionError("Output contains invalid characters.") from e
+    f.seek(start)
+
+
+def save_output(
+    group: Group,
+    iput: Input,
+    existing: Output | None,
+    output_file: BinaryIO,
+    when: datetime.datetime,
+) -> Output:
+    """Verifies an output, and saves it in place of the existing one.
+
+    The output is streamed to the problem service rather than read into
+    memory, so large outputs can be verified.
+
+    Args:
+        group: Group which submitted the output.
+        iput: Input the output is for.
+        existing: The group's active output for the input, if any.
+        output_file: Binary file with the output contents.
+        when: When the upload arrived.
+
+    Returns:
+        The saved output.
+
+    Raises:
+        SubmissionError: The output contains invalid characters or has
+            formatting errors.
+    """
+    comp = group.competition
+    timeline = comp.timeline
+    problem = problem_client.get_client(comp.problem)
+    input_contents = iput.data.file.read()
+
+    try:
+        with _seekable(output_file) as f:
+            _check_text(f)
+            output = verification_cache.verify_output_file(problem, input_contents, f)
+    except problem_client.FileFormatError as e:
+        raise SubmissionError(f"Output has formatting errors: {e}") from e
+
+    f = FileIntent(
+        io.BytesIO(output.content),
+        f"output_from_{group.id}_to_{iput.group_id}.txt",
+        "application/octet-stream",
+    )
+    try:
+        output.require_accepted()
+    except problem_client.VerificationError:
+        ground_truth = VerificationStatus.rejected
+    else:
+        ground_truth = VerificationStatus.accepted
+
+    use_ground_truth = not comp.verification_begins or timeline.has_begun(
+        phases.Phase.verification, when
+    )
+
+    if existing:
+        if timeline.is_open(phases.Phase.resolution, when):
+            existing.active = False
+        else:
+            DBSession.delete(existing)
+        # Retire the old output before inserting its replacement, as
+        # only one output per input may be active.
+        DBSession.flush()
+
+    db_output = Output(
+        data=f,
+        group=group,
+        input=iput,
+        score=output.score,
+        original=timeline.is_open(phases.Phase.output_upload, when),
+        ground_truth=ground_truth,
+        use_ground_truth=use_ground_truth,
+    )
+    DBSession.add(db_output)
+    DBSession.flush()
+    rankings.refresh_input(iput)
+    return db_output
+
+
+def enabled() -> bool:
+    """Checks whether queued submissions are accepted.
+
+    Returns:
+        True if the queue is enabled.
+    """
+    return asbool(tg.config.get("algobowl.submission_queue.enabled", False))
+
+
+def enqueue(
+    group: Group,
+    iput: Input,
+    upload,
+    when: datetime.datetime,
+    privileged: bool,
+) -> OutputSubmission:
+    """Queues an output upload.
+
+    Workers are woken once the current transaction commits.
+
+    Args:
+        group: Group which submitted the output.
+        iput: Input the output is for.
+        upload: File object with the upload, as received.
+        when: When the upload arrived.
+        privileged: Whether it was uploaded by an admin.
+
+    Returns:
+        The queued submission.
+    """
+    submission = OutputSubmission(
+        group=group,
+        input=iput,
+        data=FileIntent(
+            upload,
+            f"submission_from_{group.id}_to_{iput.group_id}.txt",
+            "application/octet-stream",
+        ),
+        privileged=privileged,
+        received=when,
+        updated=when,
+    )
+    DBSession.add(submission)
+    DBSession.flush()
+
+    def after_commit(success):
+        if success:
+            start_workers()
+            _wake.set()
+
+    transaction.get().addAfterCommitHook(after_commit)
+    return submission
+
+
+def submission_status(submission: OutputSubmission) -> dict:
+    """Summarizes a submission for the status endpoint.
+
+    Args:
+        submission: Submission.
+
+    Returns:
+        JSON-serializable submission status.
+    """
+    result = {
+        "submission_id": submission.id,
+        "status": str(submission.status),
+        "received": submission.received.isoformat(),
+        "to_group": submission.input.group_id,
+    }
+    if submission.status == SubmissionStatus.complete and submission.output:
+        result["url"] = submission.output.url
+    if submission.error is not None:
+        result["msg"] = submission.error
+    return result
+
+
+def start_workers(count: int | None = None) -> None:
+    """Starts the worker threads for this process, if not already running.
+
+    Args:
+        count: Number of workers, or None for the configured number.
+    """
+    if count is None:
+        count = asint(
+            tg.config.get("algobowl.submission_queue.workers", DEFAULT_WORKERS)
+        )
+    with _workers_lock:
+        _workers[:] = [thread for thread in _workers if thread.is_alive()]
+        for i in range(len(_workers), count):
+            thread = threading.Thread(
+                target=_work, name=f"submission-worker-{i}", daemon=True
+            )
+            _workers.append(thread)
+            thread.start()
+
+
+def start_configured_workers() -> None:
+    """Starts the configured worker threads, if the queue is enabled.
+
+    Registered to run once the app's environment has loaded, so submissions
+    queued before a restart are picked up without waiting for the next
+    upload.  Submissions left running by workers which died with the old
+    process are queued again first.
+    """
+    if not enabled():
+        return
+    try:
+        requeue_stale()
+    except Exception:
+        log.exception("Requeueing stale submissions failed")
+    start_workers()
+
+
+def requeue_stale() -> int:
+    """Queues running submissions whose heartbeat has stopped.
+
+    Their workers are assumed to have died, so the submissions are queued
+    again, and their claims dropped.
+
+    Returns:
+        The number of submissions queued again.
+    """
+    try:
+        with transaction.manager:
+            requeued = (
+                DBSession.query(OutputSubmission)
+                .filter(OutputSubmission.status == SubmissionStatus.running)
+                .filter(
+                    OutputSubmission.updated < datetime.datetime.now() - STALE_AFTER
+                )
+                .update(
+                    {
+                        OutputSubmission.status: SubmissionStatus.queued,
+                        OutputSubmission.claim_token: None,
+                    },
+                    synchronize_session=False,
+                )
+            )
+    finally:
+        DBSession.remove()
+    if requeued:
+        log.info("Queued %d stale submissions again", requeued)
+    return requeued
+
+
+def _poll_interval() -> float:
+    return float(
+        tg.config.get("algobowl.submission_queue.poll_interval", DEFAULT_POLL_INTERVAL)
+    )
+
+
+def _work() -> None:
+    """Processes submissions forever.  Runs in a worker thread."""
+    while True:
+        try:
+            if run_once():
+                continue
+        except Exception:
+            log.exception("Submission worker failed")
+        _wake.wait(_poll_interval())
+        _wake.clear()
+
+
+def run_once() -> bool:
+    """Claims and processes one submission.
+
+    Returns:
+        True if a submission was processed, False if there were none ready.
+    """
+    try:
+        claim = _claim()
+        if claim is None:
+            return False
+        _process(*claim)
+        return True
+    finally:
+        DBSession.remove()
+
+
+def _claim() -> tuple[int, str] | None:
+    """Marks the oldest ready submission as running.
+
+    A submission is ready if it is queued (or its worker died), and no
+    earlier submission from the same group for the same input is still
+    waiting.  Claims are made with a conditional update, so concurrent
+    workers never claim the same submission.
+
+    Returns:
+        The claimed submission id and claim token, or None if none are
+        ready.
+    """
+    now = datetime.datetime.now()
+    claim_token = secrets.token_hex(16)
+    earlier = sa.orm.aliased(OutputSubmission)
+    ready = sa.or_(
+        OutputSubmission.status == SubmissionStatus.queued,
+        sa.and_(
+            OutputSubmission.status == SubmissionStatus.running,
+            OutputSubmission.updated < now - STALE_AFTER,
+        ),
+    )
+    with transaction.manager:
+        candidates = [
+            submission_id
+            for (submission_id,) in DBSession.query(OutputSubmission.id)
+            .filter(ready)
+            .filter(
+                ~sa.exists()
+                .where(earlier.group_id == OutputSubmission.group_id)
+                .where(earlier.input_id == OutputSubmission.input_id)
+                .where(earlier.id < OutputSubmission.id)
+                .where(
+                    earlier.status.in_(
+                        [SubmissionStatus.queued, SubmissionStatus.running]
+                    )
+                )
+            )
+            .order_by(OutputSubmission.id)
+            .limit(_CLAIM_BATCH)
+        ]
+    for submission_id in candidates:
+        with transaction.manager:
+            claimed = (
+                DBSession.query(OutputSubmission)
+                .filter(OutputSubmission.id == submission_id)
+                .filter(ready)
+                .update(
+                    {
+                        OutputSubmission.status: SubmissionStatus.running,
+                        OutputSubmission.updated: now,
+                        OutputSubmission.claim_token: claim_token,
+                    },
+                    synchronize_session=False,
+                )
+            )
+        if claimed:
+            return submission_id, claim_token
+    return None
+
+
+@contextlib.contextmanager
+def _heartbeat(submission_id: int, claim_token: str) -> Iterator[None]:
+    """Bumps a claimed submission's heartbeat until the block exits.
+
+    Args:
+        submission_id: Claimed submission.
+        claim_token: Token of the claim.
+    """
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=_beat,
+        args=(submission_id, claim_token, stop),
+        name=f"submission-heartbeat-{submission_id}",
+        daemon=True,
+    )
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _beat(submission_id: int, claim_token: str, stop: threading.Event) -> None:
+    """Bumps a submission's heartbeat, each in its own transaction.
+
+    Runs in a heartbeat thread, until stopped or the claim is taken over.
+
+    Args:
+        submission_id: Claimed submission.
+        claim_token: Token of the claim.
+        stop: Set when processing has finished.
+    """
+    try:
+        while not stop.wait(HEARTBEAT_INTERVAL.total_seconds()):
+            try:
+                with transaction.manager:
+                    beaten = (
+                        DBSession.query(OutputSubmission)
+                        .filter(OutputSubmission.id == submission_id)
+                        .filter(OutputSubmission.claim_token == claim_token)
+                        .update(
+                            {OutputSubmission.updated: datetime.datetime.now()},
+                            synchronize_session=False,
+                        )
+                    )
+            except Exception:
+                log.exception("Heartbeat of submission %s failed", submission_id)
+                continue
+            if not beaten:
+                return
+    finally:
+        DBSession.remove()
+
+
+def _hold_claim(submission_id: int, claim_token: str) -> OutputSubmission | None:
+    """Locks a claimed submission until commit, if the claim is still ours.
+
+    Args:
+        submission_id: Claimed submission.
+        claim_token: Token of the claim.
+
+    Returns:
+        The submission, or None if another worker has claimed it since.
+    """
+    return (
+        DBSession.query(OutputSubmission)
+        .filter(OutputSubmission.id == submission_id)
+        .filter(OutputSubmission.claim_token == claim_token)
+        .with_for_update()
+        .one_or_none()
+    )
+
+
+def _process(submission_id: int, claim_token: str) -> None:
+    """Verifies and saves a claimed submission, recording the outcome.
+
+    Nothing is recorded if the claim is taken over before processing ends.
+
+    Args:
+        submission_id: Claimed submission.
+        claim_token: Token of the claim.
+    """
+    try:
+        with _heartbeat(submission_id, claim_token), transaction.manager:
+            submission = DBSession.query(OutputSubmission).get(submission_id)
+            existing = active_output(submission.group, submission.input)
+            if not upload_allowed(
+                submission.group.competition,
+                existing,
+                submission.received,
+                submission.privileged,
+            ):
+                raise SubmissionError(
+                    "Forbidden to upload this output at the time it was received"
+                )
+            output = save_output(
+                submission.group,
+                submission.input,
+                existing,
+                submission.data.file,
+                submission.received,
+            )
+            if _hold_claim(submission_id, claim_token) is None:
+                raise _ClaimLostError
+            submission.output = output
+            submission.status = SubmissionStatus.complete
+            submission.data = None
+            submission.claim_token = None
+            submission.updated = datetime.datetime.now()
+    except _ClaimLostError:
+        log.warning("Claim of submission %s was taken over", submission_id)
+    except Exception as e:
+        DBSession.remove()
+        with transaction.manager:
+            submission = _hold_claim(submission_id, claim_token)
+            if submission is None:
+                log.warning("Claim of submission %s was taken over", submission_id)
+                return
+            if not isinstance(e, SubmissionError):
+                log.exception("Processing submission %s failed", submission_id)
+            submission.status = SubmissionStatus.failed
+            submission.error = str(e)
+            submission.data = None
+            submission.claim_token = None
+            submission.updated = datetime.datetime.now()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Runs submission workers outside of the web server.
+
+    Args:
+        argv: Command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Process queued output submissions.")
+    parser.add_argument("config", help="Path to the app's .ini file")
+    parser.add_argument(
+        "--workers",
+        "-j",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of submissions processed concurrently",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    loadapp(f"config:{args.config}", relative_to=".")
+    requeue_stale()
+    start_workers(args.workers)
+    log.info("Processing submissions with %d workers", args.workers)
+    for thread in _workers:
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""In-process cache of CLI authentication tokens.
+
+Every CLI request authenticates with a bearer token.  Without a cache, that
+means looking up the token, its user, and then the user again to get their
+permissions, before the request even starts.  With the cache, a token seen
+recently authenticates without touching the database.
+
+Entries are not checked against the database until they expire, so the TTL
+is kept short: it bounds how long a revoked token keeps working, and how long
+a user's old admin flag is used, in every process.  Revoking a token through
+the preferences page invalidates it immediately only in the process which
+handled the revocation; other processes accept it until their entry expires.
+
+Configuration:
+
+- ``algobowl.token_cache.size``: Maximum number of tokens kept.  0 disables
+  the cache.
+- ``algobowl.token_cache.ttl``: Seconds an entry stays valid, and so the
+  longest a revoked token or changed admin flag can go unnoticed.
+"""
+
+from __future__ import annotations
+
+import collections
+import dataclasses
+import threading
+import time
+
+import tg
+from tg.support.converters import asint
+
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_TTL_SECONDS = 10
+
+
+@dataclasses.dataclass(frozen=True)
+class CachedToken:
+    """The user a token authenticates as.
+
+    Attributes:
+        user_id: User id.
+        username: Username.
+        admin: Whether the user is an admin.
+    """
+
+    user_id: int
+    username: str
+    admin: bool
+
+
+class TokenCache:
+    """TTL-bounded LRU cache from token client id to user.
+
+    Attributes:
+        max_entries: Maximum number of entries to keep.
+        ttl: Seconds an entry stays valid.
+        hits: Number of lookups answered from the cache.
+        misses: Number of lookups not answered from the cache.
+    """
+
+    def __init__(
+        self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL_SECONDS
+    ) -> None:
+        """Initializes an empty cache.
+
+        Args:
+            max_entries: Maximum number of entries to keep.
+            ttl: Seconds an entry stays valid.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: collections.OrderedDict[str, tuple[float, CachedToken]] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, client_id: str) -> CachedToken | None:
+        """Looks up a token, marking it most recently used.
+
+        Args:
+            client_id: Token client id.
+
+        Returns:
+            The cached token, or None on a miss or if it has expired.
+        """
+        with self._lock:
+            entry = self._entries.get(client_id)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[client_id]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(client_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, client_id: str, token: CachedToken) -> None:
+        """Stores a token, evicting the least recently used.
+
+        Args:
+            client_id: Token client id.
+            token: User the token authenticates as.
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[client_id] = (time.monotonic() + self.ttl, token)
+            self._entries.move_to_end(client_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, client_id: str) -> None:
+        """Drops a token from the cache.
+
+        Args:
+            client_id: Token client id.
+        """
+        with self._lock:
+            self._entries.pop(client_id, None)
+
+    def stats(self) -> dict:
+        """Summarizes cache effectiveness.
+
+        Returns:
+            JSON-serializable cache statistics.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_cache: TokenCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> TokenCache:
+    """Gets the process-wide token cache, configured from the app config.
+
+    Returns:
+        The token cache.
+    """
+    global _cache  # noqa: PLW0603
+    with _cache_lock:
+        if _cache is None:
+            _cache = TokenCache(
+                max_entries=asint(
+                    tg.config.get("algobowl.token_cache.size", DEFAULT_MAX_ENTRIES)
+                ),
+                ttl=float(
+                    tg.config.get("algobowl.token_cache.ttl", DEFAULT_TTL_SECONDS)
+                ),
+            )
+        return _cache
@@ -0,0 +1,459 @@
+"""Content-addressed cache of output verification results.
+
+Results are keyed by the problem service URL, the problem version it
+reports, and the SHA-256 of the input and output bytes.  Services which do
+not report a version are never cached, since there would be no way to tell
+when their verifier changes.  When a service reports a new version, entries
+for its old versions are dropped.
+
+A cached result can only stand in for a VerifyOutput call if the output was
+already in normalized form (which is always true for outputs stored by the
+app), as the normalized content itself is not cached.
+
+Configuration:
+
+- ``algobowl.verification_cache.size``: Maximum number of results kept in
+  memory, and in the database if persistent.  0 disables the cache.
+- ``algobowl.verification_cache.persistent``: Also keep results in the
+  ``cached_verification`` table, so they survive restarts and are shared
+  between processes.
+"""
+
+from __future__ import annotations
+
+import collections
+import dataclasses
+import datetime
+import hashlib
+import threading
+from collections.abc import Sequence
+from typing import BinaryIO
+
+import tg
+from tg.support.converters import asbool, asint
+
+from algobowl.lib import problem_client
+from algobowl.model import CachedVerification, DBSession
+
+DEFAULT_MAX_ENTRIES = 10000
+
+# Persistent entries beyond the size bound are pruned every this many puts.
+_PRUNE_INTERVAL = 100
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheKey:
+    """Identifies a verification result.
+
+    Attributes:
+        problem: Base URL of the problem support service.
+        version: Problem version reported by the service.
+        input_sha256: Hex digest of the input bytes.
+        output_sha256: Hex digest of the output bytes.
+    """
+
+    problem: str
+    version: str
+    input_sha256: str
+    output_sha256: str
+
+
+@dataclasses.dataclass(frozen=True)
+class CachedResult:
+    """A cached verification result.
+
+    Attributes:
+        score: Reported output score.
+        content_sha256: Hex digest of the normalized output.
+        rejection_reason: Reason the output was rejected, or None if accepted.
+    """
+
+    score: int
+    content_sha256: str
+    rejection_reason: str | None
+
+
+def _sha256(content: bytes) -> str:
+    """Hashes content for use in a cache key.
+
+    Args:
+        content: Content bytes.
+
+    Returns:
+        Hex SHA-256 digest.
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+class VerificationCache:
+    """LRU cache of verification results, optionally backed by the database.
+
+    Attributes:
+        max_entries: Maximum number of entries to keep.
+        persistent: Whether entries are also stored in the database.
+    """
+
+    def __init__(
+        self, max_entries: int = DEFAULT_MAX_ENTRIES, persistent: bool = False
+    ) -> None:
+        """Initializes an empty cache.
+
+        Args:
+            max_entries: Maximum number of entries to keep.
+            persistent: Whether entries are also stored in the database.
+        """
+        self.max_entries = max_entries
+        self.persistent = persistent
+        self._entries: collections.OrderedDict[CacheKey, CachedResult] = (
+            collections.OrderedDict()
+        )
+        self._versions: dict[str, str] = {}
+        self._puts = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> CachedResult | None:
+        """Looks up a result, marking it most recently used.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            The cached result, or None on a miss.
+        """
+        self._check_version(key)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                return result
+        if not self.persistent:
+            return None
+
+        row = DBSession.query(CachedVerification).get(
+            (key.problem, key.version, key.input_sha256, key.output_sha256)
+        )
+        if row is None:
+            return None
+        row.last_used = datetime.datetime.now()
+        result = CachedResult(
+            score=row.score,
+            content_sha256=row.content_sha256,
+            rejection_reason=row.rejection_reason,
+        )
+        self._remember(key, result)
+        return result
+
+    def put(self, key: CacheKey, result: CachedResult) -> None:
+        """Stores a result.
+
+        Args:
+            key: Cache key.
+            result: Result to store.
+        """
+        self._check_version(key)
+        self._remember(key, result)
+        if not self.persistent:
+            return
+
+        DBSession.merge(
+            CachedVerification(
+                problem=key.problem,
+                problem_version=key.version,
+                input_sha256=key.input_sha256,
+                output_sha256=key.output_sha256,
+                content_sha256=result.content_sha256,
+                score=result.score,
+                rejection_reason=result.rejection_reason,
+                last_used=datetime.datetime.now(),
+            )
+        )
+        with self._lock:
+            self._puts += 1
+            prune = self._puts % _PRUNE_INTERVAL == 0
+        if prune:
+            self._prune_persistent()
+
+    def invalidate(self, problem: str, keep_version: str | None = None) -> None:
+        """Drops cached results for a problem service.
+
+        Args:
+            problem: Base URL of the problem support service.
+            keep_version: If given, results for this version are kept.
+        """
+        with self._lock:
+            for key in [
+                key
+                for key in self._entries
+                if key.problem == problem and key.version != keep_version
+            ]:
+                del self._entries[key]
+        if not self.persistent:
+            return
+
+        query = DBSession.query(CachedVerification).filter(
+            CachedVerification.problem == problem
+        )
+        if keep_version is not None:
+            query = query.filter(CachedVerification.problem_version != keep_version)
+        query.delete(synchronize_session=False)
+
+    def _remember(self, key: CacheKey, result: CachedResult) -> None:
+        """Stores a result in memory, evicting the least recently used.
+
+        Args:
+            key: Cache key.
+            result: Result to store.
+        """
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _check_version(self, key: CacheKey) -> None:
+        """Drops old versions' results the first time a new version is seen.
+
+        Args:
+            key: Cache key about to be used.
+        """
+        with self._lock:
+            old_version = self._versions.get(key.problem)
+            self._versions[key.problem] = key.version
+        if old_version is not None and old_version != key.version:
+            self.invalidate(key.problem, keep_version=key.version)
+
+    def _prune_persistent(self) -> None:
+        """Deletes the least recently used database entries over the bound."""
+        cutoff = (
+            DBSession.query(CachedVerification.last_used)
+            .order_by(CachedVerification.last_used.desc())
+            .offset(self.max_entries)
+            .limit(1)
+            .scalar()
+        )
+        if cutoff is not None:
+            DBSession.query(CachedVerification).filter(
+                CachedVerification.last_used <= cutoff
+            ).delete(synchronize_session=False)
+
+
+_cache: VerificationCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> VerificationCache:
+    """Gets the process-wide verification cache, configured from the app config.
+
+    Returns:
+        The verification cache.
+    """
+    global _cache  # noqa: PLW0603
+    with _cache_lock:
+        if _cache is None:
+            _cache = VerificationCache(
+                max_entries=asint(
+                    tg.config.get(
+                        "algobowl.verification_cache.size", DEFAULT_MAX_ENTRIES
+                    )
+                ),
+                persistent=asbool(
+                    tg.config.get("algobowl.verification_cache.persistent", False)
+                ),
+            )
+        return _cache
+
+
+def _key(
+    problem: problem_client.ProblemClient,
+    version: str,
+    input_sha256: str,
+    output: bytes,
+) -> CacheKey:
+    """Builds a cache key.
+
+    Args:
+        problem: Problem client.
+        version: Problem version.
+        input_sha256: Hex digest of the input bytes.
+        output: Output bytes.
+
+    Returns:
+        The cache key.
+    """
+    return CacheKey(problem.url, version, input_sha256, _sha256(output))
+
+
+def _from_cache(key: CacheKey, output: bytes) -> problem_client.VerifiedOutput | None:
+    """Looks up a verified output in the cache.
+
+    Args:
+        key: Cache key.
+        output: Output bytes the key was computed from.
+
+    Returns:
+        The verified output, or None if not cached or the output was not
+        already normalized.
+    """
+    result = get_cache().get(key)
+    if result is None or result.content_sha256 != key.output_sha256:
+        return None
+    return problem_client.VerifiedOutput(
+        content=output,
+        score=result.score,
+        rejection_reason=result.rejection_reason,
+    )
+
+
+def _to_cache(key: CacheKey, verified: problem_client.VerifiedOutput) -> None:
+    """Stores a verified output in the cache.
+
+    Args:
+        key: Cache key.
+        verified: Verified output returned by the problem service.
+    """
+    get_cache().put(
+        key,
+        CachedResult(
+            score=verified.score,
+            content_sha256=_sha256(verified.content),
+            rejection_reason=verified.rejection_reason,
+        ),
+    )
+
+
+def _enabled_version(problem: problem_client.ProblemClient) -> str | None:
+    """Gets the problem version to cache under, if caching applies.
+
+    Args:
+        problem: Problem client.
+
+    Returns:
+        The problem version, or None if results should not be cached.
+    """
+    if not get_cache().max_entries:
+        return None
+    return problem.version() or None
+
+
+def verify_output(
+    problem: problem_client.ProblemClient,
+    input_content: str | bytes,
+    output_content: str | bytes,
+) -> problem_client.VerifiedOutput:
+    """Verifies an output, using a cached result if there is one.
+
+    Args:
+        problem: Problem client.
+        input_content: Input content as text or bytes.
+        output_content: Output content as text or bytes.
+
+    Returns:
+        Verified output value object.
+
+    Raises:
+        FileFormatError: The input or output has formatting errors.
+    """
+    version = _enabled_version(problem)
+    if version is None:
+        return problem.verify_output(input_content, output_content)
+
+    input_content = problem_client.content_to_bytes(input_content)
+    output_content = problem_client.content_to_bytes(output_content)
+    key = _key(problem, version, _sha256(input_content), output_content)
+    verified = _from_cache(key, output_content)
+    if verified is None:
+        verified = problem.verify_output(input_content, output_content)
+        _to_cache(key, verified)
+    return verified
+
+
+def verify_output_file(
+    problem: problem_client.ProblemClient,
+    input_content: str | bytes,
+    output_file: BinaryIO,
+) -> problem_client.VerifiedOutput:
+    """Verifies an output read from a file, using a cached result if any.
+
+    The output is hashed and sent to the problem service in chunks, so it
+    is only read into memory in full if the result is cached.
+
+    Args:
+        problem: Problem client.
+        input_content: Input content as text or bytes.
+        output_file: Seekable binary file positioned at the start of the
+            output.
+
+    Returns:
+        Verified output value object.
+
+    Raises:
+        FileFormatError: The input or output has formatting errors.
+    """
+    version = _enabled_version(problem)
+    if version is None:
+        return problem.verify_output_stream(input_content, output_file)
+
+    input_content = problem_client.content_to_bytes(input_content)
+    start = output_file.tell()
+    output_sha256 = hashlib.sha256()
+    while chunk := output_file.read(problem_client.STREAM_CHUNK_SIZE):
+        output_sha256.update(chunk)
+    output_file.seek(start)
+    key = CacheKey(
+        problem.url, version, _sha256(input_content), output_sha256.hexdigest()
+    )
+    result = get_cache().get(key)
+    if result is not None and result.content_sha256 == key.output_sha256:
+        return problem_client.VerifiedOutput(
+            content=output_file.read(),
+            score=result.score,
+            rejection_reason=result.rejection_reason,
+        )
+    verified = problem.verify_output_stream(input_content, output_file)
+    _to_cache(key, verified)
+    return verified
+
+
+def verify_outputs(
+    problem: problem_client.ProblemClient,
+    input_content: str | bytes,
+    output_contents: Sequence[str | bytes],
+) -> list[problem_client.VerifiedOutput | problem_client.FileFormatError]:
+    """Verifies several outputs for one input, using cached results if any.
+
+    Only outputs missing from the cache are sent to the problem service.
+
+    Args:
+        problem: Problem client.
+        input_content: Input content as text or bytes.
+        output_contents: Output contents as text or bytes.
+
+    Returns:
+        One entry per output, in order: the verified output, or a
+        FileFormatError if that output has formatting errors.
+
+    Raises:
+        FileFormatError: The input has formatting errors.
+    """
+    version = _enabled_version(problem)
+    if version is None:
+        return problem.verify_outputs(input_content, output_contents)
+
+    input_content = problem_client.content_to_bytes(input_content)
+    input_sha256 = _sha256(input_content)
+    output_contents = [problem_client.content_to_bytes(c) for c in output_contents]
+    keys = [_key(problem, version, input_sha256, c) for c in output_contents]
+    results = [
+        _from_cache(key, c) for key, c in zip(keys, output_contents, strict=True)
+    ]
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        fetched = problem.verify_outputs(
+            input_content, [output_contents[i] for i in missing]
+        )
+        for i, result in zip(missing, fetched, strict=True):
+            results[i] = result
+            if isinstance(result, problem_client.VerifiedOutput):
+                _to_cache(keys[i], result)
+    return results
@@ -7,9 +7,18 @@ import sqlalchemy as sa
 import tg
 from depot.fields.sqlalchemy import UploadedFileField
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relation, relationship, scoped_session, sessionmaker
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import (
+    column_property,
+    relation,
+    relationship,
+    scoped_session,
+    sessionmaker,
+)
 from zope.sqlalchemy import register
 
+from algobowl.lib import phases
+
 maker = sessionmaker(autoflush=True, autocommit=False)
 DBSession = scoped_session(maker)
 register(DBSession)
@@ -35,6 +44,25 @@ class VerificationStatus(enum.Enum):
         return self.name
 
 
+class JobStatus(enum.Enum):
+    running = 0
+    complete = 1
+    failed = 2
+
+    def __str__(self):
+        return self.name
+
+
+class SubmissionStatus(enum.Enum):
+    queued = 0
+    running = 1
+    complete = 2
+    failed = 3
+
+    def __str__(self):
+        return self.name
+
+
 class Competition(DeclarativeBase):
     __tablename__ = "competition"
     db_icon = "fas fa-clipboard-list"
@@ -93,6 +121,7 @@ class Competition(DeclarativeBase):
         sa.CheckConstraint("open_verification_ends >= open_verification_begins"),
         nullable=True,
     )
+
     groups = relationship(
         "Group",
         back_populates="competition",
@@ -101,72 +130,96 @@ class Competition(DeclarativeBase):
         uselist=True,
     )
 
+    @property
+    def timeline(self) -> phases.Timeline:
+        """The schedule, built once and kept until it may have changed."""
+        timeline = self.__dict__.get("_timeline")
+        if timeline is None:
+            timeline = self.__dict__["_timeline"] = phases.Timeline.of(self)
+        return timeline
+
+    @property
+    def phase(self) -> phases.Phase | None:
+        return self.timeline.phase_at(phases.now())
+
+    @property
+    def next_transition(self) -> datetime.datetime | None:
+        return self.timeline.next_transition(phases.now())
+
+    def has_begun(self, phase: phases.Phase) -> bool:
+        return self.timeline.has_begun(phase, phases.now())
+
     @property
     def input_upload_open(self):
-        return (
-            self.input_upload_begins <= datetime.datetime.now() < self.input_upload_ends
-        )
+        return self.timeline.is_open(phases.Phase.input_upload, phases.now())
 
     @property
     def output_upload_open(self):
-        return (
-            self.output_upload_begins
-            <= datetime.datetime.now()
-            < self.output_upload_ends
-        )
+        return self.timeline.is_open(phases.Phase.output_upload, phases.now())
 
     @property
     def verification_open(self):
-        return self.verification_begins and (
-            self.verification_begins <= datetime.datetime.now() < self.verification_ends
-        )
+        return self.timeline.is_open(phases.Phase.verification, phases.now())
 
     @property
     def resolution_open(self):
-        return self.resolution_begins and (
-            self.resolution_begins <= datetime.datetime.now() < self.resolution_ends
-        )
+        return self.timeline.is_open(phases.Phase.resolution, phases.now())
 
     @property
     def open_verification_open(self):
-        return self.open_verification_begins and (
-            self.open_verification_begins
-            <= datetime.datetime.now()
-            < self.open_verification_ends
-        )
+        return self.timeline.is_open(phases.Phase.open_verification, phases.now())
 
-    @property
+    @hybrid_property
     def end(self):
-        return max(
-            filter(
-                lambda x: x,
-                (
-                    self.output_upload_ends,
-                    self.verification_ends,
-                    self.resolution_ends,
-                    self.open_verification_ends,
-                ),
-            )
-        )
+        return self.timeline.end
+
+    @end.expression
+    def end(cls):  # noqa: N805
+        # Latest of the non-NULL phase ends.  output_upload_ends is never
+        # NULL, so the comparisons below never compare against NULL.
+        result = cls.output_upload_ends
+        for col in (
+            cls.verification_ends,
+            cls.resolution_ends,
+            cls.open_verification_ends,
+        ):
+            result = sa.case([(col > result, col)], else_=result)
+        return result
 
     @property
     def published(self):
-        return self.input_upload_begins <= datetime.datetime.now()
+        return self.timeline.published(phases.now())
 
     @property
     def active(self):
-        return self.input_upload_begins <= datetime.datetime.now() < self.end
+        return self.timeline.active(phases.now())
 
     @property
     def archived(self):
-        # 3 months after end
-        archive_date = self.end + datetime.timedelta(days=90)
-        return datetime.datetime.now() >= archive_date
+        return self.timeline.archived(phases.now())
+
+    @classmethod
+    def active_at(cls, when: datetime.datetime) -> sa.sql.ClauseElement:
+        """SQL filter for competitions active at a time."""
+        return sa.and_(cls.input_upload_begins <= when, cls.end > when)
 
     def __repr__(self):
         return self.name
 
 
+def _forget_timeline(target, *args):
+    # The target may already have been garbage collected when it is expired.
+    if target is not None:
+        target.__dict__.pop("_timeline", None)
+
+
+for _phase in phases.Phase:
+    for _col in _phase.columns:
+        sa.event.listen(getattr(Competition, _col), "set", _forget_timeline)
+sa.event.listen(Competition, "expire", _forget_timeline)
+sa.event.listen(Competition, "refresh", _forget_timeline)
+
+
 class User(DeclarativeBase):
     __tablename__ = "user"
     db_icon = "fas fa-user"
@@ -208,6 +261,9 @@ class AuthToken(DeclarativeBase):
 
 class Group(DeclarativeBase):
     __tablename__ = "group"
+    __table_args__ = (
+        sa.Index("ix_group_competition_id_incognito", "competition_id", "incognito"),
+    )
     db_icon = "fas fa-users"
 
     id = sa.Column(sa.Integer, primary_key=True)
@@ -256,6 +312,7 @@ user_group_xref = sa.Table(
         sa.Integer,
         sa.ForeignKey("group.id", onupdate="CASCADE", ondelete="CASCADE"),
         primary_key=True,
+        index=True,
     ),
 )
 
@@ -276,7 +333,9 @@ class Input(DeclarativeBase):
     data = sa.Column(UploadedFileField, nullable=False)
     is_default = sa.Column(sa.Boolean, nullable=True)
 
-    group_id = sa.Column(sa.Integer, sa.ForeignKey("group.id"), nullable=False)
+    group_id = sa.Column(
+        sa.Integer, sa.ForeignKey("group.id"), nullable=False, index=True
+    )
     group = relationship("Group", back_populates="input")
 
     outputs = relationship(
@@ -320,11 +379,28 @@ class Output(DeclarativeBase):
     input_id = sa.Column(sa.Integer, sa.ForeignKey("input.id"), nullable=False)
     input = relationship("Input", back_populates="outputs")
 
-    group_id = sa.Column(sa.Integer, sa.ForeignKey("group.id"), nullable=False)
+    group_id = sa.Column(
+        sa.Integer, sa.ForeignKey("group.id"), nullable=False, index=True
+    )
     group = relationship("Group", back_populates="outputs")
 
     protests = relationship("Protest", back_populates="output", lazy="dynamic")
 
+    __table_args__ = (
+        sa.Index(
+            "ix_output_input_id_group_id_active", "input_id", "group_id", "active"
+        ),
+        # A group may only have one active output for each input.
+        sa.Index(
+            "ux_output_group_id_input_id_active",
+            "group_id",
+            "input_id",
+            unique=True,
+            sqlite_where=active == True,
+            postgresql_where=active == True,
+        ),
+    )
+
     @property
     def filename(self):
         return f"output_from_{self.group_id}_to_{self.input.group_id}.txt"
@@ -352,11 +428,311 @@ class Protest(DeclarativeBase):
     message = sa.Column(sa.Unicode(1000), nullable=False)
     accepted = sa.Column(sa.Boolean, nullable=False)
 
-    submitter_id = sa.Column(sa.Integer, sa.ForeignKey("group.id"), nullable=False)
+    submitter_id = sa.Column(
+        sa.Integer, sa.ForeignKey("group.id"), nullable=False, index=True
+    )
     submitter = relationship("Group", back_populates="protests")
 
-    output_id = sa.Column(sa.Integer, sa.ForeignKey("output.id"), nullable=False)
+    output_id = sa.Column(
+        sa.Integer, sa.ForeignKey("output.id"), nullable=False, index=True
+    )
     output = relationship("Output", back_populates="protests")
 
     def __repr__(self):
         return f"Protest {self.id}, from [{self.submitter!r}] on {self.output!r}"
+
+
+class RankingCell(DeclarativeBase):
+    """
+    Materialized rank of a group's active output on one input, as shown on
+    the public rankings page (student verifications, incognito groups
+    hidden).  Maintained by :mod:`algobowl.lib.rankings`.
+    """
+
+    __tablename__ = "ranking_cell"
+    db_icon = "fas fa-table"
+
+    input_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("input.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    group_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("group.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    competition_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("competition.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    output_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("output.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    score = sa.Column(sa.BigInteger, nullable=False)
+    verification = sa.Column(sa.Enum(VerificationStatus), nullable=False)
+    rank = sa.Column(sa.Integer, nullable=True)
+
+    # Accepted resubmission, counts as one penalty.
+    penalty = sa.Column(sa.Boolean, nullable=False, default=False)
+
+
+class CachedVerification(DeclarativeBase):
+    """
+    Persistent tier of the output verification cache, keyed by the problem
+    service, its version, and the hashes of the input and output.
+    Maintained by :mod:`algobowl.lib.verification_cache`.
+    """
+
+    __tablename__ = "cached_verification"
+    db_icon = "fas fa-database"
+
+    problem = sa.Column(sa.String, primary_key=True)
+    problem_version = sa.Column(sa.String, primary_key=True)
+    input_sha256 = sa.Column(sa.String(64), primary_key=True)
+    output_sha256 = sa.Column(sa.String(64), primary_key=True)
+
+    # Hash of the normalized output returned by the problem service.
+    content_sha256 = sa.Column(sa.String(64), nullable=False)
+    score = sa.Column(sa.BigInteger, nullable=False)
+    rejection_reason = sa.Column(sa.String, nullable=True)
+    last_used = sa.Column(
+        sa.DateTime, nullable=False, default=datetime.datetime.now, index=True
+    )
+
+
+class ReverifyJob(DeclarativeBase):
+    """
+    A background re-verification of a competition's outputs against the
+    problem service.  Run by :mod:`algobowl.lib.reverify`.
+    """
+
+    __tablename__ = "reverify_job"
+    db_icon = "fas fa-redo"
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    competition_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("competition.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    competition = relationship("Competition")
+
+    status = sa.Column(sa.Enum(JobStatus), nullable=False, default=JobStatus.running)
+    started = sa.Column(sa.DateTime, nullable=False, default=datetime.datetime.now)
+    # Heartbeat, bumped each time a batch is committed.
+    updated = sa.Column(sa.DateTime, nullable=False, default=datetime.datetime.now)
+
+    total_inputs = sa.Column(sa.Integer, nullable=False, default=0)
+    done_inputs = sa.Column(sa.Integer, nullable=False, default=0)
+    changes = sa.Column(sa.Integer, nullable=False, default=0)
+    # Inputs are processed in id order; everything up to here is done.
+    checkpoint_input_id = sa.Column(sa.Integer, nullable=True)
+
+    log = sa.Column(sa.Text, nullable=False, default="")
+    error = sa.Column(sa.String, nullable=True)
+
+
+class OutputSubmission(DeclarativeBase):
+    """
+    An output upload waiting to be verified and saved as an
+    :class:`Output`.  Queued and processed by
+    :mod:`algobowl.lib.submissions`.
+    """
+
+    __tablename__ = "output_submission"
+    __table_args__ = (
+        sa.Index("ix_output_submission_status_id", "status", "id"),
+        sa.Index("ix_output_submission_group_id_input_id", "group_id", "input_id"),
+    )
+    db_icon = "fas fa-hourglass-half"
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    group_id = sa.Column(
+        sa.Integer, sa.ForeignKey("group.id", ondelete="CASCADE"), nullable=False
+    )
+    group = relationship("Group")
+    input_id = sa.Column(
+        sa.Integer, sa.ForeignKey("input.id", ondelete="CASCADE"), nullable=False
+    )
+    input = relationship("Input")
+
+    # The upload as received.  Dropped once it has been processed.
+    data = sa.Column(UploadedFileField, nullable=True)
+    # Uploaded by an admin, who may upload outside of the upload stages.
+    privileged = sa.Column(sa.Boolean, nullable=False, default=False)
+    # When the upload arrived; deadlines are checked against this.
+    received = sa.Column(sa.DateTime, nullable=False, default=datetime.datetime.now)
+
+    status = sa.Column(
+        sa.Enum(SubmissionStatus), nullable=False, default=SubmissionStatus.queued
+    )
+    # Heartbeat, bumped periodically by the worker processing the submission.
+    updated = sa.Column(sa.DateTime, nullable=False, default=datetime.datetime.now)
+    # Random token of the worker's current claim.  Only the latest claimant
+    # may record the outcome, in case a live worker's claim was taken over.
+    claim_token = sa.Column(sa.String, nullable=True)
+
+    output_id = sa.Column(
+        sa.Integer, sa.ForeignKey("output.id", ondelete="SET NULL"), nullable=True
+    )
+    output = relationship("Output")
+    error = sa.Column(sa.String, nullable=True)
+
+
+class InputArchive(DeclarativeBase):
+    """
+    A zip of every input in a competition, so groups can download them all
+    at once.  Built by :mod:`algobowl.lib.input_archive`.
+    """
+
+    __tablename__ = "input_archive"
+    __table_args__ = (
+        sa.Index(
+            "ux_input_archive_competition_id_digest",
+            "competition_id",
+            "digest",
+            unique=True,
+        ),
+    )
+    db_icon = "far fa-file-archive"
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    competition_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("competition.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    competition = relationship("Competition")
+
+    # Digest of the input files the archive was built from.
+    digest = sa.Column(sa.String(64), nullable=False)
+    data = sa.Column(UploadedFileField, nullable=False)
+    created = sa.Column(sa.DateTime, nullable=False, default=datetime.datetime.now)
+
+    @property
+    def filename(self):
+        return f"inputs_competition{self.competition_id}.zip"
+
+    @property
+    def url(self):
+        return _get_depot_url(self.filename, self.data and self.data.file_id)
+
+
+class PooledInput(DeclarativeBase):
+    """
+    A default input generated ahead of time, waiting to be given to a group.
+    Maintained by :mod:`algobowl.lib.input_pool`.
+    """
+
+    __tablename__ = "pooled_input"
+    db_icon = "far fa-file"
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    competition_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("competition.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    competition = relationship("Competition")
+
+    # URL of the problem service which generated the input.
+    problem = sa.Column(sa.String, nullable=False)
+    data = sa.Column(UploadedFileField, nullable=False)
+    created = sa.Column(sa.DateTime, nullable=False, default=datetime.datetime.now)
+
+
+class CompetitionChange(DeclarativeBase):
+    """
+    A transaction which changed something shown on a competition's rankings.
+    Rows are only ever added, see ``Competition.data_version``.
+    """
+
+    __tablename__ = "competition_change"
+    __table_args__ = (
+        sa.Index("ix_competition_change_competition_id", "competition_id", "id"),
+    )
+    db_icon = "fas fa-history"
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    competition_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("competition.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+
+# Changes whenever anything shown on the rankings changes, see
+# _bump_data_versions.  This counts rows rather than taking the largest ID:
+# IDs are assigned before commit, so a transaction can commit a smaller ID
+# after a larger one was already seen, but every commit raises the count.
+Competition.data_version = column_property(
+    sa.select([sa.func.count(CompetitionChange.id)])
+    .where(CompetitionChange.competition_id == Competition.id)
+    .correlate_except(CompetitionChange)
+    .as_scalar(),
+    deferred=True,
+)
+
+
+def _competition_of(obj):
+    """Finds the competition whose rankings a changed object appears in."""
+    if isinstance(obj, Competition):
+        return obj
+    if isinstance(obj, Group):
+        return obj.competition
+    if isinstance(obj, (Input, Output)):
+        group = obj.group
+    elif isinstance(obj, Protest):
+        group = obj.submitter
+    else:
+        return None
+    return group and group.competition
+
+
+_CHANGED_KEY = "algobowl.model.changed_competitions"
+
+
+@sa.event.listens_for(DBSession, "before_flush")
+def _bump_data_versions(session, flush_context, instances):
+    """
+    Bump ``Competition.data_version`` for competitions with changed groups,
+    inputs, outputs, or protests, so caches keyed on it (such as the
+    rendered rankings) are invalidated in every process.
+
+    Each transaction adds at most one ``CompetitionChange`` row per
+    competition.  Inserting it does not lock the competition row against
+    other writers, so uploads to the same competition are not serialized.
+    """
+    changed = [
+        obj
+        for obj in session.dirty
+        if session.is_modified(obj, include_collections=False)
+    ]
+    bumped = session.info.setdefault(_CHANGED_KEY, set())
+    for obj in (*session.new, *changed, *session.deleted):
+        if isinstance(obj, CompetitionChange):
+            continue
+        competition = _competition_of(obj)
+        if competition is None or competition.id in bumped:
+            continue
+        state = sa.inspect(competition)
+        if not state.persistent or competition in session.deleted:
+            continue
+        bumped.add(competition.id)
+        session.add(CompetitionChange(competition_id=competition.id))
+
+
+@sa.event.listens_for(DBSession, "after_transaction_end")
+def _forget_data_versions(session, trans):
+    """Forget which competitions were bumped once the transaction ends."""
+    if trans.parent is None:
+        session.info.pop(_CHANGED_KEY, None)
@@ -26,6 +26,15 @@ class ProblemSupportService(Protocol):
     async def verify_output(self, request: algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputRequest, ctx: RequestContext) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputResponse:
         raise ConnectError(Code.UNIMPLEMENTED, "Not implemented")
 
+    async def verify_outputs(self, request: algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsRequest, ctx: RequestContext) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsResponse:
+        raise ConnectError(Code.UNIMPLEMENTED, "Not implemented")
+
+    async def register_input(self, request: algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputRequest, ctx: RequestContext) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputResponse:
+        raise ConnectError(Code.UNIMPLEMENTED, "Not implemented")
+
+    async def verify_output_stream(self, request: AsyncIterator[algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputChunk], ctx: RequestContext) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputResponse:
+        raise ConnectError(Code.UNIMPLEMENTED, "Not implemented")
+
     async def generate_input(self, request: algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.GenerateInputRequest, ctx: RequestContext) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.GenerateInputResponse:
         raise ConnectError(Code.UNIMPLEMENTED, "Not implemented")
 
@@ -68,6 +77,36 @@ class ProblemSupportServiceASGIApplication(ConnectASGIApplication[ProblemSupport
                     ),
                     function=svc.verify_output,
                 ),
+                "/algobowl.problemsupport.v1.ProblemSupportService/VerifyOutputs": Endpoint.unary(
+                    method=MethodInfo(
+                        name="VerifyOutputs",
+                        service_name="algobowl.problemsupport.v1.ProblemSupportService",
+                        input=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsRequest,
+                        output=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsResponse,
+                        idempotency_level=IdempotencyLevel.UNKNOWN,
+                    ),
+                    function=svc.verify_outputs,
+                ),
+                "/algobowl.problemsupport.v1.ProblemSupportService/RegisterInput": Endpoint.unary(
+                    method=MethodInfo(
+                        name="RegisterInput",
+                        service_name="algobowl.problemsupport.v1.ProblemSupportService",
+                        input=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputRequest,
+                        output=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputResponse,
+                        idempotency_level=IdempotencyLevel.UNKNOWN,
+                    ),
+                    function=svc.register_input,
+                ),
+                "/algobowl.problemsupport.v1.ProblemSupportService/VerifyOutputStream": Endpoint.client_stream(
+                    method=MethodInfo(
+                        name="VerifyOutputStream",
+                        service_name="algobowl.problemsupport.v1.ProblemSupportService",
+                        input=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputChunk,
+                        output=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputResponse,
+                        idempotency_level=IdempotencyLevel.UNKNOWN,
+                    ),
+                    function=svc.verify_output_stream,
+                ),
                 "/algobowl.problemsupport.v1.ProblemSupportService/GenerateInput": Endpoint.unary(
                     method=MethodInfo(
                         name="GenerateInput",
@@ -161,6 +200,66 @@ class ProblemSupportServiceClient(ConnectClient):
             timeout_ms=timeout_ms,
         )
 
+    async def verify_outputs(
+        self,
+        request: algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsRequest,
+        *,
+        headers: Headers | Mapping[str, str] | None = None,
+        timeout_ms: int | None = None,
+    ) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsResponse:
+        return await self.execute_unary(
+            request=request,
+            method=MethodInfo(
+                name="VerifyOutputs",
+                service_name="algobowl.problemsupport.v1.ProblemSupportService",
+                input=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsRequest,
+                output=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsResponse,
+                idempotency_level=IdempotencyLevel.UNKNOWN,
+            ),
+            headers=headers,
+            timeout_ms=timeout_ms,
+        )
+
+    async def register_input(
+        self,
+        request: algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputRequest,
+        *,
+        headers: Headers | Mapping[str, str] | None = None,
+        timeout_ms: int | None = None,
+    ) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputResponse:
+        return await self.execute_unary(
+            request=request,
+            method=MethodInfo(
+                name="RegisterInput",
+                service_name="algobowl.problemsupport.v1.ProblemSupportService",
+                input=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputRequest,
+                output=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputResponse,
+                idempotency_level=IdempotencyLevel.UNKNOWN,
+            ),
+            headers=headers,
+            timeout_ms=timeout_ms,
+        )
+
+    async def verify_output_stream(
+        self,
+        request: AsyncIterator[algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputChunk],
+        *,
+        headers: Headers | Mapping[str, str] | None = None,
+        timeout_ms: int | None = None,
+    ) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputResponse:
+        return await self.execute_client_stream(
+            request=request,
+            method=MethodInfo(
+                name="VerifyOutputStream",
+                service_name="algobowl.problemsupport.v1.ProblemSupportService",
+                input=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputChunk,
+                output=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputResponse,
+                idempotency_level=IdempotencyLevel.UNKNOWN,
+            ),
+            headers=headers,
+            timeout_ms=timeout_ms,
+        )
+
     async def generate_input(
         self,
         request: algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.GenerateInputRequest,
@@ -209,6 +308,12 @@ class ProblemSupportServiceSync(Protocol):
         raise ConnectError(Code.UNIMPLEMENTED, "Not implemented")
     def verify_output(self, request: algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputRequest, ctx: RequestContext) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputResponse:
         raise ConnectError(Code.UNIMPLEMENTED, "Not implemented")
+    def verify_outputs(self, request: algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsRequest, ctx: RequestContext) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsResponse:
+        raise ConnectError(Code.UNIMPLEMENTED, "Not implemented")
+    def register_input(self, request: algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputRequest, ctx: RequestContext) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputResponse:
+        raise ConnectError(Code.UNIMPLEMENTED, "Not implemented")
+    def verify_output_stream(self, request: Iterator[algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputChunk], ctx: RequestContext) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputResponse:
+        raise ConnectError(Code.UNIMPLEMENTED, "Not implemented")
     def generate_input(self, request: algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.GenerateInputRequest, ctx: RequestContext) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.GenerateInputResponse:
         raise ConnectError(Code.UNIMPLEMENTED, "Not implemented")
     def solve(self, request: algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.SolveRequest, ctx: RequestContext) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.SolveResponse:
@@ -249,6 +354,36 @@ class ProblemSupportServiceWSGIApplication(ConnectWSGIApplication):
                     ),
                     function=service.verify_output,
                 ),
+                "/algobowl.problemsupport.v1.ProblemSupportService/VerifyOutputs": EndpointSync.unary(
+                    method=MethodInfo(
+                        name="VerifyOutputs",
+                        service_name="algobowl.problemsupport.v1.ProblemSupportService",
+                        input=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsRequest,
+                        output=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsResponse,
+                        idempotency_level=IdempotencyLevel.UNKNOWN,
+                    ),
+                    function=service.verify_outputs,
+                ),
+                "/algobowl.problemsupport.v1.ProblemSupportService/RegisterInput": EndpointSync.unary(
+                    method=MethodInfo(
+                        name="RegisterInput",
+                        service_name="algobowl.problemsupport.v1.ProblemSupportService",
+                        input=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputRequest,
+                        output=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputResponse,
+                        idempotency_level=IdempotencyLevel.UNKNOWN,
+                    ),
+                    function=service.register_input,
+                ),
+                "/algobowl.problemsupport.v1.ProblemSupportService/VerifyOutputStream": EndpointSync.client_stream(
+                    method=MethodInfo(
+                        name="VerifyOutputStream",
+                        service_name="algobowl.problemsupport.v1.ProblemSupportService",
+                        input=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputChunk,
+                        output=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputResponse,
+                        idempotency_level=IdempotencyLevel.UNKNOWN,
+                    ),
+                    function=service.verify_output_stream,
+                ),
                 "/algobowl.problemsupport.v1.ProblemSupportService/GenerateInput": EndpointSync.unary(
                     method=MethodInfo(
                         name="GenerateInput",
@@ -342,6 +477,66 @@ class ProblemSupportServiceClientSync(ConnectClientSync):
             timeout_ms=timeout_ms,
         )
 
+    def verify_outputs(
+        self,
+        request: algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsRequest,
+        *,
+        headers: Headers | Mapping[str, str] | None = None,
+        timeout_ms: int | None = None,
+    ) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsResponse:
+        return self.execute_unary(
+            request=request,
+            method=MethodInfo(
+                name="VerifyOutputs",
+                service_name="algobowl.problemsupport.v1.ProblemSupportService",
+                input=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsRequest,
+                output=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputsResponse,
+                idempotency_level=IdempotencyLevel.UNKNOWN,
+            ),
+            headers=headers,
+            timeout_ms=timeout_ms,
+        )
+
+    def register_input(
+        self,
+        request: algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputRequest,
+        *,
+        headers: Headers | Mapping[str, str] | None = None,
+        timeout_ms: int | None = None,
+    ) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputResponse:
+        return self.execute_unary(
+            request=request,
+            method=MethodInfo(
+                name="RegisterInput",
+                service_name="algobowl.problemsupport.v1.ProblemSupportService",
+                input=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputRequest,
+                output=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.RegisterInputResponse,
+                idempotency_level=IdempotencyLevel.UNKNOWN,
+            ),
+            headers=headers,
+            timeout_ms=timeout_ms,
+        )
+
+    def verify_output_stream(
+        self,
+        request: Iterator[algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputChunk],
+        *,
+        headers: Headers | Mapping[str, str] | None = None,
+        timeout_ms: int | None = None,
+    ) -> algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputResponse:
+        return self.execute_client_stream(
+            request=request,
+            method=MethodInfo(
+                name="VerifyOutputStream",
+                service_name="algobowl.problemsupport.v1.ProblemSupportService",
+                input=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputChunk,
+                output=algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.VerifyOutputResponse,
+                idempotency_level=IdempotencyLevel.UNKNOWN,
+            ),
+            headers=headers,
+            timeout_ms=timeout_ms,
+        )
+
     def generate_input(
         self,
         request: algobowl_dot_problemsupport_dot_v1_dot_problem__support__pb2.GenerateInputRequest,
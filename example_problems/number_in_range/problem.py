@@ -36,9 +36,9 @@ class Input(problemlib.BaseInput):
 class Output(problemlib.BaseOutput):
     @classmethod
     def read(cls, input, f):
-        lines = f.readlines()
-        problemlib.assert_linecount(lines, 1)
-        score = problemlib.parse_line_int(lines, 0, bounds=range(1, 101))
+        reader = problemlib.LineReader(f)
+        score = reader.next_int(bounds=range(1, 101))
+        reader.finish()
         return cls(input=input, score=score)
 
     def compute_actual_score(self):
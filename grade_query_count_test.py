@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Checks that the grading page runs a constant number of queries.
+
+Usage:
+    python grade_query_count_test.py CONFIG PROBLEM_URL
+
+CONFIG is the app's .ini file, and must point at a scratch database: the
+schema is created if needed, and competitions, groups and outputs are added
+to it.  PROBLEM_URL is a running problem service for the competitions (for
+example, one of the example problems), which grading asks how to sort and
+format scores.
+
+A competition is created for each size in SIZES, and the grading page is
+requested with a ``before_cursor_execute`` listener counting the statements
+run.  The count must not grow with the number of groups: before grading was
+reworked, it ran several queries per group.
+"""
+
+import datetime
+import io
+import random
+import sys
+
+import sqlalchemy as sa
+import transaction
+import webtest
+from depot.io.utils import FileIntent
+from paste.deploy import loadapp
+
+from algobowl import model
+
+SIZES = [2, 20]
+ADMIN_TOKEN = "grade-query-count-test".ljust(88, "x")
+
+
+def seed(size, rng):
+    """Adds a competition in resolution with ``size`` ranked groups.
+
+    A benchmark and an incognito group are added besides, and outputs get
+    a mix of student verifications and resubmissions.
+
+    Returns:
+        The competition ID.
+    """
+    hour = datetime.timedelta(hours=1)
+    begins = datetime.datetime.now() - 6 * hour
+    competition = model.Competition(
+        name=f"Grade query count ({size} groups)",
+        problem=sys.argv[2],
+        input_upload_begins=begins,
+        input_upload_ends=begins + hour,
+        output_upload_begins=begins + hour,
+        output_upload_ends=begins + 2 * hour,
+        verification_begins=begins + 2 * hour,
+        verification_ends=begins + 3 * hour,
+        resolution_begins=begins + 3 * hour,
+        resolution_ends=begins + 12 * hour,
+    )
+    model.DBSession.add(competition)
+    model.DBSession.flush()
+    groups = []
+    for i in range(size + 2):
+        username = f"grade{competition.id}_{i}"
+        user = model.User(username=username, email=f"{username}@example.com")
+        group = model.Group(
+            name=f"Group {i}",
+            competition=competition,
+            users=[user],
+            benchmark=i == size,
+            incognito=i == size + 1,
+        )
+        group.input = model.Input(
+            data=FileIntent(io.BytesIO(b"1\n"), "input.txt", "text/plain"),
+            group=group,
+        )
+        groups.append(group)
+    for group in groups:
+        for iput in (other.input for other in groups):
+            if rng.random() < 0.1:
+                continue
+            model.DBSession.add(
+                model.Output(
+                    data=FileIntent(io.BytesIO(b"1\n"), "output.txt", "text/plain"),
+                    group=group,
+                    input=iput,
+                    score=rng.randint(1, 100),
+                    original=rng.random() < 0.8,
+                    verification=rng.choice(list(model.VerificationStatus)),
+                    ground_truth=rng.choice(
+                        [
+                            model.VerificationStatus.accepted,
+                            model.VerificationStatus.rejected,
+                        ]
+                    ),
+                )
+            )
+    model.DBSession.flush()
+    return competition.id
+
+
+def add_admin():
+    if model.DBSession.query(model.AuthToken).filter_by(client_id=ADMIN_TOKEN).count():
+        return
+    admin = model.User(
+        username="grade-query-count-admin",
+        email="grade-query-count-admin@example.com",
+        admin=True,
+    )
+    model.DBSession.add(
+        model.AuthToken(
+            client_id=ADMIN_TOKEN,
+            client_name="grade_query_count_test",
+            date_added=datetime.datetime.now(),
+            user=admin,
+        )
+    )
+
+
+def count_queries(app, engine, competition_id):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sa.event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        app.get(
+            f"/competition/{competition_id}/grade",
+            headers={
+                "Authorization": f"Bearer {ADMIN_TOKEN}",
+                "X-AlgoBOWL-Sudo": "True",
+                "Accept": "text/html",
+            },
+        )
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return len(statements)
+
+
+def main():
+    if len(sys.argv) != 3:
+        print(__doc__, file=sys.stderr)
+        sys.exit(2)
+    app = webtest.TestApp(loadapp(f"config:{sys.argv[1]}", relative_to="."))
+    engine = model.DBSession.get_bind()
+    model.metadata.create_all(bind=engine)
+
+    rng = random.Random(0)
+    with transaction.manager:
+        add_admin()
+        competitions = {size: seed(size, rng) for size in SIZES}
+
+    # The first request warms up caches (token lookup, problem metadata) which
+    # would otherwise be counted against the first size.
+    count_queries(app, engine, competitions[SIZES[0]])
+    counts = {
+        size: count_queries(app, engine, cid) for size, cid in competitions.items()
+    }
+    constant = len(set(counts.values())) == 1
+    for size, count in counts.items():
+        print(f"{'ok' if constant else 'FAIL':4}  {size} groups: {count} queries")
+    if not constant:
+        print("Grading queries grow with the number of groups.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
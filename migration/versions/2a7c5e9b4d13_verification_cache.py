@@ -0,0 +1,39 @@
+"""Verification cache
+
+Revision ID: 2a7c5e9b4d13
+Revises: fd3bd0901611
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "2a7c5e9b4d13"
+down_revision = "fd3bd0901611"
+
+
+def upgrade():
+    op.create_table(
+        "cached_verification",
+        sa.Column("problem", sa.String(), nullable=False),
+        sa.Column("problem_version", sa.String(), nullable=False),
+        sa.Column("input_sha256", sa.String(64), nullable=False),
+        sa.Column("output_sha256", sa.String(64), nullable=False),
+        sa.Column("content_sha256", sa.String(64), nullable=False),
+        sa.Column("score", sa.BigInteger(), nullable=False),
+        sa.Column("rejection_reason", sa.String(), nullable=True),
+        sa.Column("last_used", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "problem", "problem_version", "input_sha256", "output_sha256"
+        ),
+    )
+    op.create_index(
+        "ix_cached_verification_last_used", "cached_verification", ["last_used"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_cached_verification_last_used", table_name="cached_verification")
+    op.drop_table("cached_verification")
@@ -0,0 +1,38 @@
+"""Input pool
+
+Revision ID: 3b8f6a1d9e24
+Revises: 9c4d2e7f1a58
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from depot.fields.sqlalchemy import UploadedFileField
+
+# revision identifiers, used by Alembic.
+revision = "3b8f6a1d9e24"
+down_revision = "9c4d2e7f1a58"
+
+
+def upgrade():
+    op.create_table(
+        "pooled_input",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("competition_id", sa.Integer(), nullable=False),
+        sa.Column("problem", sa.String(), nullable=False),
+        sa.Column("data", UploadedFileField, nullable=False),
+        sa.Column("created", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["competition_id"], ["competition.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_pooled_input_competition_id", "pooled_input", ["competition_id"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_pooled_input_competition_id", table_name="pooled_input")
+    op.drop_table("pooled_input")
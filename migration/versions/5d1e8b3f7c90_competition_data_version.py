@@ -0,0 +1,39 @@
+"""Competition data version
+
+Revision ID: 5d1e8b3f7c90
+Revises: 7a5c3e9d1f62
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5d1e8b3f7c90"
+down_revision = "7a5c3e9d1f62"
+
+
+def upgrade():
+    op.create_table(
+        "competition_change",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("competition_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["competition_id"], ["competition.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_competition_change_competition_id",
+        "competition_change",
+        ["competition_id", "id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_competition_change_competition_id", table_name="competition_change"
+    )
+    op.drop_table("competition_change")
@@ -0,0 +1,46 @@
+"""Reverify jobs
+
+Revision ID: 6e1f3b8c2a47
+Revises: 2a7c5e9b4d13
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "6e1f3b8c2a47"
+down_revision = "2a7c5e9b4d13"
+
+job_status_enum = sa.Enum("running", "complete", "failed", name="jobstatus")
+
+
+def upgrade():
+    op.create_table(
+        "reverify_job",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("competition_id", sa.Integer(), nullable=False),
+        sa.Column("status", job_status_enum, nullable=False),
+        sa.Column("started", sa.DateTime(), nullable=False),
+        sa.Column("updated", sa.DateTime(), nullable=False),
+        sa.Column("total_inputs", sa.Integer(), nullable=False),
+        sa.Column("done_inputs", sa.Integer(), nullable=False),
+        sa.Column("changes", sa.Integer(), nullable=False),
+        sa.Column("checkpoint_input_id", sa.Integer(), nullable=True),
+        sa.Column("log", sa.Text(), nullable=False),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["competition_id"], ["competition.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_reverify_job_competition_id", "reverify_job", ["competition_id"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_reverify_job_competition_id", table_name="reverify_job")
+    op.drop_table("reverify_job")
+    job_status_enum.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,78 @@
+"""Indexes for hot query paths
+
+Revision ID: 7a5c3e9d1f62
+Revises: 3b8f6a1d9e24
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7a5c3e9d1f62"
+down_revision = "3b8f6a1d9e24"
+
+output = sa.table(
+    "output",
+    sa.column("id", sa.Integer),
+    sa.column("group_id", sa.Integer),
+    sa.column("input_id", sa.Integer),
+    sa.column("active", sa.Boolean),
+)
+group = sa.table(
+    "group",
+    sa.column("id", sa.Integer),
+    sa.column("competition_id", sa.Integer),
+)
+ranking_cell = sa.table("ranking_cell", sa.column("competition_id", sa.Integer))
+
+indexes = [
+    (
+        "ix_output_input_id_group_id_active",
+        "output",
+        ["input_id", "group_id", "active"],
+    ),
+    ("ix_output_group_id", "output", ["group_id"]),
+    ("ix_input_group_id", "input", ["group_id"]),
+    ("ix_group_competition_id_incognito", "group", ["competition_id", "incognito"]),
+    ("ix_protest_submitter_id", "protest", ["submitter_id"]),
+    ("ix_protest_output_id", "protest", ["output_id"]),
+    ("ix_user_group_xref_group_id", "user_group_xref", ["group_id"]),
+]
+
+
+def upgrade():
+    # Only the newest active output for each group and input may stay active.
+    newest = (
+        sa.select([sa.func.max(output.c.id)])
+        .where(output.c.active == True)
+        .group_by(output.c.group_id, output.c.input_id)
+    )
+    duplicate = sa.and_(output.c.active == True, output.c.id.notin_(newest))
+
+    # Their materialized rankings would go stale, so drop them: they are
+    # computed live until the next refresh (or "admin rebuild-rankings").
+    affected = sa.select([group.c.competition_id]).where(
+        group.c.id.in_(sa.select([output.c.group_id]).where(duplicate))
+    )
+    op.execute(ranking_cell.delete().where(ranking_cell.c.competition_id.in_(affected)))
+
+    op.execute(output.update().where(duplicate).values(active=False))
+
+    for name, table, columns in indexes:
+        op.create_index(name, table, columns)
+    op.create_index(
+        "ux_output_group_id_input_id_active",
+        "output",
+        ["group_id", "input_id"],
+        unique=True,
+        sqlite_where=output.c.active == True,
+        postgresql_where=output.c.active == True,
+    )
+
+
+def downgrade():
+    op.drop_index("ux_output_group_id_input_id_active", table_name="output")
+    for name, table, _ in reversed(indexes):
+        op.drop_index(name, table_name=table)
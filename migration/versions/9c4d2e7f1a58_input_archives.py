@@ -0,0 +1,45 @@
+"""Input archives
+
+Revision ID: 9c4d2e7f1a58
+Revises: 6e1f3b8c2a47
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from depot.fields.sqlalchemy import UploadedFileField
+
+# revision identifiers, used by Alembic.
+revision = "9c4d2e7f1a58"
+down_revision = "6e1f3b8c2a47"
+
+
+def upgrade():
+    op.create_table(
+        "input_archive",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("competition_id", sa.Integer(), nullable=False),
+        sa.Column("digest", sa.String(length=64), nullable=False),
+        sa.Column("data", UploadedFileField, nullable=False),
+        sa.Column("created", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["competition_id"], ["competition.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_input_archive_competition_id", "input_archive", ["competition_id"]
+    )
+    op.create_index(
+        "ux_input_archive_competition_id_digest",
+        "input_archive",
+        ["competition_id", "digest"],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index("ux_input_archive_competition_id_digest", table_name="input_archive")
+    op.drop_index("ix_input_archive_competition_id", table_name="input_archive")
+    op.drop_table("input_archive")
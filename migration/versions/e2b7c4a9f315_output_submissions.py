@@ -0,0 +1,57 @@
+"""Output submission queue
+
+Revision ID: e2b7c4a9f315
+Revises: 5d1e8b3f7c90
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from depot.fields.sqlalchemy import UploadedFileField
+
+# revision identifiers, used by Alembic.
+revision = "e2b7c4a9f315"
+down_revision = "5d1e8b3f7c90"
+
+submission_status_enum = sa.Enum(
+    "queued", "running", "complete", "failed", name="submissionstatus"
+)
+
+
+def upgrade():
+    op.create_table(
+        "output_submission",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("group_id", sa.Integer(), nullable=False),
+        sa.Column("input_id", sa.Integer(), nullable=False),
+        sa.Column("data", UploadedFileField, nullable=True),
+        sa.Column("privileged", sa.Boolean(), nullable=False),
+        sa.Column("received", sa.DateTime(), nullable=False),
+        sa.Column("status", submission_status_enum, nullable=False),
+        sa.Column("updated", sa.DateTime(), nullable=False),
+        sa.Column("claim_token", sa.String(), nullable=True),
+        sa.Column("output_id", sa.Integer(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["group_id"], ["group.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["input_id"], ["input.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["output_id"], ["output.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_output_submission_status_id", "output_submission", ["status", "id"]
+    )
+    op.create_index(
+        "ix_output_submission_group_id_input_id",
+        "output_submission",
+        ["group_id", "input_id"],
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_output_submission_group_id_input_id", table_name="output_submission"
+    )
+    op.drop_index("ix_output_submission_status_id", table_name="output_submission")
+    op.drop_table("output_submission")
+    submission_status_enum.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,49 @@
+"""Materialized rankings
+
+Revision ID: fd3bd0901611
+Revises: b1c4e2f8a903
+Create Date: 2026-10-18 13:30:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "fd3bd0901611"
+down_revision = "b1c4e2f8a903"
+
+# The type already exists for output.verification.
+verification_status_enum = postgresql.ENUM(
+    "waiting", "accepted", "rejected", name="verificationstatus", create_type=False
+)
+
+
+def upgrade():
+    op.create_table(
+        "ranking_cell",
+        sa.Column("input_id", sa.Integer(), nullable=False),
+        sa.Column("group_id", sa.Integer(), nullable=False),
+        sa.Column("competition_id", sa.Integer(), nullable=False),
+        sa.Column("output_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.BigInteger(), nullable=False),
+        sa.Column("verification", verification_status_enum, nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=True),
+        sa.Column("penalty", sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(["input_id"], ["input.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["group_id"], ["group.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["competition_id"], ["competition.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["output_id"], ["output.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("input_id", "group_id"),
+    )
+    op.create_index(
+        "ix_ranking_cell_competition_id", "ranking_cell", ["competition_id"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_ranking_cell_competition_id", table_name="ranking_cell")
+    op.drop_table("ranking_cell")
@@ -11,6 +11,7 @@ for f in "${HERE}"/sampdata/*.sql; do
     sed -e 's#%(here)s/devdata\.db#'"${DB}"'#g' \
         "${HERE}/development.ini.sample" >"${CFG}"
     gearbox migrate -c "${CFG}" -l "${HERE}/migration" upgrade
+    python "${HERE}/query_plan_test.py" "sqlite:///${DB}"
     rm "${CFG}"
     rm "${DB}"
 done
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Checks that the hot query paths are answered using indexes.
+
+Usage:
+    python query_plan_test.py SQLALCHEMY_URL
+
+The database must already have the current schema (e.g., after running
+the migrations).  Each query is run through EXPLAIN, and the plan is
+checked for full table scans of the tables the query looks up.  SQLite
+and PostgreSQL are supported.  On PostgreSQL, sequential scans are
+disabled for the session, since the planner will (rightly) prefer them on
+small tables; the check is then that a usable index exists.
+"""
+
+import sys
+
+import sqlalchemy as sa
+
+from algobowl import model
+
+# (description, query, tables which must not be scanned)
+QUERIES = [
+    (
+        "active output of a group for an input (submit_output)",
+        sa.select([model.Output.id])
+        .where(model.Output.group_id == 1)
+        .where(model.Output.input_id == 1)
+        .where(model.Output.active == True),
+        ["output"],
+    ),
+    (
+        "active output by file name (output_redirector)",
+        sa.select([model.Output.id])
+        .select_from(sa.join(model.Output, model.Input))
+        .where(model.Input.group_id == 1)
+        .where(model.Output.group_id == 2)
+        .where(model.Output.active == True),
+        ["output", "input"],
+    ),
+    (
+        "active outputs for an input (rankings)",
+        sa.select([model.Output.id, model.Output.score])
+        .where(model.Output.input_id == 1)
+        .where(model.Output.active == True),
+        ["output"],
+    ),
+    (
+        "outputs of a group (verification_data)",
+        sa.select([model.Output.id]).where(model.Output.group_id == 1),
+        ["output"],
+    ),
+    (
+        "input of a group",
+        sa.select([model.Input.id]).where(model.Input.group_id == 1),
+        ["input"],
+    ),
+    (
+        "visible groups of a competition (rankings)",
+        sa.select([model.Group.id])
+        .where(model.Group.competition_id == 1)
+        .where(model.Group.incognito == False),
+        ["group"],
+    ),
+    (
+        "protests by a group",
+        sa.select([model.Protest.id]).where(model.Protest.submitter_id == 1),
+        ["protest"],
+    ),
+    (
+        "protests on an output",
+        sa.select([model.Protest.id]).where(model.Protest.output_id == 1),
+        ["protest"],
+    ),
+    (
+        "token authentication",
+        sa.select([model.AuthToken.user_id]).where(
+            model.AuthToken.client_id == "token"
+        ),
+        ["auth_token"],
+    ),
+    (
+        "members of a group",
+        sa.select([model.user_group_xref.c.user_id]).where(
+            model.user_group_xref.c.group_id == 1
+        ),
+        ["user_group_xref"],
+    ),
+]
+
+
+def explain(conn, query):
+    sql = str(
+        query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    )
+    if conn.dialect.name == "sqlite":
+        return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    if conn.dialect.name == "postgresql":
+        return [row[0] for row in conn.execute(f"EXPLAIN {sql}")]
+    raise NotImplementedError(f"Unsupported database: {conn.dialect.name}")
+
+
+def full_scans(conn, plan, tables):
+    scans = []
+    for line in plan:
+        for table in tables:
+            if conn.dialect.name == "sqlite":
+                words = line.split()
+                if words[:2] == ["SCAN", table] and "INDEX" not in words:
+                    scans.append(line)
+            elif f"Seq Scan on {table} " in f"{line} " or (
+                f'Seq Scan on "{table}"' in line
+            ):
+                scans.append(line)
+    return scans
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__, file=sys.stderr)
+        sys.exit(2)
+    engine = sa.create_engine(sys.argv[1])
+    failed = 0
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute("SET enable_seqscan = off")
+        for description, query, tables in QUERIES:
+            plan = explain(conn, query)
+            scans = full_scans(conn, plan, tables)
+            status = "FAIL" if scans else "ok"
+            print(f"{status:4}  {description}")
+            for line in plan:
+                print(f"        {line}")
+            failed += bool(scans)
+    if failed:
+        print(f"{failed} queries do a full table scan.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Compares the rankings places and grading fleets against the old code.
+
+Usage:
+    python rankings_bench.py
+
+Places and fleets used to be computed by comparing every group against
+every other group (and every benchmark group).  This runs the old
+quadratic versions side by side with :func:`rankings.competition_places`
+and :func:`rankings.fleet_numbers` on synthetic rankings of 50, 500 and
+5000 groups, checks that both give the same places, fleets and places
+within fleets, and prints the time each took.  No database is needed.
+"""
+
+import random
+import sys
+import timeit
+
+from algobowl.lib import rankings
+from algobowl.lib.rankings import GroupEntry
+
+SIZES = [50, 500, 5000]
+BENCHMARK_GROUPS = 3
+
+
+def old_places(entries):
+    for this_ent in entries:
+        this_ent.place = 1
+        for other_ent in entries:
+            if other_ent < this_ent:
+                this_ent.place += 1
+    return [entry.place for entry in entries]
+
+
+def new_places(entries):
+    rankings._assign_places(entries)  # noqa: SLF001
+    return [entry.place for entry in entries]
+
+
+def old_fleets(entries, benchmarks):
+    benchmarks = sorted(benchmarks, key=lambda e: -e.adj_score)
+    fleets = [[] for _ in range(len(benchmarks) + 1)]
+    fleet_of = {}
+    for entry in entries:
+        fleet_num = 0
+        for bench in benchmarks:
+            if entry.adj_score <= bench.adj_score:
+                fleet_num += 1
+        fleet_of[id(entry)] = fleet_num
+        fleets[fleet_num].append(entry)
+    for fleet in fleets:
+        fleet.sort(key=lambda e: -e.adj_score)
+
+    result = {}
+    for entry in entries:
+        fleet = fleets[fleet_of[id(entry)]]
+        place_in_fleet = 0
+        last_adj_score = fleet[0].adj_score
+        for i, other in enumerate(fleet):
+            if other.adj_score != last_adj_score:
+                place_in_fleet = i
+                last_adj_score = other.adj_score
+            if other is entry:
+                break
+        result[id(entry)] = (fleet_of[id(entry)], place_in_fleet)
+    return result
+
+
+def new_fleets(entries, benchmarks):
+    fleets = [[] for _ in range(len(benchmarks) + 1)]
+    fleet_nums = rankings.fleet_numbers(
+        [entry.adj_score for entry in entries],
+        [bench.adj_score for bench in benchmarks],
+    )
+    for entry, fleet_num in zip(entries, fleet_nums, strict=True):
+        fleets[fleet_num].append(entry)
+
+    result = {}
+    for fleet_num, fleet in enumerate(fleets):
+        places = rankings.competition_places(fleet, key=lambda e: -e.adj_score)
+        for entry, place in zip(fleet, places, strict=True):
+            result[id(entry)] = (fleet_num, place - 1)
+    return result
+
+
+def synthetic_entries(count, rng):
+    entries = []
+    for _ in range(count):
+        entry = GroupEntry()
+        entry.reject_count = rng.choice([0] * 8 + [1, 2])
+        entry.sum_of_ranks = rng.randint(count // 2, count * 3)
+        entry.penalties = rng.randint(0, 2)
+        entry.input_ranks = dict.fromkeys(range(count // 10 + 1))
+        entries.append(entry)
+    return entries
+
+
+def best_time(func, *args):
+    number = 1 if len(args[0]) >= 5000 else 10
+    return min(timeit.repeat(lambda: func(*args), number=number, repeat=3)) / number
+
+
+def main():
+    rng = random.Random(0)
+    failed = False
+    print(f"{'groups':>6}  {'places old/new':>22}  {'fleets old/new':>22}")
+    for size in SIZES:
+        entries = synthetic_entries(size, rng)
+        benchmarks = synthetic_entries(BENCHMARK_GROUPS, rng)
+
+        if old_places(entries) != new_places(entries):
+            print(f"FAIL: places differ for {size} groups")
+            failed = True
+        if old_fleets(entries, benchmarks) != new_fleets(entries, benchmarks):
+            print(f"FAIL: fleets differ for {size} groups")
+            failed = True
+
+        places = [best_time(f, entries) for f in (old_places, new_places)]
+        fleets = [best_time(f, entries, benchmarks) for f in (old_fleets, new_fleets)]
+        print(
+            f"{size:6d}  "
+            f"{places[0] * 1e3:10.2f} / {places[1] * 1e3:6.2f} ms  "
+            f"{fleets[0] * 1e3:10.2f} / {fleets[1] * 1e3:6.2f} ms"
+        )
+
+    if failed:
+        sys.exit(1)
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()